@@ -0,0 +1,183 @@
+"""Incrementally maintained analytics rollups.
+
+* ``lead_rollups_daily``: contact submissions per UTC day per service.
+* ``quotation_rollups_monthly``: quotation count and ``total_amount`` per
+  month of creation per status.
+
+The write paths keep them current with ``$inc`` upserts, so chart queries only
+read a few hundred small rollup documents instead of aggregating the raw
+collections. ``rebuild`` recomputes both from raw data (streaming the hot
+collections and their archive in batches) and swaps the result in
+atomically::
+
+    python analytics.py rebuild
+    python analytics.py rebuild --archive-backend ndjson
+"""
+import argparse
+import asyncio
+import os
+from collections import defaultdict
+from datetime import datetime
+from pathlib import Path
+from typing import AsyncIterator, List, Optional
+
+from pymongo import ASCENDING, UpdateOne
+
+LEADS = "lead_rollups_daily"
+QUOTATIONS = "quotation_rollups_monthly"
+
+
+def _day(value: datetime) -> datetime:
+    return datetime(value.year, value.month, value.day)
+
+
+def _month(value: datetime) -> datetime:
+    return datetime(value.year, value.month, 1)
+
+
+def _lead_update(submitted_at: datetime, service: str, count: int) -> UpdateOne:
+    day = _day(submitted_at)
+    return UpdateOne(
+        {"_id": {"day": day, "service": service}},
+        {"$inc": {"count": count}, "$setOnInsert": {"day": day, "service": service}},
+        upsert=True,
+    )
+
+
+def _quotation_update(created_at: datetime, status: str, count: int, amount: float) -> UpdateOne:
+    month = _month(created_at)
+    return UpdateOne(
+        {"_id": {"month": month, "status": status}},
+        {"$inc": {"count": count, "total_amount": amount}, "$setOnInsert": {"month": month, "status": status}},
+        upsert=True,
+    )
+
+
+async def ensure_indexes(database) -> None:
+    await database[LEADS].create_index([("day", ASCENDING), ("service", ASCENDING)])
+    await database[QUOTATIONS].create_index([("month", ASCENDING), ("status", ASCENDING)])
+
+
+async def record_lead(database, submission: dict) -> None:
+    await database[LEADS].bulk_write([_lead_update(submission["submitted_at"], submission["service"], 1)])
+
+
+async def record_quotation(database, quotation: dict) -> None:
+    await database[QUOTATIONS].bulk_write([
+        _quotation_update(quotation["created_at"], quotation["status"], 1, quotation["total_amount"])
+    ])
+
+
+async def record_quotation_status_change(database, quotations: List[dict], new_status: str) -> None:
+    """Move quotations (as they were before the change) from their old status bucket to ``new_status``."""
+    updates = []
+    for quotation in quotations:
+        if quotation["status"] == new_status:
+            continue
+        updates.append(_quotation_update(quotation["created_at"], quotation["status"], -1, -quotation["total_amount"]))
+        updates.append(_quotation_update(quotation["created_at"], new_status, 1, quotation["total_amount"]))
+    if updates:
+        await database[QUOTATIONS].bulk_write(updates, ordered=False)
+
+
+async def lead_series(database, start: datetime, end: datetime, service: Optional[str] = None) -> List[dict]:
+    query = {"day": {"$gte": _day(start), "$lte": end}}
+    if service:
+        query["service"] = service
+    cursor = database[LEADS].find(query, {"_id": 0}).sort([("day", ASCENDING), ("service", ASCENDING)])
+    return await cursor.to_list(None)
+
+
+async def quotation_series(database, start: datetime, end: datetime, status: Optional[str] = None) -> List[dict]:
+    query = {"month": {"$gte": _month(start), "$lte": end}}
+    if status:
+        query["status"] = status
+    cursor = database[QUOTATIONS].find(query, {"_id": 0}).sort([("month", ASCENDING), ("status", ASCENDING)])
+    return await cursor.to_list(None)
+
+
+async def _swap_in(database, name: str, updates: List[UpdateOne]) -> None:
+    staging = database[f"{name}_rebuild"]
+    await staging.drop()
+    for i in range(0, len(updates), 1000):
+        await staging.bulk_write(updates[i:i + 1000], ordered=False)
+    if updates:
+        await staging.rename(name, dropTarget=True)
+    else:
+        await database[name].delete_many({})
+
+
+async def _raw_documents(database, cold_storage, tier, fields: List[str], batch_size: int) -> AsyncIterator[dict]:
+    """Every document of the tier's collection, hot and archived, each once."""
+    name = tier.collection
+    projection = {"_id": 0, **{field: 1 for field in fields}}
+    async for doc in database[name].find({}, projection, batch_size=batch_size):
+        yield doc
+    async for batch in cold_storage.batches(database, tier, fields, batch_size):
+        # A batch the archiver copied but had not yet deleted is still hot and was counted above
+        hot = await database[name].find({"id": {"$in": [doc["id"] for doc in batch]}}, {"_id": 0, "id": 1}).to_list(None)
+        hot_ids = {doc["id"] for doc in hot}
+        for doc in batch:
+            if doc["id"] not in hot_ids:
+                yield doc
+
+
+async def rebuild(database, cold_storage, batch_size: int = 1000) -> dict:
+    """Recompute both rollups from the raw collections and ``cold_storage`` (see ``archive.create_archive``).
+
+    Raw documents are streamed in batches and folded into per-bucket counters,
+    so memory grows with the number of buckets, not with the history. Writes
+    landing while the rebuild runs can be lost; run it during a quiet period.
+    """
+    from archive import TIERS  # archive imports quotations, which imports this module
+
+    leads = defaultdict(int)
+    fields = ["submitted_at", "service"]
+    async for doc in _raw_documents(database, cold_storage, TIERS["contact_submissions"], fields, batch_size):
+        leads[(_day(doc["submitted_at"]), doc["service"])] += 1
+
+    quotations = defaultdict(lambda: [0, 0.0])
+    fields = ["created_at", "status", "total_amount"]
+    async for doc in _raw_documents(database, cold_storage, TIERS["quotations"], fields, batch_size):
+        bucket = quotations[(_month(doc["created_at"]), doc.get("status", "draft"))]
+        bucket[0] += 1
+        bucket[1] += doc["total_amount"]
+
+    await _swap_in(database, LEADS, [_lead_update(day, service, n) for (day, service), n in leads.items()])
+    await _swap_in(database, QUOTATIONS, [
+        _quotation_update(month, status, n, amount) for (month, status), (n, amount) in quotations.items()
+    ])
+    await ensure_indexes(database)
+    return {"lead_buckets": len(leads), "quotation_buckets": len(quotations)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Maintain analytics rollups")
+    parser.add_argument("command", choices=["rebuild"])
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--archive-backend", choices=["collection", "ndjson"], help="default: ARCHIVE_BACKEND")
+    parser.add_argument("--archive-directory", help="segment directory for the ndjson backend (default: ARCHIVE_DIR)")
+    args = parser.parse_args()
+
+    from dotenv import load_dotenv
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    load_dotenv(Path(__file__).parent / ".env")
+    import archive
+
+    cold_storage = archive.create_archive(
+        args.archive_backend or os.environ.get("ARCHIVE_BACKEND", "collection"), args.archive_directory
+    )
+
+    async def run():
+        client = AsyncIOMotorClient(os.environ["MONGO_URL"])
+        try:
+            print(await rebuild(client[os.environ["DB_NAME"]], cold_storage, args.batch_size))
+        finally:
+            client.close()
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,346 @@
+"""Hot/cold tiering for contact submissions and quotations.
+
+``run`` moves cold documents (read leads older than N days, accepted or
+rejected quotations older than N days) out of the hot collections in
+batches, into either:
+
+* ``collection`` (default): ``<name>_archive`` collections in the same
+  database, unique on ``id``;
+* ``ndjson``: gzip-compressed NDJSON segment files under ``ARCHIVE_DIR``.
+
+Each batch is copied first and deleted from the hot collection second, so an
+interrupted run is simply run again: re-copied documents are ignored by the
+unique index, and readers of NDJSON segments drop duplicates by ``id``.
+Admin listings read only the hot tier unless asked to include the archive,
+and lookups by id fall back to it; the dashboard summary and
+``analytics.py rebuild`` always count both::
+
+    python archive.py run --backend collection
+    python archive.py run --dry-run
+"""
+import argparse
+import asyncio
+import gzip
+import heapq
+import itertools
+import os
+import tempfile
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional
+
+from bson import json_util
+from pymongo import ASCENDING, DESCENDING
+from pymongo.errors import BulkWriteError
+
+import quotations
+
+DUPLICATE_KEY = 11000
+
+
+@dataclass(frozen=True)
+class Tier:
+    collection: str
+    sort_field: str
+    cold_days: float
+
+    def cold_query(self, now: datetime) -> Dict[str, Any]:
+        cutoff = now - timedelta(days=self.cold_days)
+        if self.collection == "contact_submissions":
+            return {"is_read": True, "submitted_at": {"$lt": cutoff}}
+        return {"status": {"$in": ["accepted", "rejected"]}, "created_at": {"$lt": cutoff}}
+
+
+TIERS = {
+    "contact_submissions": Tier("contact_submissions", "submitted_at", float(os.environ.get("ARCHIVE_LEADS_AFTER_DAYS", "180"))),
+    "quotations": Tier("quotations", "created_at", float(os.environ.get("ARCHIVE_QUOTATIONS_AFTER_DAYS", "365"))),
+}
+
+
+def matches(doc: dict, query: Dict[str, Any]) -> bool:
+    """The subset of Mongo query semantics the admin filters use (equality, $in and ranges)."""
+    for field, condition in query.items():
+        value = doc.get(field)
+        if not isinstance(condition, dict):
+            if value != condition:
+                return False
+            continue
+        for op, operand in condition.items():
+            if op == "$in":
+                ok = value in operand
+            elif value is None:
+                ok = False
+            elif op == "$gte":
+                ok = value >= operand
+            elif op == "$gt":
+                ok = value > operand
+            elif op == "$lte":
+                ok = value <= operand
+            elif op == "$lt":
+                ok = value < operand
+            else:
+                raise ValueError(f"Unsupported operator in archive query: {op}")
+            if not ok:
+                return False
+    return True
+
+
+class CollectionArchive:
+    async def ensure_indexes(self, database) -> None:
+        for tier in TIERS.values():
+            archive = database[f"{tier.collection}_archive"]
+            await archive.create_index("id", unique=True)
+            await archive.create_index([(tier.sort_field, DESCENDING)])
+
+    async def store(self, database, tier: Tier, docs: List[dict]) -> None:
+        try:
+            await database[f"{tier.collection}_archive"].insert_many(docs, ordered=False)
+        except BulkWriteError as e:
+            # Already archived by an earlier, interrupted run
+            if any(error["code"] != DUPLICATE_KEY for error in e.details["writeErrors"]):
+                raise
+
+    async def find(self, database, tier: Tier, query: Dict[str, Any], limit: int) -> List[dict]:
+        cursor = database[f"{tier.collection}_archive"].find(query).sort(tier.sort_field, -1).limit(limit)
+        return await cursor.to_list(limit)
+
+    async def stream(self, database, tier: Tier, query: Dict[str, Any], batch_size: int) -> AsyncIterator[dict]:
+        cursor = database[f"{tier.collection}_archive"].find(query, {"_id": 0}, batch_size=batch_size)
+        async for doc in cursor.sort(tier.sort_field, -1):
+            yield doc
+
+    async def batches(self, database, tier: Tier, fields: List[str], batch_size: int) -> AsyncIterator[List[dict]]:
+        projection = {"_id": 0, "id": 1, **{field: 1 for field in fields}}
+        cursor = database[f"{tier.collection}_archive"].find({}, projection, batch_size=batch_size)
+        batch = []
+        async for doc in cursor:
+            batch.append(doc)
+            if len(batch) == batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    async def group(self, database, tier: Tier, key: str, value: Optional[str] = None) -> Dict[Any, dict]:
+        """Archived document count (and sum of ``value``) per distinct ``key``."""
+        pipeline = [{"$group": {"_id": f"${key}", "count": {"$sum": 1}, "value": {"$sum": f"${value}" if value else 0}}}]
+        groups = await database[f"{tier.collection}_archive"].aggregate(pipeline).to_list(None)
+        return {group["_id"]: {"count": group["count"], "value": group["value"]} for group in groups}
+
+
+class SegmentArchive:
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+
+    async def ensure_indexes(self, database) -> None:
+        pass
+
+    def _segment_dir(self, tier: Tier) -> Path:
+        return self.directory / tier.collection
+
+    async def store(self, database, tier: Tier, docs: List[dict]) -> None:
+        await asyncio.to_thread(self._write_segment, tier, docs)
+
+    def _write_segment(self, tier: Tier, docs: List[dict]) -> None:
+        directory = self._segment_dir(tier)
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / f"segment-{docs[0]['_id']}-{docs[-1]['_id']}.ndjson.gz"
+        if path.exists():
+            return
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as raw, gzip.GzipFile(fileobj=raw, mode="wb") as out:
+                for doc in docs:
+                    out.write(json_util.dumps({k: v for k, v in doc.items() if k != "_id"}).encode("utf-8") + b"\n")
+            os.replace(tmp_path, path)
+        except BaseException:
+            Path(tmp_path).unlink(missing_ok=True)
+            raise
+
+    def _segments(self, tier: Tier) -> List[Path]:
+        return sorted(self._segment_dir(tier).glob("segment-*.ndjson.gz"))
+
+    @staticmethod
+    def _read_segment(path: Path) -> List[dict]:
+        with gzip.open(path, "rt", encoding="utf-8") as segment:
+            return [json_util.loads(line) for line in segment]
+
+    def _unique_docs(self, tier: Tier):
+        seen = set()
+        for path in self._segments(tier):
+            for doc in self._read_segment(path):
+                if doc["id"] not in seen:
+                    seen.add(doc["id"])
+                    yield doc
+
+    def _scan(self, tier: Tier, query: Dict[str, Any], limit: Optional[int]) -> List[dict]:
+        """Matching documents newest first; every match (all held in memory) when ``limit`` is None."""
+        matching = (doc for doc in self._unique_docs(tier) if matches(doc, query))
+        if limit is None:
+            return sorted(matching, key=lambda doc: (doc[tier.sort_field], doc["id"]), reverse=True)
+        return heapq.nlargest(limit, matching, key=lambda doc: (doc[tier.sort_field], doc["id"]))
+
+    def _group(self, tier: Tier, key: str, value: Optional[str]) -> Dict[Any, dict]:
+        groups: Dict[Any, dict] = {}
+        for doc in self._unique_docs(tier):
+            group = groups.setdefault(doc.get(key), {"count": 0, "value": 0})
+            group["count"] += 1
+            if value:
+                group["value"] += doc.get(value) or 0
+        return groups
+
+    async def find(self, database, tier: Tier, query: Dict[str, Any], limit: int) -> List[dict]:
+        if not self._segment_dir(tier).is_dir():
+            return []
+        return await asyncio.to_thread(self._scan, tier, query, limit)
+
+    async def stream(self, database, tier: Tier, query: Dict[str, Any], batch_size: int) -> AsyncIterator[dict]:
+        # Segments aren't ordered by date, so the matches are sorted in memory (cold exports are rare)
+        if not self._segment_dir(tier).is_dir():
+            return
+        for doc in await asyncio.to_thread(self._scan, tier, query, None):
+            yield doc
+
+    async def batches(self, database, tier: Tier, fields: List[str], batch_size: int) -> AsyncIterator[List[dict]]:
+        seen = set()
+        batch = []
+        for path in self._segments(tier):
+            for doc in await asyncio.to_thread(self._read_segment, path):
+                if doc["id"] in seen:
+                    continue
+                seen.add(doc["id"])
+                batch.append({"id": doc["id"], **{field: doc[field] for field in fields if field in doc}})
+                if len(batch) == batch_size:
+                    yield batch
+                    batch = []
+        if batch:
+            yield batch
+
+    async def group(self, database, tier: Tier, key: str, value: Optional[str] = None) -> Dict[Any, dict]:
+        if not self._segment_dir(tier).is_dir():
+            return {}
+        return await asyncio.to_thread(self._group, tier, key, value)
+
+
+def create_archive(backend: str, directory: Optional[str] = None):
+    if backend == "collection":
+        return CollectionArchive()
+    if backend == "ndjson":
+        return SegmentArchive(Path(directory or os.environ.get("ARCHIVE_DIR", "archive")))
+    raise ValueError(f"Unknown archive backend: {backend}")
+
+
+async def find_with_archive(database, archive, name: str, query: Dict[str, Any], skip: int, limit: int) -> List[dict]:
+    """One page of hot and archived documents matching ``query``, newest first."""
+    tier = TIERS[name]
+    wanted = skip + limit
+    hot, cold = await asyncio.gather(
+        database[name].find(query).sort(tier.sort_field, -1).limit(wanted).to_list(wanted),
+        archive.find(database, tier, query, wanted),
+    )
+    merged = heapq.merge(hot, cold, key=lambda doc: doc[tier.sort_field], reverse=True)
+    return list(itertools.islice(merged, skip, wanted))
+
+
+async def find_one_with_archive(database, archive, name: str, query: Dict[str, Any]) -> Optional[dict]:
+    """The hot document matching ``query``, else the archived one (lookups by id)."""
+    doc = await database[name].find_one(query)
+    if doc is None:
+        found = await archive.find(database, TIERS[name], query, 1)
+        doc = found[0] if found else None
+    return doc
+
+
+async def _next(iterator) -> Optional[dict]:
+    try:
+        return await iterator.__anext__()
+    except StopAsyncIteration:
+        return None
+
+
+async def stream_with_archive(
+    database, archive, name: str, query: Dict[str, Any], batch_size: int = 1000
+) -> AsyncIterator[dict]:
+    """Every hot and archived document matching ``query``, newest first, for exports."""
+    tier = TIERS[name]
+    field = tier.sort_field
+    hot = database[name].find(query, {"_id": 0}, batch_size=batch_size).sort(field, -1).__aiter__()
+    cold = archive.stream(database, tier, query, batch_size).__aiter__()
+    hot_doc, cold_doc = await _next(hot), await _next(cold)
+    current, ids = None, set()
+    while hot_doc is not None or cold_doc is not None:
+        if cold_doc is None or (hot_doc is not None and hot_doc[field] >= cold_doc[field]):
+            doc, hot_doc = hot_doc, await _next(hot)
+        else:
+            doc, cold_doc = cold_doc, await _next(cold)
+        if doc[field] != current:
+            current, ids = doc[field], set()
+        # A document the archiver copied but had not yet deleted shows up in both tiers
+        if doc["id"] not in ids:
+            ids.add(doc["id"])
+            yield doc
+
+
+async def run(
+    database, archive, names: Iterable[str] = TIERS, batch_size: int = 1000, dry_run: bool = False,
+    now: Optional[datetime] = None, pause: float = 0.0,
+) -> Dict[str, int]:
+    """Move cold documents out of the hot collections; returns how many moved per collection."""
+    now = now or datetime.utcnow()
+    names = list(names)
+    await archive.ensure_indexes(database)
+    if "quotations" in names and not dry_run:
+        # Quote numbers must be counted from before anything leaves the hot collection
+        await quotations.ensure_quote_counter(database)
+    moved = {}
+    for name in names:
+        tier = TIERS[name]
+        query = tier.cold_query(now)
+        if dry_run:
+            moved[name] = await database[name].count_documents(query)
+            continue
+        moved[name] = 0
+        while True:
+            docs = await database[name].find(query).sort("_id", ASCENDING).limit(batch_size).to_list(batch_size)
+            if not docs:
+                break
+            await archive.store(database, tier, docs)
+            result = await database[name].delete_many({"_id": {"$in": [doc["_id"] for doc in docs]}})
+            moved[name] += result.deleted_count
+            if pause:
+                await asyncio.sleep(pause)
+    return moved
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Archive cold contact submissions and quotations")
+    parser.add_argument("command", choices=["run"])
+    parser.add_argument("--backend", choices=["collection", "ndjson"], default=os.environ.get("ARCHIVE_BACKEND", "collection"))
+    parser.add_argument("--directory", help="segment directory for the ndjson backend (default: ARCHIVE_DIR)")
+    parser.add_argument("--only", choices=list(TIERS), action="append", help="limit to one collection (repeatable)")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--pause", type=float, default=0.0, help="seconds to sleep between batches")
+    parser.add_argument("--dry-run", action="store_true", help="only count what would move")
+    args = parser.parse_args()
+
+    from dotenv import load_dotenv
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    load_dotenv(Path(__file__).parent / ".env")
+
+    async def main_async():
+        client = AsyncIOMotorClient(os.environ["MONGO_URL"])
+        try:
+            archive = create_archive(args.backend, args.directory)
+            moved = await run(client[os.environ["DB_NAME"]], archive, args.only or list(TIERS), args.batch_size, args.dry_run, pause=args.pause)
+            for name, count in moved.items():
+                print(f"{name}: {count:,} {'would move' if args.dry_run else 'archived'}")
+        finally:
+            client.close()
+
+    asyncio.run(main_async())
+
+
+if __name__ == "__main__":
+    main()
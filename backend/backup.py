@@ -0,0 +1,415 @@
+"""Streaming backup and restore of the database and the uploads tree.
+
+A backup directory looks like::
+
+    manifest.json                         checksums, counts and index specs
+    collections/<name>/<name>-<run>-00000.ndjson.gz
+    uploads/<run>/...                     uploads copied by each run
+
+Collections are streamed through cursors into gzip-compressed NDJSON chunks of
+``--chunk-documents`` documents (relaxed Extended JSON, so ObjectIds, dates
+and decimals round trip). Collections are dumped one after another rather than at a single point
+in time. Uploads are mirrored incrementally: files whose size and mtime match
+the previous manifest are skipped without being read, and files whose content
+hash is unchanged are not copied again; the manifest records where each
+upload's copy lives.
+
+Backing up into an existing directory never touches the previous backup's
+files: each run writes chunks under its own ``<run>`` id and copies new or
+changed uploads into ``uploads/<run>/``, the new manifest replaces the old one
+atomically, and only then are chunks and mirrored uploads the new manifest no
+longer lists removed. An interrupted backup leaves the last good one intact.
+
+Restore verifies each chunk's checksum and loads chunks in parallel with
+unordered ``insert_many`` batches. Completed chunks are recorded in a state
+file next to the manifest, so an interrupted restore picks up where it
+stopped; documents keep their ``_id``, so a partly loaded chunk is simply
+loaded again with the duplicates ignored. Indexes are built after the data::
+
+    python backup.py backup /var/backups/nt-2024-06-01
+    python backup.py restore /var/backups/nt-2024-06-01 --drop
+    python backup.py verify /var/backups/nt-2024-06-01
+"""
+import argparse
+import asyncio
+import functools
+import gzip
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from bson import json_util
+from bson.json_util import RELAXED_JSON_OPTIONS
+from pymongo.errors import BulkWriteError
+
+MANIFEST = "manifest.json"
+FORMAT_VERSION = 1
+DUPLICATE_KEY = 11000
+# Level 3 compresses about twice as fast as the default 6 for a few percent more disk
+COMPRESS_LEVEL = 3
+HASH_BLOCK = 1 << 20
+_json_default = functools.partial(json_util.default, json_options=RELAXED_JSON_OPTIONS)
+
+
+def _sha256_file(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_BLOCK), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class _HashingWriter:
+    """File wrapper that hashes and counts the bytes written through it."""
+
+    def __init__(self, raw):
+        self.raw = raw
+        self.digest = hashlib.sha256()
+        self.size = 0
+
+    def write(self, data) -> int:
+        self.digest.update(data)
+        self.size += len(data)
+        return self.raw.write(data)
+
+    def flush(self) -> None:
+        self.raw.flush()
+
+
+def _write_chunk(path: Path, lines: List[bytes]) -> dict:
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as raw:
+            hashing = _HashingWriter(raw)
+            with gzip.GzipFile(fileobj=hashing, mode="wb", compresslevel=COMPRESS_LEVEL, mtime=0) as out:
+                out.writelines(lines)
+        os.replace(tmp_path, path)
+    except BaseException:
+        Path(tmp_path).unlink(missing_ok=True)
+        raise
+    return {"file": path.name, "documents": len(lines), "bytes": hashing.size, "sha256": hashing.digest.hexdigest()}
+
+
+# json_util.dumps/loads walk every value in Python; the stdlib C codec with a hook
+# for the few BSON-specific types is several times faster on large collections
+def _encode(docs: List[dict]) -> List[bytes]:
+    return [json.dumps(doc, default=_json_default, separators=(",", ":")).encode("utf-8") + b"\n" for doc in docs]
+
+
+def _object_hook(document: dict):
+    for key in document:
+        # Extended JSON wrappers ({"$oid": ...}, {"$date": ...}) are single-key objects
+        if key.startswith("$"):
+            return json_util.object_hook(document, RELAXED_JSON_OPTIONS)
+        return document
+    return document
+
+
+async def _backup_collection(collection, directory: Path, run: str, chunk_documents: int, batch_size: int) -> dict:
+    directory.mkdir(parents=True, exist_ok=True)
+    chunks: List[dict] = []
+    pending: List[bytes] = []
+    writing: Optional[asyncio.Future] = None
+
+    async def flush(lines: List[bytes]) -> None:
+        # Compress one chunk in a thread while the cursor keeps fetching the next
+        nonlocal writing
+        index = len(chunks)
+        if writing is not None:
+            chunks.append(await writing)
+            index += 1
+        path = directory / f"{collection.name}-{run}-{index:05d}.ndjson.gz"
+        writing = asyncio.ensure_future(asyncio.to_thread(_write_chunk, path, lines))
+
+    cursor = collection.find({}, batch_size=batch_size).sort("_id", 1)
+    batch: List[dict] = []
+    async for doc in cursor:
+        batch.append(doc)
+        if len(batch) == batch_size:
+            pending.extend(await asyncio.to_thread(_encode, batch))
+            batch = []
+        if len(pending) >= chunk_documents:
+            await flush(pending[:chunk_documents])
+            pending = pending[chunk_documents:]
+    pending.extend(await asyncio.to_thread(_encode, batch))
+    while pending:
+        await flush(pending[:chunk_documents])
+        pending = pending[chunk_documents:]
+    if writing is not None:
+        chunks.append(await writing)
+
+    indexes = [
+        {k: v for k, v in spec.items() if k not in ("v", "ns")}
+        for spec in await collection.list_indexes().to_list(None)
+        if spec["name"] != "_id_"
+    ]
+    return {"documents": sum(c["documents"] for c in chunks), "chunks": chunks, "indexes": indexes}
+
+
+def _mirror_uploads(
+    source: Path, mirror: Path, previous: Dict[str, dict], run: str
+) -> Tuple[Dict[str, dict], Dict[str, int]]:
+    # New and changed files go under <run>/, so copies the previous manifest lists are never overwritten;
+    # files gone from the source are removed by _prune, once the new manifest is in place
+    files: Dict[str, dict] = {}
+    stats = {"copied": 0, "unchanged": 0, "removed": 0, "bytes_copied": 0}
+    if source.is_dir():
+        for path in sorted(p for p in source.rglob("*") if p.is_file()):
+            relative = path.relative_to(source).as_posix()
+            stat = path.stat()
+            known = previous.get(relative)
+            mirrored = known is not None and (mirror / _mirror_path(relative, known)).exists()
+            entry = {"size": stat.st_size, "mtime": stat.st_mtime}
+            if mirrored and known["size"] == stat.st_size and known["mtime"] == stat.st_mtime:
+                files[relative] = known
+                stats["unchanged"] += 1
+                continue
+            entry["sha256"] = _sha256_file(path)
+            if mirrored and known.get("sha256") == entry["sha256"]:
+                # Touched but not modified
+                files[relative] = {**entry, "file": _mirror_path(relative, known)}
+                stats["unchanged"] += 1
+                continue
+            entry["file"] = f"{run}/{relative}"
+            target = mirror / entry["file"]
+            target.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copy2(path, target)
+            files[relative] = entry
+            stats["copied"] += 1
+            stats["bytes_copied"] += stat.st_size
+    stats["removed"] = len(set(previous) - set(files))
+    return files, stats
+
+
+def _mirror_path(relative: str, entry: dict) -> str:
+    # Manifests written before uploads were copied per run mirror the tree as is
+    return entry.get("file", relative)
+
+
+def _prune(destination: Path, manifest: dict) -> None:
+    """Delete chunks and mirrored uploads that ``manifest`` no longer lists."""
+    for name, entry in manifest["collections"].items():
+        keep = {chunk["file"] for chunk in entry["chunks"]}
+        for path in (destination / "collections" / name).iterdir():
+            # Also sweeps .tmp- files left by an interrupted run
+            if path.name not in keep:
+                path.unlink()
+    mirror = destination / "uploads"
+    if "uploads_stats" not in manifest or not mirror.is_dir():
+        return  # uploads were not mirrored this run
+    keep = {_mirror_path(relative, entry) for relative, entry in manifest["uploads"].items()}
+    # Also sweeps copies made by an interrupted run
+    for path in sorted(mirror.rglob("*"), reverse=True):
+        if path.is_dir():
+            if not any(path.iterdir()):
+                path.rmdir()
+        elif path.relative_to(mirror).as_posix() not in keep:
+            path.unlink()
+
+
+def _read_manifest(directory: Path) -> Optional[dict]:
+    path = directory / MANIFEST
+    if not path.exists():
+        return None
+    return json.loads(path.read_text())
+
+
+def _write_json(path: Path, data: dict) -> None:
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    tmp_path.write_text(json.dumps(data, indent=2, default=str))
+    os.replace(tmp_path, path)
+
+
+async def backup(
+    database, destination: Path, uploads: Optional[Path] = None, collections: Optional[List[str]] = None,
+    chunk_documents: int = 50000, batch_size: int = 1000,
+) -> dict:
+    destination = Path(destination)
+    destination.mkdir(parents=True, exist_ok=True)
+    previous = _read_manifest(destination) or {}
+    names = collections or sorted(
+        name for name in await database.list_collection_names() if not name.startswith("system.")
+    )
+    started_at = datetime.utcnow()
+    run = started_at.strftime("%Y%m%dT%H%M%S%f")
+    manifest = {
+        "format": FORMAT_VERSION,
+        "database": database.name,
+        "run": run,
+        "started_at": started_at.isoformat(),
+        "collections": {},
+        "uploads": {},
+    }
+    for name in names:
+        manifest["collections"][name] = await _backup_collection(
+            database[name], destination / "collections" / name, run, chunk_documents, batch_size
+        )
+    if uploads is not None:
+        manifest["uploads"], manifest["uploads_stats"] = await asyncio.to_thread(
+            _mirror_uploads, Path(uploads), destination / "uploads", previous.get("uploads", {}), run
+        )
+    manifest["finished_at"] = datetime.utcnow().isoformat()
+    _write_json(destination / MANIFEST, manifest)
+    await asyncio.to_thread(_prune, destination, manifest)
+    return manifest
+
+
+def verify(source: Path) -> List[str]:
+    """Checksum every chunk and mirrored upload; returns the problems found."""
+    source = Path(source)
+    manifest = _read_manifest(source)
+    if manifest is None:
+        return [f"{source / MANIFEST} is missing"]
+    problems = []
+    for name, entry in manifest["collections"].items():
+        for chunk in entry["chunks"]:
+            path = source / "collections" / name / chunk["file"]
+            if not path.exists():
+                problems.append(f"{name}/{chunk['file']}: missing")
+            elif _sha256_file(path) != chunk["sha256"]:
+                problems.append(f"{name}/{chunk['file']}: checksum mismatch")
+    for relative, entry in manifest["uploads"].items():
+        path = source / "uploads" / _mirror_path(relative, entry)
+        if not path.exists():
+            problems.append(f"uploads/{relative}: missing")
+        elif path.stat().st_size != entry["size"]:
+            problems.append(f"uploads/{relative}: size mismatch")
+        elif "sha256" in entry and _sha256_file(path) != entry["sha256"]:
+            problems.append(f"uploads/{relative}: checksum mismatch")
+    return problems
+
+
+def _read_chunk(path: Path, sha256: str) -> List[dict]:
+    data = path.read_bytes()
+    if hashlib.sha256(data).hexdigest() != sha256:
+        raise ValueError(f"{path}: checksum mismatch")
+    return [json.loads(line, object_hook=_object_hook) for line in gzip.decompress(data).splitlines()]
+
+
+async def _insert(collection, docs: List[dict]) -> int:
+    try:
+        result = await collection.insert_many(docs, ordered=False)
+        return len(result.inserted_ids)
+    except BulkWriteError as e:
+        # Already restored before an interruption
+        if any(error["code"] != DUPLICATE_KEY for error in e.details["writeErrors"]):
+            raise
+        return e.details["nInserted"]
+
+
+async def restore(
+    database, source: Path, uploads: Optional[Path] = None, collections: Optional[List[str]] = None,
+    workers: int = 4, batch_size: int = 1000, drop: bool = False,
+) -> Dict[str, int]:
+    source = Path(source)
+    manifest = _read_manifest(source)
+    if manifest is None:
+        raise FileNotFoundError(f"{source / MANIFEST} not found")
+    state_path = source / f".restore-{database.name}.json"
+    state = json.loads(state_path.read_text()) if state_path.exists() else {"done": []}
+    resuming = bool(state["done"])
+    done = set(state["done"])
+    names = collections or list(manifest["collections"])
+
+    if drop and not resuming:
+        for name in names:
+            await database[name].drop()
+
+    queue: asyncio.Queue = asyncio.Queue()
+    for name in names:
+        for chunk in manifest["collections"][name]["chunks"]:
+            if f"{name}/{chunk['file']}" not in done:
+                queue.put_nowait((name, chunk))
+    inserted = {name: 0 for name in names}
+    state_lock = asyncio.Lock()
+
+    async def worker():
+        while True:
+            try:
+                name, chunk = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            docs = await asyncio.to_thread(_read_chunk, source / "collections" / name / chunk["file"], chunk["sha256"])
+            for start in range(0, len(docs), batch_size):
+                inserted[name] += await _insert(database[name], docs[start:start + batch_size])
+            async with state_lock:
+                done.add(f"{name}/{chunk['file']}")
+                _write_json(state_path, {"done": sorted(done)})
+
+    await asyncio.gather(*(worker() for _ in range(workers)))
+
+    for name in names:
+        for spec in manifest["collections"][name]["indexes"]:
+            options = {k: v for k, v in spec.items() if k != "key"}
+            await database[name].create_index(list(spec["key"].items()), **options)
+    if uploads is not None and manifest["uploads"]:
+        await asyncio.to_thread(_restore_uploads, source / "uploads", Path(uploads), manifest["uploads"])
+    state_path.unlink(missing_ok=True)
+    return inserted
+
+
+def _restore_uploads(mirror: Path, uploads: Path, files: Dict[str, dict]) -> None:
+    for relative, entry in files.items():
+        target = uploads / relative
+        if target.exists() and target.stat().st_size == entry["size"]:
+            continue
+        target.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copy2(mirror / _mirror_path(relative, entry), target)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Back up or restore the database and uploads")
+    parser.add_argument("command", choices=["backup", "restore", "verify"])
+    parser.add_argument("path", help="backup directory")
+    parser.add_argument("--collection", action="append", dest="collections", help="limit to a collection (repeatable)")
+    parser.add_argument("--uploads", default="uploads", help="uploads directory ('' to skip)")
+    parser.add_argument("--chunk-documents", type=int, default=50000)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--workers", type=int, default=4, help="parallel chunk loaders for restore")
+    parser.add_argument("--drop", action="store_true", help="drop collections before a fresh restore")
+    args = parser.parse_args()
+
+    if args.command == "verify":
+        problems = verify(Path(args.path))
+        for problem in problems:
+            print(problem)
+        raise SystemExit(1 if problems else 0)
+
+    from dotenv import load_dotenv
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    load_dotenv(Path(__file__).parent / ".env")
+    uploads = Path(args.uploads) if args.uploads else None
+
+    async def run():
+        client = AsyncIOMotorClient(os.environ["MONGO_URL"])
+        database = client[os.environ["DB_NAME"]]
+        start = time.perf_counter()
+        try:
+            if args.command == "backup":
+                manifest = await backup(database, Path(args.path), uploads, args.collections,
+                                        args.chunk_documents, args.batch_size)
+                for name, entry in manifest["collections"].items():
+                    print(f"{name:<28} {entry['documents']:>10,} docs {len(entry['chunks']):>5} chunks")
+                if "uploads_stats" in manifest:
+                    print("uploads", manifest["uploads_stats"])
+            else:
+                inserted = await restore(database, Path(args.path), uploads, args.collections,
+                                         args.workers, args.batch_size, args.drop)
+                for name, count in inserted.items():
+                    print(f"{name:<28} {count:>10,} docs inserted")
+            print(f"{args.command} finished in {time.perf_counter() - start:.1f}s")
+        finally:
+            client.close()
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
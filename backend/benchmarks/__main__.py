@@ -0,0 +1,8 @@
+import sys
+
+from benchmarks import (  # noqa: F401  (registers benchmarks)
+    bench_auth, bench_compression, bench_loopwatch, bench_models, bench_pdf, bench_ratelimit,
+)
+from benchmarks.harness import main
+
+sys.exit(main())
@@ -0,0 +1,89 @@
+"""Hot-collection size and admin list latency before and after archiving.
+
+Seeds a throwaway ``<DB_NAME>_bench`` database with a multi-year synthetic
+history of contact submissions and quotations, then reports collection size
+and the latency of the admin list queries before and after ``archive.run``.
+
+    python -m benchmarks.archive_report --leads 200000 --quotations 50000
+    python -m benchmarks.archive_report --backend ndjson --directory /tmp/archive
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+from datetime import timedelta
+from pathlib import Path
+
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+
+import archive
+import seed
+from benchmarks import fixtures
+
+load_dotenv(Path(__file__).parent.parent / ".env")
+
+# The admin pages' default listings, plus one filtered query each
+LISTINGS = [
+    ("leads: all", "contact_submissions", {}),
+    ("leads: unread", "contact_submissions", {"is_read": False}),
+    ("quotations: all", "quotations", {}),
+    ("quotations: sent", "quotations", {"status": "sent"}),
+]
+
+
+async def _seed(database, leads: int, quotation_count: int) -> None:
+    for name in ("contact_submissions_archive", "quotations_archive"):
+        await database[name].drop()
+    await seed.seed_database(database, {"contact_submissions": leads, "quotations": quotation_count}, drop=True)
+
+
+async def _report(database, label: str, repeat: int) -> None:
+    print(f"-- {label}")
+    for name in ("contact_submissions", "quotations"):
+        stats = await database.command("collStats", name)
+        print(f"{name:<22} {stats['count']:>9,} docs {stats['size'] / 2**20:>9.1f} MiB")
+    for title, name, query in LISTINGS:
+        sort_field = archive.TIERS[name].sort_field
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            await database[name].find(query).sort(sort_field, -1).to_list(1000)
+            timings.append(time.perf_counter() - start)
+        print(f"{title:<22} median {statistics.median(timings) * 1000:8.2f} ms   max {max(timings) * 1000:8.2f} ms")
+
+
+async def run(leads: int, quotation_count: int, backend: str, directory: str, repeat: int) -> None:
+    client = AsyncIOMotorClient(os.environ["MONGO_URL"])
+    database = client[f"{os.environ['DB_NAME']}_bench"]
+    try:
+        await _seed(database, leads, quotation_count)
+        await _report(database, "before", repeat)
+
+        # Fixture dates span two years from BASE_DATE; archive as of the end of that span
+        now = fixtures.BASE_DATE + timedelta(days=731)
+        start = time.perf_counter()
+        moved = await archive.run(database, archive.create_archive(backend, directory), now=now)
+        print(f"-- archived {', '.join(f'{n:,} {name}' for name, n in moved.items())} "
+              f"in {time.perf_counter() - start:.1f}s ({backend})")
+        await _report(database, "after", repeat)
+    finally:
+        for name in ("contact_submissions", "quotations", "contact_submissions_archive", "quotations_archive"):
+            await database[name].drop()
+        client.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Report the effect of hot/cold archiving")
+    parser.add_argument("--leads", type=int, default=100000)
+    parser.add_argument("--quotations", type=int, default=20000)
+    parser.add_argument("--backend", choices=["collection", "ndjson"], default="collection")
+    parser.add_argument("--directory", default="archive-bench", help="segment directory for the ndjson backend")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(run(args.leads, args.quotations, args.backend, args.directory, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""Backup and restore throughput against a real MongoDB.
+
+Fills a throwaway ``<DB_NAME>_bench`` database with roughly ``--gigabytes`` of
+synthetic quotations and contact submissions, backs it up into a temporary
+directory, restores it into ``<DB_NAME>_bench_restore`` and reports MB/s
+(of uncompressed BSON) and documents/s for both directions.
+
+    python -m benchmarks.backup_throughput --gigabytes 4 --workers 1,4,8
+"""
+import argparse
+import asyncio
+import os
+import random
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+
+import backup
+from benchmarks import fixtures
+
+load_dotenv(Path(__file__).parent.parent / ".env")
+
+COLLECTIONS = ["quotations", "contact_submissions"]
+
+
+async def _seed(database, gigabytes: float) -> None:
+    rng = random.Random(0)
+    for name in COLLECTIONS:
+        await database[name].drop()
+    number = 0
+    while True:
+        stats = await database.command("dbStats")
+        if stats["dataSize"] >= gigabytes * 2**30:
+            return
+        await asyncio.gather(
+            database.quotations.insert_many(
+                [fixtures.make_quotation(rng, items=40, number=number + i) for i in range(2000)]),
+            database.contact_submissions.insert_many([fixtures.make_contact_submission(rng) for _ in range(4000)]),
+        )
+        number += 2000
+
+
+async def _size(database) -> tuple:
+    documents = data_size = 0
+    for name in COLLECTIONS:
+        stats = await database.command("collStats", name)
+        documents += stats["count"]
+        data_size += stats["size"]
+    return documents, data_size
+
+
+def _print(label: str, seconds: float, documents: int, data_size: int) -> None:
+    print(f"{label:<18} {seconds:8.1f}s {data_size / 2**20 / seconds:9.1f} MB/s {documents / seconds:>11,.0f} docs/s",
+          flush=True)
+
+
+async def run(gigabytes: float, worker_counts, chunk_documents: int, batch_size: int) -> None:
+    client = AsyncIOMotorClient(os.environ["MONGO_URL"])
+    source = client[f"{os.environ['DB_NAME']}_bench"]
+    target = client[f"{os.environ['DB_NAME']}_bench_restore"]
+    directory = Path(tempfile.mkdtemp(prefix="backup-bench-"))
+    try:
+        await _seed(source, gigabytes)
+        documents, data_size = await _size(source)
+        print(f"dataset: {documents:,} documents, {data_size / 2**30:.2f} GiB BSON")
+
+        start = time.perf_counter()
+        await backup.backup(source, directory, collections=COLLECTIONS, chunk_documents=chunk_documents,
+                            batch_size=batch_size)
+        _print("backup", time.perf_counter() - start, documents, data_size)
+        compressed = sum(p.stat().st_size for p in directory.rglob("*.ndjson.gz"))
+        print(f"{'':<18} {compressed / 2**20:,.0f} MB on disk ({compressed / data_size:.1%} of BSON)")
+
+        for workers in worker_counts:
+            await target.client.drop_database(target.name)
+            start = time.perf_counter()
+            await backup.restore(target, directory, collections=COLLECTIONS, workers=workers, batch_size=batch_size)
+            _print(f"restore workers={workers}", time.perf_counter() - start, documents, data_size)
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+        await client.drop_database(source.name)
+        await client.drop_database(target.name)
+        client.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark backup and restore throughput")
+    parser.add_argument("--gigabytes", type=float, default=2.0)
+    parser.add_argument("--workers", default="1,4,8", help="comma-separated restore worker counts")
+    parser.add_argument("--chunk-documents", type=int, default=50000)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+    asyncio.run(run(args.gigabytes, [int(n) for n in args.workers.split(",")], args.chunk_documents, args.batch_size))
+
+
+if __name__ == "__main__":
+    main()
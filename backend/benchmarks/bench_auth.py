@@ -0,0 +1,28 @@
+from fastapi.security import HTTPAuthorizationCredentials
+
+import server
+from benchmarks.harness import benchmark
+
+PASSWORD = "a1b-2c3.d4e-5f6"
+
+
+@benchmark("auth.get_password_hash", min_time=2.0)
+def bench_password_hash():
+    return lambda: server.get_password_hash(PASSWORD)
+
+
+@benchmark("auth.verify_password", min_time=2.0)
+def bench_verify_password():
+    hashed = server.get_password_hash(PASSWORD)
+    return lambda: server.verify_password(PASSWORD, hashed)
+
+
+@benchmark("auth.get_current_admin")
+def bench_get_current_admin():
+    token = server.create_access_token({"sub": "v"})
+    credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+
+    async def op():
+        await server.get_current_admin(credentials)
+
+    return op
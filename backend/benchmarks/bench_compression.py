@@ -0,0 +1,54 @@
+"""CPU per request for compressed listings; run directly for bytes on the wire.
+
+    python -m benchmarks -k compression
+    python -m benchmarks.bench_compression
+"""
+import tempfile
+
+import server
+from benchmarks import fixtures
+from benchmarks.harness import benchmark
+from cache import SharedResponseCache
+from compression import DEFAULT_LEVELS, PRECOMPRESSED_LEVELS, compress, supported_encodings
+
+
+def _body(count: int = 1000) -> bytes:
+    return server.render_json([server.Project(**doc) for doc in fixtures.projects(count)])
+
+
+def _register(encoding: str):
+    @benchmark(f"compression.per_request_{encoding}{DEFAULT_LEVELS[encoding]}_projects_1000")
+    def bench_per_request():
+        body = _body()
+        return lambda: compress(body, encoding, DEFAULT_LEVELS[encoding])
+
+    @benchmark(f"compression.precompress_{encoding}{PRECOMPRESSED_LEVELS[encoding]}_projects_1000", min_time=2.0)
+    def bench_precompress():
+        body = _body()
+        return lambda: compress(body, encoding, PRECOMPRESSED_LEVELS[encoding])
+
+    @benchmark(f"compression.cached_{encoding}_hit_projects_1000")
+    def bench_cached_hit():
+        cache = SharedResponseCache(tempfile.mkdtemp())
+        generation = cache.generation()
+        cache.set(f"projects|{encoding}", compress(_body(), encoding, PRECOMPRESSED_LEVELS[encoding]), generation)
+        return lambda: cache.get(f"projects|{encoding}", generation)
+
+
+for _encoding in supported_encodings():
+    _register(_encoding)
+
+
+def main() -> None:
+    for count in (10, 100, 1000):
+        body = _body(count)
+        print(f"{count:>5} projects  identity {len(body):>10,} B")
+        for encoding in supported_encodings():
+            per_request = compress(body, encoding, DEFAULT_LEVELS[encoding])
+            cached = compress(body, encoding, PRECOMPRESSED_LEVELS[encoding])
+            print(f"{'':<15}{encoding:<9}{len(per_request):>10,} B per-request level"
+                  f"   {len(cached):>10,} B cached level  ({len(cached) / len(body):.1%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+import loopwatch
+from benchmarks.harness import benchmark
+
+SCOPE = {"type": "http", "method": "GET", "path": "/api/projects", "headers": []}
+
+
+async def _app(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"[]"})
+
+
+async def _receive():
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+async def _send(message):
+    pass
+
+
+def _request(app):
+    async def op():
+        await app(dict(SCOPE), _receive, _send)
+    return op
+
+
+@benchmark("loopwatch.request_unwatched")
+def bench_request_unwatched():
+    return _request(_app)
+
+
+@benchmark("loopwatch.request_watched")
+def bench_request_watched():
+    # Per-request cost of the middleware that attributes stalls to routes
+    return _request(loopwatch.LoopWatchMiddleware(_app, loopwatch.LoopWatch()))
@@ -0,0 +1,33 @@
+import server
+from benchmarks import fixtures
+from benchmarks.harness import benchmark
+
+
+@benchmark("models.project_list_1000")
+def bench_project_list():
+    docs = fixtures.projects(1000)
+    return lambda: [server.Project(**doc) for doc in docs]
+
+
+@benchmark("models.quotation_list_100x10")
+def bench_quotation_list():
+    docs = fixtures.quotations(100, items=10)
+    return lambda: [server.Quotation(**doc) for doc in docs]
+
+
+@benchmark("models.contact_submission_list_1000")
+def bench_contact_submission_list():
+    docs = fixtures.contact_submissions(1000)
+    return lambda: [server.ContactSubmission(**doc) for doc in docs]
+
+
+def _register_quotation_create(items: int):
+    @benchmark(f"models.quotation_create_{items}", min_time=2.0 if items >= 1000 else 1.0)
+    def bench():
+        doc = fixtures.quotations(1, items=items)[0]
+        payload = {field: doc[field] for field in server.QuotationCreate.model_fields if field in doc}
+        return lambda: server.build_quotation(server.QuotationCreate(**payload), doc["quote_number"])
+
+
+for _items in (10, 1000, 10000):
+    _register_quotation_create(_items)
@@ -0,0 +1,17 @@
+import server
+from benchmarks import fixtures
+from benchmarks.harness import benchmark
+
+
+def _register(items: int, min_time: float):
+    @benchmark(f"pdf.generate_quotation_pdf_{items}", min_time=min_time)
+    def bench():
+        quotation = server.Quotation(**fixtures.quotations(1, items=items)[0])
+        return lambda: server.generate_quotation_pdf(quotation)
+
+
+_register(1, 1.0)
+_register(10, 1.0)
+_register(50, 2.0)
+_register(1000, 5.0)
+_register(10000, 10.0)
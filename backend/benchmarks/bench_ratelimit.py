@@ -0,0 +1,31 @@
+import itertools
+import tempfile
+from pathlib import Path
+
+import ratelimit
+from benchmarks.harness import benchmark
+
+CLIENTS = [f"203.0.113.{i % 250}:{i}" for i in range(10_000)]
+
+
+def _checker(store):
+    controller = ratelimit.AdmissionController(store=store)
+    clients = itertools.cycle(CLIENTS)
+    return lambda: controller.check("status", next(clients))
+
+
+@benchmark("ratelimit.memory_check")
+def bench_memory_check():
+    return _checker(ratelimit.MemoryBucketStore())
+
+
+@benchmark("ratelimit.memory_check_evicting")
+def bench_memory_check_evicting():
+    # Every check evicts: far more distinct clients than slots
+    return _checker(ratelimit.MemoryBucketStore(max_clients=1000))
+
+
+@benchmark("ratelimit.sqlite_check")
+def bench_sqlite_check():
+    directory = Path(tempfile.mkdtemp(prefix="ratelimit-bench-"))
+    return _checker(ratelimit.SqliteBucketStore(str(directory / "buckets.sqlite")))
@@ -0,0 +1,70 @@
+"""Fan-out latency of the admin event broker with many connected listeners.
+
+Each listener consumes its SSE stream in its own task, as a connection
+would; latency is measured from ``dispatch`` (the tail loop handing an event
+to this worker's subscribers) to the frame being yielded. The Mongo hop from
+``publish`` to the tail is not included.
+
+    python -m benchmarks.event_fanout --listeners 100,500,1000 --events 200
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+from events import Event, EventBroker
+
+
+async def run(listeners: int, events: int, interval: float) -> None:
+    broker = EventBroker(replay_size=events, queue_size=256)
+    latencies = []
+    received = 0
+    done = asyncio.Event()
+
+    async def listen():
+        nonlocal received
+        subscriber = broker.subscribe()
+        async for frame in broker.stream(subscriber, heartbeat=60):
+            if frame.startswith(b"id:"):
+                latencies.append(time.perf_counter() - published_at[frame[4:frame.index(b"\n")].decode()])
+                received += 1
+                if received == listeners * events:
+                    done.set()
+
+    published_at = {}
+    tasks = [asyncio.create_task(listen()) for _ in range(listeners)]
+    await asyncio.sleep(0.1)
+    start = time.perf_counter()
+    for i in range(events):
+        data = json.dumps({"id": i, "name": "Load Test", "service": "IT Support"})
+        event = Event(f"bench:{i + 1}", i + 1, "contact_submission.created", data, time.perf_counter())
+        published_at[event.id] = event.published_at
+        broker.dispatch(event)
+        await asyncio.sleep(interval)
+    await asyncio.wait_for(done.wait(), 60)
+    elapsed = time.perf_counter() - start
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+    latencies.sort()
+    print(f"listeners={listeners:<5} deliveries={len(latencies):>8,}  "
+          f"p50 {statistics.median(latencies) * 1000:7.3f} ms  "
+          f"p99 {latencies[int(len(latencies) * 0.99)] * 1000:7.3f} ms  "
+          f"max {latencies[-1] * 1000:7.3f} ms  "
+          f"{len(latencies) / elapsed:>10,.0f} deliveries/s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure admin event fan-out latency")
+    parser.add_argument("--listeners", default="10,100,500,1000")
+    parser.add_argument("--events", type=int, default=200)
+    parser.add_argument("--interval", type=float, default=0.001, help="seconds between published events")
+    args = parser.parse_args()
+    for listeners in [int(n) for n in args.listeners.split(",")]:
+        asyncio.run(run(listeners, args.events, args.interval))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""Memory profile of the streaming export endpoints.
+
+Seeds a throwaway ``<DB_NAME>_bench`` database with N contact submissions (or
+quotations), then streams the real export route in-process (auth, Mongo
+cursor, encoder, ASGI send) and samples resident memory as the body goes
+out; flat RSS means memory doesn't grow with export size. It also reports
+whether Mongo can serve the export's sort from an index: an in-memory SORT
+stage blocks the server and fails past its 100 MB sort limit.
+
+    python -m benchmarks.export_rss --count 1000000 --format csv
+    python -m benchmarks.export_rss --count 1000000 --skip-seed --include-archived
+"""
+import argparse
+import asyncio
+import json
+import os
+import resource
+import time
+from datetime import timedelta
+from pathlib import Path
+
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+
+load_dotenv(Path(__file__).parent.parent / ".env")
+
+import archive  # noqa: E402
+import exports  # noqa: E402
+import seed  # noqa: E402
+import server  # noqa: E402  (needs the environment loaded first)
+
+ROUTES = {"contact_submissions": "/api/admin/contact-submissions/export", "quotations": "/api/admin/quotations/export"}
+
+
+def _rss_mib() -> float:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * resource.getpagesize() / 2**20
+    except OSError:  # not Linux: fall back to the peak
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+async def _sort_stage(database, kind: str) -> bool:
+    plan = await database[kind].find({}).sort(archive.TIERS[kind].sort_field, -1).explain()
+    return '"SORT"' in json.dumps(plan["queryPlanner"]["winningPlan"], default=str)
+
+
+async def _export(path: str, query: str, token: str, count: int, samples: int) -> None:
+    scope = {
+        "type": "http", "http_version": "1.1", "method": "GET", "scheme": "http", "path": path,
+        "raw_path": path.encode(), "query_string": query.encode(), "root_path": "",
+        "headers": [(b"host", b"bench"), (b"accept-encoding", b"identity"), (b"authorization", f"Bearer {token}".encode())],
+        "client": ("127.0.0.1", 0), "server": ("bench", 80),
+    }
+    state = {"status": None, "written": 0, "lines": 0, "first_byte": None, "next_sample": max(1, count // samples)}
+    start = time.perf_counter()
+
+    async def receive():
+        await asyncio.sleep(3600)  # the client never disconnects
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            state["status"] = message["status"]
+            return
+        body = message.get("body", b"")
+        if body and state["first_byte"] is None:
+            state["first_byte"] = time.perf_counter() - start
+        state["written"] += len(body)
+        state["lines"] += body.count(b"\n")
+        if state["lines"] >= state["next_sample"]:
+            state["next_sample"] += max(1, count // samples)
+            print(f"{state['lines']:>10,} lines  {state['written'] / 2**20:>9,.1f} MiB out  RSS {_rss_mib():7.1f} MiB",
+                  flush=True)
+
+    await server.app(scope, receive, send)
+    elapsed = time.perf_counter() - start
+    if state["status"] != 200:
+        raise RuntimeError(f"{path} returned {state['status']}")
+    print(f"{state['lines']:,} lines, {state['written'] / 2**20:,.1f} MiB in {elapsed:.1f}s "
+          f"(first byte after {state['first_byte'] * 1000:.0f} ms), "
+          f"peak RSS {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.1f} MiB")
+
+
+async def run(kind: str, export_format: str, count: int, samples: int, skip_seed: bool, include_archived: bool) -> None:
+    client = AsyncIOMotorClient(os.environ["MONGO_URL"])
+    database = client[f"{os.environ['DB_NAME']}_bench"]
+    server.client, server.db = client, database
+    server.job_queue.collection = database.jobs  # ensure_indexes covers the job queue too
+    try:
+        if not skip_seed:
+            await seed.seed_database(database, {kind: count}, drop=True)
+        await server.ensure_indexes()
+        print(f"{kind}: {await database[kind].estimated_document_count():,} documents, "
+              f"in-memory SORT stage: {'yes' if await _sort_stage(database, kind) else 'no'}")
+        token = server.create_access_token({"sub": "v"}, timedelta(hours=1))
+        query = f"format={export_format}" + ("&include_archived=true" if include_archived else "")
+        await _export(ROUTES[kind], query, token, count, samples)
+    finally:
+        client.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure export memory use through the export routes")
+    parser.add_argument("--count", type=int, default=1_000_000)
+    parser.add_argument("--kind", choices=list(exports.EXPORTS), default="contact_submissions")
+    parser.add_argument("--format", dest="export_format", choices=list(exports.MEDIA_TYPES), default="ndjson")
+    parser.add_argument("--samples", type=int, default=10)
+    parser.add_argument("--skip-seed", action="store_true", help="reuse the documents of an earlier run")
+    parser.add_argument("--include-archived", action="store_true")
+    args = parser.parse_args()
+    asyncio.run(run(args.kind, args.export_format, args.count, args.samples, args.skip_seed, args.include_archived))
+
+
+if __name__ == "__main__":
+    main()
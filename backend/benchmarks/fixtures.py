@@ -0,0 +1,185 @@
+"""Deterministic generators for realistic backend documents.
+
+Every generator takes a ``random.Random`` so the same seed always produces the
+same documents. The dicts mirror what ``model.dict()`` stores in Mongo.
+``generate`` derives a separate generator for each document index, so a range
+of documents comes out the same however a large run is split into batches
+(see ``seed.py``).
+"""
+import random
+import uuid
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List
+
+SERVICES = ["Web Development", "IT Support", "Branding", "Cloud Migration", "Network Setup", "CCTV Installation"]
+CATEGORIES = ["Web Design", "Branding", "IT Support", "E-commerce", "Networking"]
+TAGS = ["react", "fastapi", "wordpress", "seo", "logo", "ui/ux", "aws", "mongodb", "shopify", "cctv", "wifi", "mobile"]
+FIRST_NAMES = ["Aisyah", "Wei Jie", "Arjun", "Nurul", "Daniel", "Mei Ling", "Haressh", "Siti", "Kumar", "Jason"]
+LAST_NAMES = ["Tan", "Lim", "Abdullah", "Raj", "Wong", "Ismail", "Lee", "Chong", "Nair", "Ong"]
+COMPANIES = ["Kedai Runcit Sdn Bhd", "Petaling Logistics", "KL Dental Care", "Borneo Coffee Co", "Sunway Tutors"]
+WORDS = (
+    "website redesign mobile responsive booking system inventory dashboard network cabling "
+    "firewall backup email hosting domain logo refresh social media campaign maintenance "
+    "support contract laptop server upgrade migration training integration payment gateway"
+).split()
+STATUS_CLIENTS = ["frontend", "uptime-monitor", "load-balancer", "mobile-app"]
+BASE_DATE = datetime(2024, 1, 1)
+
+
+def _uuid(rng: random.Random) -> str:
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+
+def _sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+
+def _name(rng: random.Random) -> str:
+    return f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+
+
+def _email(rng: random.Random, name: str) -> str:
+    return f"{name.lower().replace(' ', '.')}{rng.randint(1, 999)}@example.com"
+
+
+def _phone(rng: random.Random) -> str:
+    return f"+601{rng.randint(0, 9)}-{rng.randint(100, 999)} {rng.randint(1000, 9999)}"
+
+
+def _date(rng: random.Random, days: int = 730) -> datetime:
+    return BASE_DATE + timedelta(days=rng.randint(0, days), seconds=rng.randint(0, 86399))
+
+
+def make_contact_submission(rng: random.Random) -> dict:
+    name = _name(rng)
+    return {
+        "id": _uuid(rng),
+        "name": name,
+        "email": _email(rng, name),
+        "phone": _phone(rng),
+        "service": rng.choice(SERVICES),
+        "message": " ".join(_sentence(rng, rng.randint(8, 20)) for _ in range(rng.randint(1, 4))),
+        "is_read": rng.random() < 0.6,
+        "submitted_at": _date(rng),
+    }
+
+
+def make_quotation_item(rng: random.Random) -> dict:
+    quantity = rng.randint(1, 20)
+    unit_price = round(rng.uniform(15, 2500), 2)
+    return {
+        "description": _sentence(rng, rng.randint(3, 9)),
+        "quantity": quantity,
+        "unit_price": unit_price,
+        "total": round(quantity * unit_price, 2),
+    }
+
+
+def make_quotation(rng: random.Random, items: int = 5, number: int = 1) -> dict:
+    name = _name(rng)
+    line_items = [make_quotation_item(rng) for _ in range(items)]
+    subtotal = round(sum(item["total"] for item in line_items), 2)
+    tax_amount = round(subtotal * 0.06, 2)
+    created_at = _date(rng)
+    return {
+        "id": _uuid(rng),
+        "quote_number": f"NT-{created_at.year}-{number:04d}",
+        "client_name": name,
+        "client_email": _email(rng, name),
+        "client_phone": _phone(rng),
+        "client_address": f"{rng.randint(1, 99)}, Jalan {rng.choice(LAST_NAMES)} {rng.randint(1, 30)}, Kuala Lumpur",
+        "items": line_items,
+        "subtotal": subtotal,
+        "tax_rate": 0.06,
+        "tax_amount": tax_amount,
+        "total_amount": round(subtotal + tax_amount, 2),
+        "status": rng.choice(["draft", "sent", "accepted", "rejected"]),
+        "created_at": created_at,
+        "valid_until": created_at + timedelta(days=30),
+        "notes": _sentence(rng, 12) if rng.random() < 0.5 else None,
+    }
+
+
+def quotation_item_count(rng: random.Random, max_items: int = 200) -> int:
+    # Mostly a handful of lines (median 5) with a long tail of large quotations
+    return max(1, min(max_items, int(rng.lognormvariate(1.6, 0.9))))
+
+
+def make_project(rng: random.Random) -> dict:
+    project_id = _uuid(rng)
+    images = [f"/uploads/projects/{_uuid(rng)}.jpg" for _ in range(rng.randint(0, 6))]
+    return {
+        "id": project_id,
+        "title": _sentence(rng, rng.randint(2, 5)).rstrip("."),
+        "description": " ".join(_sentence(rng, rng.randint(10, 25)) for _ in range(rng.randint(2, 5))),
+        "client": rng.choice(COMPANIES),
+        "category": rng.choice(CATEGORIES),
+        "tags": rng.sample(TAGS, rng.randint(0, 5)),
+        "images": images,
+        "featured_image": images[0] if images else None,
+        "completion_date": _date(rng),
+        "is_featured": rng.random() < 0.2,
+        "created_at": _date(rng),
+    }
+
+
+def make_testimonial(rng: random.Random) -> dict:
+    return {
+        "id": _uuid(rng),
+        "name": _name(rng),
+        "role": rng.choice(["Owner", "Director", "Operations Manager", "Founder", "IT Lead"]),
+        "company": rng.choice(COMPANIES) if rng.random() < 0.8 else None,
+        "content": " ".join(_sentence(rng, rng.randint(8, 18)) for _ in range(rng.randint(1, 3))),
+        "rating": rng.choice([3, 4, 4, 5, 5, 5]),
+        "image": f"/uploads/testimonials/{_uuid(rng)}.jpg" if rng.random() < 0.5 else None,
+        "is_featured": rng.random() < 0.3,
+        "created_at": _date(rng),
+    }
+
+
+def make_status_check(rng: random.Random) -> dict:
+    return {
+        "id": _uuid(rng),
+        "client_name": rng.choice(STATUS_CLIENTS),
+        "timestamp": _date(rng),
+    }
+
+
+def contact_submissions(count: int, seed: int = 0) -> List[dict]:
+    rng = random.Random(seed)
+    return [make_contact_submission(rng) for _ in range(count)]
+
+
+def quotations(count: int, items: int = 5, seed: int = 0) -> List[dict]:
+    rng = random.Random(seed)
+    return [make_quotation(rng, items, number=i + 1) for i in range(count)]
+
+
+def projects(count: int, seed: int = 0) -> List[dict]:
+    rng = random.Random(seed)
+    return [make_project(rng) for _ in range(count)]
+
+
+def testimonials(count: int, seed: int = 0) -> List[dict]:
+    rng = random.Random(seed)
+    return [make_testimonial(rng) for _ in range(count)]
+
+
+def status_checks(count: int, seed: int = 0) -> List[dict]:
+    rng = random.Random(seed)
+    return [make_status_check(rng) for _ in range(count)]
+
+
+GENERATORS: Dict[str, Callable[[random.Random, int], dict]] = {
+    "projects": lambda rng, index: make_project(rng),
+    "testimonials": lambda rng, index: make_testimonial(rng),
+    "quotations": lambda rng, index: make_quotation(rng, quotation_item_count(rng), number=index + 1),
+    "contact_submissions": lambda rng, index: make_contact_submission(rng),
+    "status_checks": lambda rng, index: make_status_check(rng),
+}
+
+
+def generate(kind: str, start: int, count: int, seed: int = 0) -> List[dict]:
+    """Documents ``start`` to ``start + count`` of the deterministic ``kind`` sequence."""
+    make = GENERATORS[kind]
+    return [make(random.Random(f"{seed}:{kind}:{index}"), index) for index in range(start, start + count)]
@@ -0,0 +1,120 @@
+"""Public read latency while bots flood ``POST /api/contact``.
+
+Starts ``serve.py`` against a throwaway ``<DB_NAME>_bench`` database, once
+with admission control off and once with it on. Each run measures
+``GET /api/projects`` alone, then again while client processes flood the
+contact form from rotating ``X-Forwarded-For`` addresses.
+
+    python -m benchmarks.flood --bots 64 --duration 10
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import random
+import time
+from collections import Counter
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from dotenv import load_dotenv
+from pymongo import MongoClient
+
+from benchmarks import fixtures
+from benchmarks.loadtest import _print, _start_server, run_load
+
+load_dotenv(Path(__file__).parent.parent / ".env")
+
+READ_PATH = "/api/projects?featured_only=true"
+
+
+async def _bot(host: str, port: int, addresses: list, deadline: float, outcomes: Counter) -> None:
+    reader, writer = await asyncio.open_connection(host, port)
+    rng = random.Random()
+    try:
+        while time.perf_counter() < deadline:
+            doc = fixtures.make_contact_submission(rng)
+            body = (
+                f'{{"name": "{doc["name"]}", "email": "{doc["email"]}", "phone": "{doc["phone"]}", '
+                f'"service": "{doc["service"]}", "message": "flood"}}'
+            ).encode()
+            writer.write(
+                f"POST /api/contact HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+                f"Content-Length: {len(body)}\r\nX-Forwarded-For: {rng.choice(addresses)}\r\n\r\n".encode() + body
+            )
+            await writer.drain()
+            headers = await reader.readuntil(b"\r\n\r\n")
+            length = 0
+            for line in headers.split(b"\r\n"):
+                if line.lower().startswith(b"content-length:"):
+                    length = int(line.split(b":", 1)[1])
+            await reader.readexactly(length)
+            outcomes[int(headers.split(b" ", 2)[1])] += 1
+    finally:
+        writer.close()
+
+
+def _bot_process(url: str, bots: int, addresses: int, duration: float, queue) -> None:
+    parts = urlsplit(url)
+    pool = [f"198.51.100.{i % 250}" if i < 250 else f"203.0.113.{i % 250}" for i in range(addresses)]
+    outcomes: Counter = Counter()
+
+    async def run():
+        deadline = time.perf_counter() + duration
+        await asyncio.gather(*(_bot(parts.hostname, parts.port, pool, deadline, outcomes) for _ in range(bots)))
+
+    asyncio.run(run())
+    queue.put(dict(outcomes))
+
+
+def _flood(url: str, processes: int, bots: int, addresses: int, duration: float) -> tuple:
+    queue = multiprocessing.Queue()
+    workers = [
+        multiprocessing.Process(target=_bot_process, args=(url, bots, addresses, duration, queue))
+        for _ in range(processes)
+    ]
+    for worker in workers:
+        worker.start()
+    reads = run_load(url, [READ_PATH], 1, 4, duration)
+    outcomes: Counter = Counter()
+    for _ in workers:
+        outcomes.update(queue.get())
+    for worker in workers:
+        worker.join()
+    return reads, outcomes
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Read latency under a contact-form flood")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--bot-processes", type=int, default=2)
+    parser.add_argument("--bots", type=int, default=64, help="flooding connections per bot process")
+    parser.add_argument("--addresses", type=int, default=50, help="distinct source addresses the bots rotate through")
+    parser.add_argument("--duration", type=float, default=10.0)
+    args = parser.parse_args()
+
+    bench_db = f"{os.environ['DB_NAME']}_bench"
+    mongo = MongoClient(os.environ["MONGO_URL"])
+    mongo.drop_database(bench_db)
+    mongo[bench_db].projects.insert_many(fixtures.projects(200))
+    try:
+        for enabled in ("false", "true"):
+            env = {"DB_NAME": bench_db, "RATE_LIMITS_ENABLED": enabled, "RATE_LIMIT_TRUST_PROXY": "true"}
+            proc, url = _start_server(args.workers, env)
+            try:
+                run_load(url, [READ_PATH], 1, 4, 2.0)  # warm caches and pools
+                print(f"admission control {'on' if enabled == 'true' else 'off'}:")
+                _print("  idle", run_load(url, [READ_PATH], 1, 4, args.duration))
+                reads, outcomes = _flood(url, args.bot_processes, args.bots, args.addresses, args.duration)
+                _print("  flood", reads)
+                print("  writes " + ", ".join(f"{code}: {count:,}" for code, count in sorted(outcomes.items())))
+            finally:
+                proc.terminate()
+                proc.wait()
+            mongo[bench_db].contact_submissions.drop()
+    finally:
+        mongo.drop_database(bench_db)
+
+
+if __name__ == "__main__":
+    main()
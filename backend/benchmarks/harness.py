@@ -0,0 +1,197 @@
+"""Micro-benchmark harness for the backend's CPU hot spots.
+
+Run from the ``backend`` directory::
+
+    python -m benchmarks                     # run every benchmark
+    python -m benchmarks -k pdf              # only names containing "pdf"
+    python -m benchmarks --save-baseline     # record the current numbers
+    python -m benchmarks --compare           # fail on regressions vs. the baseline
+
+A benchmark is a setup function registered with ``@benchmark``. It builds its
+fixtures and returns the zero-argument operation to time (plain or async).
+"""
+import argparse
+import asyncio
+import gc
+import inspect
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+BASELINE_PATH = Path(__file__).parent / "baseline.json"
+DEFAULT_THRESHOLD = float(os.environ.get("BENCH_THRESHOLD", "0.10"))
+
+ROUNDS = 5
+ALLOC_SAMPLES = 5
+
+
+@dataclass
+class Benchmark:
+    name: str
+    setup: Callable[[], Callable]
+    min_time: float
+
+
+@dataclass
+class Result:
+    name: str
+    ops_per_sec: float
+    stdev_pct: float
+    peak_bytes_per_op: int
+    retained_bytes_per_op: int
+
+
+_registry: Dict[str, Benchmark] = {}
+
+
+def benchmark(name: str, min_time: float = 1.0):
+    def decorator(setup):
+        _registry[name] = Benchmark(name=name, setup=setup, min_time=min_time)
+        return setup
+    return decorator
+
+
+def _runner(op: Callable) -> Callable[[int], float]:
+    """Return a function that runs ``op`` n times and reports elapsed seconds."""
+    if inspect.iscoroutinefunction(op):
+        loop = asyncio.new_event_loop()
+
+        async def _loop(n):
+            start = time.perf_counter()
+            for _ in range(n):
+                await op()
+            return time.perf_counter() - start
+
+        return lambda n: loop.run_until_complete(_loop(n))
+
+    def _sync(n):
+        start = time.perf_counter()
+        for _ in range(n):
+            op()
+        return time.perf_counter() - start
+
+    return _sync
+
+
+def _calibrate(run: Callable[[int], float], target: float) -> int:
+    n = 1
+    while True:
+        elapsed = run(n)
+        if elapsed >= target or n >= 1_000_000:
+            return n
+        n = max(n * 2, int(n * target / max(elapsed, 1e-9)))
+
+
+def _measure_allocations(run: Callable[[int], float]) -> Tuple[int, int]:
+    gc.collect()
+    tracemalloc.start()
+    try:
+        peaks = []
+        before, _ = tracemalloc.get_traced_memory()
+        for _ in range(ALLOC_SAMPLES):
+            current, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            run(1)
+            _, peak = tracemalloc.get_traced_memory()
+            peaks.append(peak - current)
+        gc.collect()
+        after, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return int(statistics.median(peaks)), max(0, (after - before) // ALLOC_SAMPLES)
+
+
+def run_benchmark(bench: Benchmark) -> Result:
+    run = _runner(bench.setup())
+    run(1)  # warm up caches, lazy imports and the like
+    n = _calibrate(run, bench.min_time / ROUNDS)
+    rates = [n / run(n) for _ in range(ROUNDS)]
+    peak, retained = _measure_allocations(run)
+    median = statistics.median(rates)
+    stdev = statistics.stdev(rates) / median * 100 if len(rates) > 1 else 0.0
+    return Result(bench.name, median, stdev, peak, retained)
+
+
+def load_baseline(path: Path = BASELINE_PATH) -> Dict[str, dict]:
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text())
+
+
+def save_baseline(results: List[Result], path: Path = BASELINE_PATH) -> None:
+    baseline = load_baseline(path)
+    baseline.update({r.name: asdict(r) for r in results})
+    path.write_text(json.dumps(baseline, indent=2, sort_keys=True) + "\n")
+
+
+def find_regressions(results: List[Result], baseline: Dict[str, dict], threshold: float) -> List[str]:
+    regressions = []
+    for r in results:
+        base = baseline.get(r.name)
+        if not base:
+            continue
+        if r.ops_per_sec < base["ops_per_sec"] * (1 - threshold):
+            regressions.append(
+                f"{r.name}: {r.ops_per_sec:,.1f} ops/s vs baseline {base['ops_per_sec']:,.1f} ops/s"
+            )
+        if base["peak_bytes_per_op"] and r.peak_bytes_per_op > base["peak_bytes_per_op"] * (1 + threshold):
+            regressions.append(
+                f"{r.name}: {r.peak_bytes_per_op:,} B/op peak vs baseline {base['peak_bytes_per_op']:,} B/op"
+            )
+    return regressions
+
+
+def _format(r: Result, base: Optional[dict]) -> str:
+    line = (
+        f"{r.name:<40} {r.ops_per_sec:>14,.1f} ops/s  ±{r.stdev_pct:4.1f}%"
+        f"  {r.peak_bytes_per_op / 1024:>10,.1f} KiB/op peak"
+        f"  {r.retained_bytes_per_op / 1024:>8,.1f} KiB/op retained"
+    )
+    if base:
+        change = (r.ops_per_sec / base["ops_per_sec"] - 1) * 100
+        line += f"  ({change:+.1f}% vs baseline)"
+    return line
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Run backend micro-benchmarks")
+    parser.add_argument("-k", "--filter", help="only run benchmarks whose name contains this string")
+    parser.add_argument("--list", action="store_true", help="list benchmarks and exit")
+    parser.add_argument("--save-baseline", action="store_true", help="store results as the new baseline")
+    parser.add_argument("--compare", action="store_true", help="exit non-zero if results regress vs. the baseline")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="allowed regression as a fraction (default: %(default)s, env BENCH_THRESHOLD)")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH, help="baseline file (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    selected = [b for name, b in sorted(_registry.items()) if not args.filter or args.filter in name]
+    if args.list:
+        for bench in selected:
+            print(bench.name)
+        return 0
+
+    baseline = load_baseline(args.baseline)
+    results = []
+    for bench in selected:
+        result = run_benchmark(bench)
+        results.append(result)
+        print(_format(result, baseline.get(result.name)), flush=True)
+
+    if args.save_baseline:
+        save_baseline(results, args.baseline)
+        print(f"Baseline saved to {args.baseline}")
+
+    if args.compare:
+        regressions = find_regressions(results, baseline, args.threshold)
+        if regressions:
+            print(f"\nRegressions beyond {args.threshold:.0%}:", file=sys.stderr)
+            for line in regressions:
+                print(f"  {line}", file=sys.stderr)
+            return 1
+    return 0
@@ -0,0 +1,82 @@
+"""Cost of ``Idempotency-Key`` handling on the non-replay path.
+
+Times N contact-submission inserts done directly, then the same inserts
+through ``IdempotencyStore.run`` with a fresh key each (claim + store: two
+extra round trips), then replays served from the front cache and from Mongo.
+Uses a throwaway ``<DB_NAME>_bench`` database.
+
+    python -m benchmarks.idempotency_overhead --requests 2000
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+import uuid
+from pathlib import Path
+
+from dotenv import load_dotenv
+from fastapi.encoders import jsonable_encoder
+from motor.motor_asyncio import AsyncIOMotorClient
+
+import idempotency
+from benchmarks import fixtures
+
+load_dotenv(Path(__file__).parent.parent / ".env")
+
+
+async def _timed(n: int, op) -> list:
+    timings = []
+    for i in range(n):
+        start = time.perf_counter()
+        await op(i)
+        timings.append((time.perf_counter() - start) * 1e6)
+    return timings
+
+
+def _report(label: str, timings: list, baseline: float = None) -> float:
+    median = statistics.median(timings)
+    extra = f"   ({median - baseline:+,.0f} µs)" if baseline is not None else ""
+    print(f"  {label:<28} p50 {median:>8,.0f} µs   p95 {sorted(timings)[int(len(timings) * 0.95)]:>8,.0f} µs{extra}")
+    return median
+
+
+async def run(requests: int) -> None:
+    client = AsyncIOMotorClient(os.environ["MONGO_URL"])
+    database = client[f"{os.environ['DB_NAME']}_bench"]
+    await database.contact_submissions.drop()
+    await database[idempotency.COLLECTION].drop()
+    store = idempotency.IdempotencyStore()
+    await store.ensure_indexes(database)
+    docs = fixtures.contact_submissions(requests * 2)
+
+    async def insert(doc):
+        await database.contact_submissions.insert_one(dict(doc))
+        return jsonable_encoder({k: v for k, v in doc.items() if k != "_id"})
+
+    keys = [str(uuid.uuid4()) for _ in range(requests)]
+    print(f"{requests:,} requests:")
+    direct = _report("no key", await _timed(requests, lambda i: insert(docs[i])))
+
+    async def keyed(i):
+        doc = docs[requests + i]
+        await store.run(database, "contact", keys[i], idempotency.fingerprint(jsonable_encoder(doc)), lambda: insert(doc))
+    _report("fresh key", await _timed(requests, keyed), direct)
+    _report("replay (front cache)", await _timed(requests, keyed), direct)
+    store._cache.clear()
+    _report("replay (Mongo)", await _timed(requests, keyed), direct)
+
+    await database.contact_submissions.drop()
+    await database[idempotency.COLLECTION].drop()
+    client.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure Idempotency-Key overhead")
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+    asyncio.run(run(args.requests))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Gallery upload: one request per image vs one batch request.
+
+Starts ``serve.py`` against a throwaway ``<DB_NAME>_bench`` database and
+uploads the same gallery (``--images`` files of ``--kilobytes`` each) to a
+project through ``POST /api/admin/projects/{id}/images`` one file at a time,
+then through ``/images/batch`` in one multipart request, and reports the
+wall time of each.
+
+    python -m benchmarks.image_upload --images 50 --kilobytes 400 --rounds 5
+"""
+import argparse
+import os
+import statistics
+import time
+from pathlib import Path
+
+import requests
+from dotenv import load_dotenv
+from pymongo import MongoClient
+
+from benchmarks import fixtures
+from benchmarks.loadtest import _start_server
+
+load_dotenv(Path(__file__).parent.parent / ".env")
+
+
+def _per_file(session: requests.Session, url: str, gallery: list) -> None:
+    for name, content in gallery:
+        response = session.post(url, files={"file": (name, content, "image/jpeg")})
+        response.raise_for_status()
+
+
+def _batch(session: requests.Session, url: str, gallery: list) -> None:
+    response = session.post(f"{url}/batch", files=[("files", (name, content, "image/jpeg")) for name, content in gallery])
+    response.raise_for_status()
+    if response.json()["failed"]:
+        raise RuntimeError(response.json())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare per-file and batch gallery uploads")
+    parser.add_argument("--images", type=int, default=50)
+    parser.add_argument("--kilobytes", type=int, default=400, help="size of each image")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--workers", type=int, default=1)
+    args = parser.parse_args()
+
+    bench_db = f"{os.environ['DB_NAME']}_bench"
+    mongo = MongoClient(os.environ["MONGO_URL"])
+    mongo.drop_database(bench_db)
+    project = fixtures.projects(1)[0]
+    mongo[bench_db].projects.insert_one(dict(project))
+    # Random bytes: the server stores uploads as-is, so content only matters for size
+    gallery = [(f"gallery-{i:03d}.jpg", os.urandom(args.kilobytes * 1024)) for i in range(args.images)]
+
+    proc, url = _start_server(args.workers, {"DB_NAME": bench_db})
+    try:
+        session = requests.Session()
+        token = session.post(f"{url}/api/admin/login", json={"username": "v", "password": "a1b-2c3.d4e-5f6"})
+        session.headers["Authorization"] = f"Bearer {token.json()['access_token']}"
+        upload_url = f"{url}/api/admin/projects/{project['id']}/images"
+        for label, upload in (("per-file", _per_file), ("batch", _batch)):
+            timings = []
+            for _ in range(args.rounds):
+                start = time.perf_counter()
+                upload(session, upload_url, gallery)
+                timings.append(time.perf_counter() - start)
+            median = statistics.median(timings)
+            print(f"{label:<9} {median * 1000:9.1f} ms per gallery   {args.images / median:8.1f} images/s"
+                  f"   (min {min(timings) * 1000:.1f} ms, {args.rounds} rounds)", flush=True)
+    finally:
+        proc.terminate()
+        proc.wait()
+        images = mongo[bench_db].projects.find_one({"id": project["id"]})["images"]
+        for image_url in images:
+            Path(image_url.lstrip("/")).unlink(missing_ok=True)
+        mongo.drop_database(bench_db)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Throughput of the background job queue against a real MongoDB.
+
+Enqueues N no-op jobs, then measures how fast W workers drain them.
+Uses a throwaway ``<DB_NAME>_bench`` database.
+
+    python -m benchmarks.job_queue --jobs 5000 --workers 1,4,16
+"""
+import argparse
+import asyncio
+import os
+import time
+from pathlib import Path
+
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from jobs import JobQueue
+
+load_dotenv(Path(__file__).parent.parent / ".env")
+
+
+async def run(jobs: int, workers: int, concurrency: int) -> None:
+    client = AsyncIOMotorClient(os.environ["MONGO_URL"])
+    collection = client[f"{os.environ['DB_NAME']}_bench"]["jobs"]
+    await collection.drop()
+
+    queue = JobQueue(workers=workers, poll_interval=0.05)
+    done = asyncio.Event()
+    completed = 0
+
+    @queue.handler("noop", concurrency=concurrency)
+    async def noop(job):
+        nonlocal completed
+        completed += 1
+        if completed == jobs:
+            done.set()
+
+    queue.collection = collection
+    await queue.ensure_indexes()
+    start = time.perf_counter()
+    for i in range(jobs):
+        await queue.enqueue("noop", {"n": i}, priority=i % 3)
+    enqueue_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    await queue.start(collection)
+    await done.wait()
+    drain_seconds = time.perf_counter() - start
+    await queue.stop()
+    await collection.drop()
+    client.close()
+
+    print(f"workers={workers:<3} enqueue {jobs / enqueue_seconds:>9,.0f} jobs/s"
+          f"   drain {jobs / drain_seconds:>9,.0f} jobs/s   ({drain_seconds:.2f}s for {jobs:,} jobs)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the background job queue")
+    parser.add_argument("--jobs", type=int, default=2000)
+    parser.add_argument("--workers", default="1,4,16", help="comma-separated worker counts")
+    args = parser.parse_args()
+    for workers in [int(n) for n in args.workers.split(",")]:
+        asyncio.run(run(args.jobs, workers, concurrency=workers))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""HTTP load-test suite for the API.
+
+Drives keep-alive HTTP/1.1 connections from several client processes (so the
+load generator itself isn't limited to one core) and reports throughput and
+latency percentiles.
+
+    # against an already running server
+    python -m benchmarks.loadtest --url http://127.0.0.1:8001 --path /api/projects
+
+    # scaling efficiency: start serve.py with 1, 2 and 4 workers in turn
+    python -m benchmarks.loadtest --scale 1,2,4 --path /api/projects --path /api/testimonials
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import requests
+
+
+async def _connection(host: str, port: int, paths: List[str], deadline: float, latencies: List[float]) -> int:
+    reader, writer = await asyncio.open_connection(host, port)
+    requests_sent = 0
+    try:
+        while time.perf_counter() < deadline:
+            path = paths[requests_sent % len(paths)]
+            start = time.perf_counter()
+            writer.write(f"GET {path} HTTP/1.1\r\nHost: {host}\r\nAccept-Encoding: identity\r\n\r\n".encode())
+            await writer.drain()
+            headers = await reader.readuntil(b"\r\n\r\n")
+            length = 0
+            for line in headers.split(b"\r\n"):
+                if line.lower().startswith(b"content-length:"):
+                    length = int(line.split(b":", 1)[1])
+            await reader.readexactly(length)
+            latencies.append(time.perf_counter() - start)
+            requests_sent += 1
+    finally:
+        writer.close()
+    return requests_sent
+
+
+def _client_process(url: str, paths: List[str], connections: int, duration: float, queue) -> None:
+    parts = urlsplit(url)
+    latencies: List[float] = []
+
+    async def run():
+        deadline = time.perf_counter() + duration
+        return await asyncio.gather(*(
+            _connection(parts.hostname, parts.port or 80, paths, deadline, latencies) for _ in range(connections)
+        ))
+
+    asyncio.run(run())
+    queue.put(latencies)
+
+
+def run_load(url: str, paths: List[str], processes: int, connections: int, duration: float) -> dict:
+    queue = multiprocessing.Queue()
+    workers = [
+        multiprocessing.Process(target=_client_process, args=(url, paths, connections, duration, queue))
+        for _ in range(processes)
+    ]
+    for worker in workers:
+        worker.start()
+    latencies = sorted(latency for _ in workers for latency in queue.get())
+    for worker in workers:
+        worker.join()
+    if not latencies:
+        raise RuntimeError("no requests completed")
+    return {
+        "requests": len(latencies),
+        "rps": len(latencies) / duration,
+        "p50": latencies[len(latencies) // 2],
+        "p99": latencies[int(len(latencies) * 0.99)],
+        "mean": statistics.fmean(latencies),
+    }
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _start_server(workers: int, env: Optional[Dict[str, str]] = None) -> Tuple[subprocess.Popen, str]:
+    port = _free_port()
+    proc = subprocess.Popen(
+        [sys.executable, "serve.py", "--host", "127.0.0.1", "--port", str(port), "--workers", str(workers)],
+        env={**os.environ, **(env or {})},
+    )
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        try:
+            if requests.get(f"{url}/api/health/ready", timeout=1).status_code == 200:
+                return proc, url
+        except requests.ConnectionError:
+            pass
+        time.sleep(0.1)
+    proc.terminate()
+    raise TimeoutError("server did not become ready")
+
+
+def _print(label: str, result: dict) -> None:
+    print(f"{label:<12} {result['rps']:>10,.0f} req/s   p50 {result['p50'] * 1000:7.2f} ms"
+          f"   p99 {result['p99'] * 1000:7.2f} ms   ({result['requests']:,} requests)", flush=True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load-test the API")
+    parser.add_argument("--url", default="http://127.0.0.1:8001")
+    parser.add_argument("--path", action="append", dest="paths", help="request path (repeatable)")
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--client-processes", type=int, default=max(1, (multiprocessing.cpu_count() or 2) // 2))
+    parser.add_argument("--connections", type=int, default=32, help="connections per client process")
+    parser.add_argument("--scale", help="comma-separated worker counts; starts serve.py for each")
+    args = parser.parse_args()
+    paths = args.paths or ["/api/projects"]
+
+    if not args.scale:
+        _print("load", run_load(args.url, paths, args.client_processes, args.connections, args.duration))
+        return
+
+    baseline = None
+    for workers in [int(n) for n in args.scale.split(",")]:
+        proc, url = _start_server(workers)
+        try:
+            run_load(url, paths, args.client_processes, args.connections, 2.0)  # warm caches and pools
+            result = run_load(url, paths, args.client_processes, args.connections, args.duration)
+        finally:
+            proc.terminate()
+            proc.wait()
+        baseline = baseline or result["rps"]
+        _print(f"{workers} worker(s)", result)
+        print(f"{'':<12} speed-up {result['rps'] / baseline:5.2f}x   efficiency {result['rps'] / (baseline * workers):6.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Query latency of the search engines at realistic corpus sizes.
+
+Indexes N synthetic documents (split evenly across projects, testimonials
+and contact submissions) and times a fixed set of queries. The in-memory
+index runs anywhere; ``--backend mongo`` uses a throwaway ``<DB_NAME>_bench``
+database with the same text indexes the API creates.
+
+    python -m benchmarks.search_latency --docs 100000
+    python -m benchmarks.search_latency --docs 100000 --backend mongo
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import time
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+import search
+from benchmarks import fixtures
+
+load_dotenv(Path(__file__).parent.parent / ".env")
+
+QUERIES = ["firewall", "website redesign", "kumar", "payment gateway migration", "aws", "logistics", "nonexistent"]
+GENERATORS = {
+    "projects": fixtures.make_project,
+    "testimonials": fixtures.make_testimonial,
+    "contact_submissions": fixtures.make_contact_submission,
+}
+
+
+def _documents(count: int):
+    rng = random.Random(0)
+    for i in range(count):
+        kind = list(GENERATORS)[i % len(GENERATORS)]
+        yield kind, GENERATORS[kind](rng)
+
+
+async def _load(engine, database, count: int) -> float:
+    start = time.perf_counter()
+    if database is None:
+        for kind, doc in _documents(count):
+            engine.index(kind, doc)
+    else:
+        batches = {kind: [] for kind in GENERATORS}
+        for kind, doc in _documents(count):
+            batches[kind].append(doc)
+        for kind, docs in batches.items():
+            await database[kind].drop()
+            await database[kind].insert_many(docs)
+        await engine.ensure_indexes(database)
+    return time.perf_counter() - start
+
+
+async def run(backend: str, docs: int, repeat: int, page_size: int) -> None:
+    engine = search.create_engine(backend)
+    client = database = None
+    if backend == "mongo":
+        from motor.motor_asyncio import AsyncIOMotorClient
+        client = AsyncIOMotorClient(os.environ["MONGO_URL"])
+        database = client[f"{os.environ['DB_NAME']}_bench"]
+
+    load_seconds = await _load(engine, database, docs)
+    print(f"{backend}: indexed {docs:,} documents in {load_seconds:.1f}s")
+    kinds = list(search.SEARCH_FIELDS)
+    for query in QUERIES:
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            total, hits = await engine.search(database, query, kinds, 0, page_size)
+            timings.append((time.perf_counter() - start) * 1000)
+        timings.sort()
+        print(f"  {query!r:<30} {total:>7,} hits   p50 {statistics.median(timings):7.2f} ms"
+              f"   p95 {timings[int(len(timings) * 0.95) - 1]:7.2f} ms")
+
+    if client is not None:
+        await client.drop_database(database.name)
+        client.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark search query latency")
+    parser.add_argument("--backend", choices=["memory", "mongo"], default="memory")
+    parser.add_argument("--docs", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--page-size", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(run(args.backend, args.docs, args.repeat, args.page_size))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Cold-start benchmark for the API worker.
+
+Measures, over several fresh interpreters:
+
+* ``import server`` wall time,
+* time from process spawn until ``/api/health/live`` answers,
+* time until ``/api/health/ready`` reports a warm worker (needs Mongo),
+* latency of the first real request (``GET /api/projects``).
+
+Run from the ``backend`` directory: ``python -m benchmarks.startup [--runs 5]``.
+"""
+import argparse
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+import requests
+
+IMPORT_SNIPPET = "import time; t = time.perf_counter(); import server; print(time.perf_counter() - t)"
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def measure_import() -> float:
+    output = subprocess.run([sys.executable, "-c", IMPORT_SNIPPET], check=True, capture_output=True, text=True)
+    return float(output.stdout.strip().splitlines()[-1])
+
+
+def _wait_for(url: str, deadline: float, ok=lambda r: r.status_code == 200) -> float:
+    while time.perf_counter() < deadline:
+        try:
+            if ok(requests.get(url, timeout=1)):
+                return time.perf_counter()
+        except requests.ConnectionError:
+            pass
+        time.sleep(0.005)
+    raise TimeoutError(url)
+
+
+def measure_server(timeout: float = 30.0) -> dict:
+    port = _free_port()
+    base = f"http://127.0.0.1:{port}/api"
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "server:app", "--port", str(port), "--log-level", "warning"],
+    )
+    try:
+        deadline = start + timeout
+        live = _wait_for(f"{base}/health/live", deadline)
+        ready = _wait_for(f"{base}/health/ready", deadline)
+        request_start = time.perf_counter()
+        requests.get(f"{base}/projects", timeout=timeout).raise_for_status()
+        first_request = time.perf_counter() - request_start
+        request_start = time.perf_counter()
+        requests.get(f"{base}/projects", timeout=timeout).raise_for_status()
+        second_request = time.perf_counter() - request_start
+    finally:
+        proc.terminate()
+        proc.wait()
+    return {
+        "live": live - start,
+        "ready": ready - start,
+        "first_request": first_request,
+        "second_request": second_request,
+    }
+
+
+def _report(label: str, samples) -> None:
+    print(f"{label:<28} median {statistics.median(samples) * 1000:8.1f} ms   "
+          f"min {min(samples) * 1000:8.1f} ms   max {max(samples) * 1000:8.1f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure worker cold start and first-request latency")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--import-only", action="store_true", help="skip the uvicorn/Mongo measurements")
+    args = parser.parse_args()
+
+    _report("import server", [measure_import() for _ in range(args.runs)])
+    if args.import_only:
+        return
+
+    runs = [measure_server() for _ in range(args.runs)]
+    for key in ("live", "ready", "first_request", "second_request"):
+        _report(key.replace("_", " "), [run[key] for run in runs])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""Thundering-herd benchmark for single-flight request coalescing.
+
+Fires bursts of identical concurrent requests at the app in-process (right
+after a cache invalidation, the worst case) with coalescing off and on, and
+reports how many Mongo ``find`` commands each burst cost and the latency the
+callers saw. Uses a throwaway ``<DB_NAME>_bench`` database.
+
+    python -m benchmarks.thundering_herd --concurrency 500 --rounds 5
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+from pathlib import Path
+from typing import List, Tuple
+
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import monitoring
+
+load_dotenv(Path(__file__).parent.parent / ".env")
+
+import server  # noqa: E402  (needs the environment loaded first)
+from benchmarks import fixtures  # noqa: E402
+
+
+class CommandCounter(monitoring.CommandListener):
+    def __init__(self):
+        self.counts = {}
+
+    def started(self, event):
+        self.counts[event.command_name] = self.counts.get(event.command_name, 0) + 1
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
+async def _get(path: str) -> Tuple[int, float]:
+    """Minimal in-process ASGI GET; returns (status, completion time)."""
+    raw_path, _, query = path.partition("?")
+    scope = {
+        "type": "http", "http_version": "1.1", "method": "GET", "scheme": "http", "path": raw_path,
+        "raw_path": raw_path.encode(), "query_string": query.encode(), "root_path": "",
+        "headers": [(b"host", b"bench"), (b"accept-encoding", b"identity")],
+        "client": ("127.0.0.1", 0), "server": ("bench", 80),
+    }
+    response = {}
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            response["status"] = message["status"]
+
+    await server.app(scope, receive, send)
+    return response["status"], time.perf_counter()
+
+
+async def _burst(path: str, concurrency: int, counter: CommandCounter) -> Tuple[int, List[float]]:
+    server.public_cache.invalidate()
+    before = counter.counts.get("find", 0)
+    # Latency is measured from the start of the burst: every caller arrived at once
+    start = time.perf_counter()
+    results = await asyncio.gather(*(_get(path) for _ in range(concurrency)))
+    statuses = {code for code, _ in results}
+    if statuses != {200}:
+        raise RuntimeError(f"{path} returned {statuses}")
+    return counter.counts.get("find", 0) - before, [done - start for _, done in results]
+
+
+async def run(concurrency: int, rounds: int, projects: int) -> None:
+    counter = CommandCounter()
+    client = AsyncIOMotorClient(os.environ["MONGO_URL"], event_listeners=[counter])
+    database = client[f"{os.environ['DB_NAME']}_bench"]
+    docs = fixtures.projects(projects)
+    await database.projects.drop()
+    await database.projects.insert_many([dict(doc) for doc in docs])
+    server.client, server.db = client, database
+
+    paths = ["/api/projects?featured_only=true", "/api/projects", f"/api/projects/{docs[0]['id']}"]
+    for enabled in (False, True):
+        server.flights.enabled = enabled
+        print(f"single-flight {'on' if enabled else 'off'}:")
+        for path in paths:
+            finds, latencies = 0, []
+            for _ in range(rounds):
+                burst_finds, burst_latencies = await _burst(path, concurrency, counter)
+                finds += burst_finds
+                latencies.extend(burst_latencies)
+            latencies.sort()
+            print(f"  {path:<45} {finds / rounds:>7.1f} finds/burst   p50 {statistics.median(latencies) * 1000:8.1f} ms"
+                  f"   p99 {latencies[int(len(latencies) * 0.99) - 1] * 1000:8.1f} ms")
+
+    await database.projects.drop()
+    client.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure request coalescing under a thundering herd")
+    parser.add_argument("--concurrency", type=int, default=500)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--projects", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(run(args.concurrency, args.rounds, args.projects))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""Response caches for the API workers.
+
+``SharedResponseCache`` keeps serialized response bodies in files under a
+shared directory (``/dev/shm`` when available) that every worker memory-maps,
+so N workers share one copy of each body through the page cache instead of
+holding N private copies. A hit is a ``memoryview`` of the mapping, so
+serving it copies nothing into the worker either.
+
+Invalidation is a generation counter living in a small memory-mapped file.
+Entries are stored under the generation that was current *before* the data
+was loaded, so bumping the counter from any worker instantly hides every
+older entry from all workers, including one whose load raced the write.
+Bumps are serialized with an exclusive ``flock`` on that file, so two
+workers invalidating at once move it forward twice rather than once.
+"""
+import hashlib
+import mmap
+import os
+import struct
+import tempfile
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-worker development only
+    fcntl = None
+
+_GENERATION = struct.Struct("<Q")
+
+
+def default_cache_dir() -> Path:
+    if os.environ.get("SHARED_CACHE_DIR"):
+        return Path(os.environ["SHARED_CACHE_DIR"])
+    base = Path("/dev/shm") if Path("/dev/shm").is_dir() else Path(tempfile.gettempdir())
+    return base / "netrik-response-cache"
+
+
+class SharedResponseCache:
+    def __init__(self, directory: Optional[Path] = None):
+        self.directory = Path(directory or default_cache_dir())
+        self._generation_map: Optional[mmap.mmap] = None
+        self._generation_fd: Optional[int] = None
+        self._entries: Dict[str, Tuple[int, mmap.mmap]] = {}
+        self._entries_generation = -1
+
+    def _open(self) -> mmap.mmap:
+        if self._generation_map is None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            path = self.directory / "generation"
+            fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+            try:
+                if os.fstat(fd).st_size < _GENERATION.size:
+                    os.write(fd, _GENERATION.pack(0))
+                self._generation_map = mmap.mmap(fd, _GENERATION.size)
+            except BaseException:
+                os.close(fd)
+                raise
+            # Kept open for the lock that serializes invalidate()
+            self._generation_fd = fd
+        return self._generation_map
+
+    def generation(self) -> int:
+        return _GENERATION.unpack_from(self._open())[0]
+
+    def _path(self, key: str, generation: int) -> Path:
+        digest = hashlib.sha1(key.encode("utf-8")).hexdigest()
+        return self.directory / f"{generation}.{digest}"
+
+    def _drop_entries(self) -> None:
+        for _, mapped in self._entries.values():
+            try:
+                mapped.close()
+            except BufferError:
+                pass  # a response is still sending from it; unmapped once its view is released
+        self._entries.clear()
+
+    def get(self, key: str, generation: Optional[int] = None) -> Optional[memoryview]:
+        if generation is None:
+            generation = self.generation()
+        if generation != self._entries_generation:
+            self._drop_entries()
+            self._entries_generation = generation
+
+        entry = self._entries.get(key)
+        if entry is None:
+            try:
+                with open(self._path(key, generation), "rb") as f:
+                    mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except (FileNotFoundError, ValueError):
+                return None
+            entry = self._entries[key] = (generation, mapped)
+        return memoryview(entry[1])
+
+    def set(self, key: str, body: bytes, generation: int) -> None:
+        if not body:
+            return
+        self._open()
+        path = self._path(key, generation)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(body)
+            os.replace(tmp_path, path)
+        except OSError:
+            Path(tmp_path).unlink(missing_ok=True)
+
+    def invalidate(self) -> int:
+        """Bump the generation; every worker stops serving older entries at once."""
+        generation_map = self._open()
+        if fcntl is not None:
+            fcntl.flock(self._generation_fd, fcntl.LOCK_EX)
+        try:
+            generation = _GENERATION.unpack_from(generation_map)[0] + 1
+            _GENERATION.pack_into(generation_map, 0, generation)
+        finally:
+            if fcntl is not None:
+                fcntl.flock(self._generation_fd, fcntl.LOCK_UN)
+        for path in self.directory.iterdir():
+            prefix = path.name.split(".", 1)[0]
+            if prefix.isdigit() and int(prefix) < generation:
+                try:
+                    path.unlink()
+                except OSError:
+                    pass  # still mapped on platforms that forbid unlinking open files
+        return generation
+
+
+class TTLCache:
+    """Small per-process cache whose entries expire ``ttl`` seconds after being set."""
+
+    def __init__(self, ttl: float, maxsize: int = 128):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+
+    def get(self, key: str) -> Any:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        return value
+
+    def set(self, key: str, value: Any) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
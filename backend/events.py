@@ -0,0 +1,260 @@
+"""Admin events shared by every worker, delivered as server-sent events.
+
+``EventBroker.publish`` takes the next number from a sequence in the
+``counters`` collection and writes the event to the ``admin_events``
+collection. Every worker tails that collection and hands each event, in
+sequence order, to its own subscribers' bounded queues without awaiting, so a
+publisher never waits on slow clients and every admin stream sees every
+event, whichever worker accepted the write.
+
+Two storage modes (``EVENT_STORAGE``), as for status checks:
+
+* ``capped`` (default): a capped collection read through a tailable cursor.
+* ``ttl``: a plain collection with a TTL on ``published_at``, polled; for
+  servers without capped collections or tailable cursors.
+
+Event ids are ``<epoch>:<seq>``; the epoch is fixed when the sequence is
+created. A subscriber whose queue fills up is disconnected; its browser
+reconnects (possibly to another worker) with ``Last-Event-ID`` and catches up
+from that worker's replay buffer. It is told to ``resync`` instead when it
+missed more than the buffer holds or the id was not issued by this sequence.
+"""
+import asyncio
+import json
+import logging
+import time
+import uuid
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import AsyncIterator, Deque, Dict, Optional, Set
+
+from pymongo import ASCENDING, CursorType, DESCENDING, ReturnDocument
+from pymongo.errors import CollectionInvalid, DuplicateKeyError, OperationFailure
+
+logger = logging.getLogger(__name__)
+
+HEARTBEAT_SECONDS = 15.0
+COLLECTION = "admin_events"
+COUNTERS = "counters"
+SEQUENCE = "admin_events"
+NAMESPACE_EXISTS = 48
+
+
+@dataclass
+class Event:
+    id: Optional[str]
+    seq: int
+    type: str
+    data: str
+    published_at: float
+
+    def encode(self) -> bytes:
+        frame = f"event: {self.type}\ndata: {self.data}\n\n"
+        return (f"id: {self.id}\n" + frame if self.id is not None else frame).encode("utf-8")
+
+
+class Subscriber:
+    def __init__(self, queue_size: int):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.overflowed = False
+        # Already seen elsewhere: the client resumed from a worker whose tail was ahead of ours
+        self.after = 0
+
+
+class EventBroker:
+    def __init__(
+        self,
+        replay_size: int = 1000,
+        queue_size: int = 256,
+        storage: str = "capped",
+        capped_bytes: int = 8 * 2**20,
+        retention_hours: float = 24,
+        poll_interval: float = 0.5,
+        gap_timeout: float = 2.0,
+    ):
+        if storage not in ("capped", "ttl"):
+            raise ValueError(f"Unknown event storage: {storage}")
+        self.queue_size = queue_size
+        self.storage = storage
+        self.capped_bytes = capped_bytes
+        self.retention_hours = retention_hours
+        self.poll_interval = poll_interval
+        self.gap_timeout = gap_timeout
+        self.database = None
+        self.epoch: Optional[str] = None
+        self._delivered = 0
+        self._pending: Dict[int, tuple] = {}
+        self._replay: Deque[Event] = deque(maxlen=replay_size)
+        self._subscribers: Set[Subscriber] = set()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    async def ensure_storage(self, database) -> None:
+        collection = database[COLLECTION]
+        if self.storage == "capped":
+            if COLLECTION not in await database.list_collection_names(filter={"name": COLLECTION}):
+                try:
+                    await database.create_collection(COLLECTION, capped=True, size=self.capped_bytes)
+                except CollectionInvalid:
+                    pass  # another worker created it first
+                except OperationFailure as e:
+                    if e.code != NAMESPACE_EXISTS:
+                        raise
+        else:
+            await collection.create_index("published_at", expireAfterSeconds=int(self.retention_hours * 3600))
+        await collection.create_index([("epoch", ASCENDING), ("seq", ASCENDING)])
+
+    async def start(self, database) -> None:
+        # No Mongo round trips here: the tail loop retries (and logs) until the database is reachable
+        self.database = database
+        self._task = asyncio.create_task(self._tail())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _sequence(self, increment: int) -> dict:
+        for _ in range(2):
+            try:
+                return await self.database[COUNTERS].find_one_and_update(
+                    {"_id": SEQUENCE},
+                    {"$inc": {"seq": increment}, "$setOnInsert": {"epoch": uuid.uuid4().hex}},
+                    upsert=True,
+                    return_document=ReturnDocument.AFTER,
+                )
+            except DuplicateKeyError:
+                continue  # another worker created the sequence first
+        raise RuntimeError("Could not create the admin event sequence")
+
+    async def publish(self, event_type: str, payload) -> Optional[Event]:
+        """Append an event to the shared channel. Failures are logged, never raised to the caller."""
+        try:
+            counter = await self._sequence(1)
+            doc = {
+                "epoch": counter["epoch"],
+                "seq": counter["seq"],
+                "type": event_type,
+                "data": json.dumps(payload, separators=(",", ":")),
+                "published_at": datetime.utcnow(),
+            }
+            await self.database[COLLECTION].insert_one(doc)
+        except Exception as e:
+            logger.warning("Could not publish %s event: %s", event_type, e)
+            return None
+        return self._event(doc)
+
+    @staticmethod
+    def _event(doc: dict) -> Event:
+        return Event(f"{doc['epoch']}:{doc['seq']}", doc["seq"], doc["type"], doc["data"], time.perf_counter())
+
+    async def _load(self) -> None:
+        # Start at the head of the sequence, with the latest events as replay for reconnecting clients
+        counter = await self._sequence(0)
+        recent = await self.database[COLLECTION].find(
+            {"epoch": counter["epoch"], "seq": {"$lte": counter["seq"]}}, {"_id": 0}
+        ).sort("seq", DESCENDING).limit(self._replay.maxlen).to_list(self._replay.maxlen)
+        self._replay.extend(self._event(doc) for doc in reversed(recent))
+        self._delivered = recent[0]["seq"] if recent else counter["seq"]
+        self.epoch = counter["epoch"]
+
+    def _cursor(self):
+        query = {"epoch": self.epoch, "seq": {"$gt": self._delivered}}
+        if self.storage == "capped":
+            return self.database[COLLECTION].find(query, {"_id": 0}, cursor_type=CursorType.TAILABLE_AWAIT)
+        return self.database[COLLECTION].find(query, {"_id": 0}).sort("seq", ASCENDING)
+
+    async def _tail(self) -> None:
+        while True:
+            try:
+                if self.epoch is None:
+                    await self._load()
+                cursor = self._cursor()
+                while cursor.alive:
+                    async for doc in cursor:
+                        self._receive(doc)
+                    self._drain()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Tailing admin events failed: %s", e)
+            self._drain()
+            await asyncio.sleep(self.poll_interval)
+
+    def _receive(self, doc: dict) -> None:
+        if doc["seq"] > self._delivered:
+            self._pending.setdefault(doc["seq"], (self._event(doc), time.monotonic()))
+
+    def _drain(self) -> None:
+        # Workers insert concurrently, so seq n+1 can land before n. Hold later events back until the
+        # gap fills, or for gap_timeout when its publisher died between taking the number and inserting.
+        while self._pending:
+            seq = min(self._pending)
+            event, received_at = self._pending[seq]
+            if seq != self._delivered + 1 and time.monotonic() - received_at < self.gap_timeout:
+                return
+            del self._pending[seq]
+            self._delivered = seq
+            self.dispatch(event)
+
+    def dispatch(self, event: Event) -> None:
+        """Hand an event to this worker's subscribers (called by the tail loop, in sequence order)."""
+        self._replay.append(event)
+        for subscriber in list(self._subscribers):
+            if event.seq <= subscriber.after:
+                continue
+            try:
+                subscriber.queue.put_nowait(event)
+            except asyncio.QueueFull:
+                # Slow client: drop it rather than buffer without bound; it resumes via Last-Event-ID
+                subscriber.overflowed = True
+                self._subscribers.discard(subscriber)
+
+    def subscribe(self, last_event_id: Optional[str] = None) -> Subscriber:
+        subscriber = Subscriber(max(self.queue_size, len(self._replay) + 1))
+        if last_event_id is not None:
+            epoch, _, seq = last_event_id.partition(":")
+            if self.epoch is None or epoch != self.epoch or not seq.isdigit():
+                # Not issued by this sequence (or we don't know it yet): nothing to resume from
+                subscriber.queue.put_nowait(self._resync_event())
+            elif int(seq) >= self._delivered:
+                subscriber.after = int(seq)
+            elif self._replay and int(seq) >= self._replay[0].seq - 1:
+                for event in self._replay:
+                    if event.seq > int(seq):
+                        subscriber.queue.put_nowait(event)
+            else:
+                # Missed more than the replay buffer holds
+                subscriber.queue.put_nowait(self._resync_event())
+        self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        self._subscribers.discard(subscriber)
+
+    def _resync_event(self) -> Event:
+        event_id = f"{self.epoch}:{self._delivered}" if self.epoch is not None else None
+        return Event(event_id, self._delivered, "resync", "{}", time.perf_counter())
+
+    async def stream(self, subscriber: Subscriber, heartbeat: float = HEARTBEAT_SECONDS) -> AsyncIterator[bytes]:
+        """Yield SSE frames for ``subscriber`` until it overflows or the client goes away."""
+        try:
+            yield b"retry: 3000\n\n"
+            while True:
+                try:
+                    event = await asyncio.wait_for(subscriber.queue.get(), heartbeat)
+                except asyncio.TimeoutError:
+                    if subscriber.overflowed:
+                        return
+                    yield b": heartbeat\n\n"
+                    continue
+                yield event.encode()
+                if subscriber.overflowed and subscriber.queue.empty():
+                    return
+        finally:
+            self.unsubscribe(subscriber)
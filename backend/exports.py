@@ -0,0 +1,91 @@
+"""Streaming NDJSON/CSV encoders for admin exports.
+
+Rows are encoded as they arrive from a Motor cursor and flushed in chunks of
+roughly ``CHUNK_SIZE`` bytes, so memory stays flat no matter how many
+documents are exported.
+"""
+import csv
+import io
+import json
+from datetime import datetime
+from typing import AsyncIterable, AsyncIterator, Callable, Dict, Iterable, List
+
+CHUNK_SIZE = 64 * 1024
+
+CONTACT_SUBMISSION_COLUMNS = ["id", "name", "email", "phone", "service", "message", "is_read", "submitted_at"]
+QUOTATION_COLUMNS = [
+    "id", "quote_number", "client_name", "client_email", "client_phone", "client_address", "status",
+    "subtotal", "tax_rate", "tax_amount", "total_amount", "created_at", "valid_until", "notes",
+]
+QUOTATION_ITEM_COLUMNS = ["item_index", "item_description", "item_quantity", "item_unit_price", "item_total"]
+
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv; charset=utf-8"}
+
+
+def _default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _cell(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def contact_submission_rows(doc: dict) -> Iterable[List]:
+    yield [_cell(doc.get(column)) for column in CONTACT_SUBMISSION_COLUMNS]
+
+
+def quotation_rows(doc: dict) -> Iterable[List]:
+    """One CSV row per line item, with the quotation's fields repeated."""
+    base = [_cell(doc.get(column)) for column in QUOTATION_COLUMNS]
+    items = doc.get("items") or []
+    if not items:
+        yield base + [None] * len(QUOTATION_ITEM_COLUMNS)
+    for index, item in enumerate(items, start=1):
+        yield base + [index, item.get("description"), item.get("quantity"), item.get("unit_price"), item.get("total")]
+
+
+async def ndjson_stream(docs: AsyncIterable[dict]) -> AsyncIterator[bytes]:
+    buffer = []
+    size = 0
+    async for doc in docs:
+        doc.pop("_id", None)
+        line = json.dumps(doc, default=_default, ensure_ascii=False, separators=(",", ":")) + "\n"
+        buffer.append(line)
+        size += len(line)
+        if size >= CHUNK_SIZE:
+            yield "".join(buffer).encode("utf-8")
+            buffer.clear()
+            size = 0
+    if buffer:
+        yield "".join(buffer).encode("utf-8")
+
+
+async def csv_stream(
+    docs: AsyncIterable[dict], header: List[str], rows: Callable[[dict], Iterable[List]]
+) -> AsyncIterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(header)
+    async for doc in docs:
+        writer.writerows(rows(doc))
+        if buffer.tell() >= CHUNK_SIZE:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+EXPORTS: Dict[str, tuple] = {
+    "contact_submissions": (CONTACT_SUBMISSION_COLUMNS, contact_submission_rows),
+    "quotations": (QUOTATION_COLUMNS + QUOTATION_ITEM_COLUMNS, quotation_rows),
+}
+
+
+def encode(kind: str, export_format: str, docs: AsyncIterable[dict]) -> AsyncIterator[bytes]:
+    if export_format == "ndjson":
+        return ndjson_stream(docs)
+    header, rows = EXPORTS[kind]
+    return csv_stream(docs, header, rows)
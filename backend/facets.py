@@ -0,0 +1,105 @@
+"""Precomputed category/tag facets for the public portfolio.
+
+``FacetIndex`` holds per-category and per-tag counts plus a tag -> project
+posting list, so facet chips and "related projects" never scan the
+collection. Each worker keeps its own copy. Writes made by this worker patch
+it in place; writes from other workers are noticed through the shared
+response-cache generation, and the index reloads (one small projected query)
+the next time it is used.
+"""
+import asyncio
+import heapq
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Set, Tuple
+
+_PROJECTION = {"_id": 0, "id": 1, "category": 1, "tags": 1, "completion_date": 1}
+
+
+def _naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    # Mongo hands dates back naive UTC; a model straight from a request may carry an offset
+    if value is not None and value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+class FacetIndex:
+    def __init__(self):
+        self.generation = -1
+        self._lock = asyncio.Lock()
+        self._projects: Dict[str, Tuple[str, Tuple[str, ...], Optional[datetime]]] = {}
+        self._categories: Counter = Counter()
+        self._tags: Counter = Counter()
+        self._tagged: Dict[str, Set[str]] = {}
+
+    async def sync(self, database, generation: int) -> None:
+        """Reload from Mongo unless the index is already current for ``generation``."""
+        if self.generation == generation:
+            return
+        async with self._lock:
+            if self.generation == generation:
+                return
+            docs = await database.projects.find({}, _PROJECTION).to_list(None)
+            self._clear()
+            for doc in docs:
+                self.apply(doc)
+            self.generation = generation
+
+    def advance(self, before: int, after: int) -> None:
+        # Only our own bump happened since the index was current: local patches already cover it
+        if self.generation == before and after == before + 1:
+            self.generation = after
+
+    def _clear(self) -> None:
+        self._projects.clear()
+        self._categories.clear()
+        self._tags.clear()
+        self._tagged.clear()
+
+    def apply(self, project: dict) -> None:
+        self.remove(project["id"])
+        tags = tuple(dict.fromkeys(project.get("tags") or []))
+        self._projects[project["id"]] = (project["category"], tags, _naive_utc(project.get("completion_date")))
+        self._categories[project["category"]] += 1
+        for tag in tags:
+            self._tags[tag] += 1
+            self._tagged.setdefault(tag, set()).add(project["id"])
+
+    def remove(self, project_id: str) -> None:
+        entry = self._projects.pop(project_id, None)
+        if entry is None:
+            return
+        category, tags, _ = entry
+        self._categories[category] -= 1
+        if not self._categories[category]:
+            del self._categories[category]
+        for tag in tags:
+            self._tags[tag] -= 1
+            if not self._tags[tag]:
+                del self._tags[tag]
+            self._tagged[tag].discard(project_id)
+            if not self._tagged[tag]:
+                del self._tagged[tag]
+
+    def __contains__(self, project_id: str) -> bool:
+        return project_id in self._projects
+
+    def counts(self) -> dict:
+        def ranked(counter: Counter) -> List[dict]:
+            return [{"value": value, "count": count} for value, count in sorted(counter.items(), key=lambda kv: (-kv[1], kv[0]))]
+        return {"total": len(self._projects), "categories": ranked(self._categories), "tags": ranked(self._tags)}
+
+    def related(self, project_id: str, limit: int) -> List[str]:
+        """Project ids sharing the most tags with ``project_id``; ties go to the most recently completed."""
+        _, tags, _ = self._projects[project_id]
+        overlap: Counter = Counter()
+        for tag in tags:
+            overlap.update(self._tagged.get(tag, ()))
+        overlap.pop(project_id, None)
+        oldest = datetime.min
+
+        def rank(item):
+            other_id, shared = item
+            return shared, self._projects[other_id][2] or oldest
+
+        return [other_id for other_id, _ in heapq.nlargest(limit, overlap.items(), key=rank)]
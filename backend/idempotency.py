@@ -0,0 +1,123 @@
+"""``Idempotency-Key`` support for POST endpoints that create documents.
+
+The first request with a key claims it in the ``idempotency_keys`` collection,
+runs the handler and stores the response there. Retries with the same key get
+the stored response back without the handler running again. Completed
+records are also kept in a per-process front cache, so most replays never
+reach Mongo.
+
+* Concurrent requests with the same key in one worker share a single
+  execution; in other workers they wait for the claim to complete.
+* A key reused with a different request body is rejected (422).
+* Failed requests release their claim so the client can retry.
+* Records expire after ``ttl`` seconds (TTL index on ``expires_at``).
+"""
+import asyncio
+import hashlib
+import json
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from fastapi import HTTPException, status
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from cache import TTLCache
+from singleflight import SingleFlight
+
+COLLECTION = "idempotency_keys"
+IN_PROGRESS, DONE = "in_progress", "done"
+
+
+def fingerprint(payload: Any) -> str:
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+class IdempotencyStore:
+    def __init__(self, ttl: float = 86400, wait_timeout: float = 30, lock_seconds: float = 60, cache_size: int = 1024):
+        self.ttl = ttl
+        self.wait_timeout = wait_timeout
+        self.lock_seconds = lock_seconds
+        self._cache = TTLCache(ttl=ttl, maxsize=cache_size)
+        self._flights = SingleFlight(timeout=wait_timeout)
+
+    async def ensure_indexes(self, database) -> None:
+        await database[COLLECTION].create_index("expires_at", expireAfterSeconds=0)
+
+    async def run(
+        self, database, scope: str, key: str, request_fingerprint: str, handler: Callable[[], Awaitable[Dict[str, Any]]]
+    ) -> Tuple[Dict[str, Any], bool]:
+        """Return ``(record, replayed)``; ``record["body"]`` is the JSON-ready response of ``handler``."""
+        record_id = f"{scope}:{key}"
+        record = self._cache.get(record_id)
+        executed = False
+        if record is None:
+            async def execute():
+                nonlocal executed
+                record = await self._claim_or_wait(database, record_id, request_fingerprint)
+                if record is None:
+                    executed = True
+                    record = await self._execute(database, record_id, request_fingerprint, handler)
+                # Another worker's claim may still be in progress; only a finished response can be replayed
+                if record["status"] == DONE:
+                    self._cache.set(record_id, record)
+                return record
+            try:
+                record = await self._flights.do(record_id, execute)
+            except asyncio.TimeoutError:
+                raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="A request with this Idempotency-Key is still in progress")
+        if record["fingerprint"] != request_fingerprint:
+            raise HTTPException(status_code=422, detail="Idempotency-Key was already used with a different request")
+        if record["status"] != DONE:
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="A request with this Idempotency-Key is still in progress")
+        return record, not executed
+
+    async def _claim_or_wait(self, database, record_id: str, request_fingerprint: str) -> Optional[Dict[str, Any]]:
+        """Claim the key (returns None) or return the record of whoever holds it.
+
+        That record is completed, or still in progress for a request with a
+        different fingerprint.
+        """
+        collection = database[COLLECTION]
+        deadline = asyncio.get_running_loop().time() + self.wait_timeout
+        while True:
+            now = datetime.utcnow()
+            try:
+                await collection.insert_one({
+                    "_id": record_id,
+                    "status": IN_PROGRESS,
+                    "fingerprint": request_fingerprint,
+                    "locked_until": now + timedelta(seconds=self.lock_seconds),
+                    "expires_at": now + timedelta(seconds=self.ttl),
+                })
+                return None
+            except DuplicateKeyError:
+                pass
+            existing = await collection.find_one({"_id": record_id})
+            if existing is None:
+                continue  # expired or released between the insert and the read
+            if existing["status"] == DONE or existing["fingerprint"] != request_fingerprint:
+                return existing
+            # Take over a claim whose holder died without releasing it
+            if existing["locked_until"] < now:
+                taken = await collection.find_one_and_update(
+                    {"_id": record_id, "status": IN_PROGRESS, "locked_until": existing["locked_until"]},
+                    {"$set": {"locked_until": now + timedelta(seconds=self.lock_seconds)}},
+                    return_document=ReturnDocument.AFTER,
+                )
+                if taken is not None:
+                    return None
+            if asyncio.get_running_loop().time() >= deadline:
+                raise asyncio.TimeoutError()
+            await asyncio.sleep(0.1)
+
+    async def _execute(self, database, record_id: str, request_fingerprint: str, handler) -> Dict[str, Any]:
+        collection = database[COLLECTION]
+        try:
+            body = await handler()
+        except BaseException:
+            await collection.delete_one({"_id": record_id, "status": IN_PROGRESS})
+            raise
+        record = {"_id": record_id, "status": DONE, "fingerprint": request_fingerprint, "body": body}
+        await collection.update_one({"_id": record_id}, {"$set": {"status": DONE, "body": body}})
+        return record
@@ -0,0 +1,232 @@
+"""In-process background jobs persisted in a Mongo collection.
+
+Routes enqueue work and return a job id; a small pool of asyncio workers in
+each API process claims jobs atomically (highest priority first), runs the
+registered handler and records progress, result or error on the job document.
+
+* Failed jobs are retried with exponential backoff up to ``max_attempts``.
+* Each job type has a concurrency limit (per process).
+* A claimed job holds a lease. If the process dies the lease expires and any
+  worker picks the job up again, so unfinished work resumes after a restart.
+  That counts as an attempt too: a job whose lease expires on its last
+  attempt (say it crashes the worker every time) is marked failed instead.
+"""
+import asyncio
+import logging
+import os
+import socket
+import time
+import traceback
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from pymongo import ASCENDING, DESCENDING, ReturnDocument
+
+logger = logging.getLogger(__name__)
+
+QUEUED, RUNNING, SUCCEEDED, FAILED = "queued", "running", "succeeded", "failed"
+
+
+class PermanentJobError(Exception):
+    """Raised by a handler when retrying cannot help (e.g. the target document is gone)."""
+
+
+@dataclass
+class JobType:
+    name: str
+    handler: Callable[..., Awaitable[Optional[dict]]]
+    concurrency: int
+    max_attempts: int
+    retry_backoff: float
+
+
+class JobContext:
+    """Handed to job handlers to report progress (which also renews the lease)."""
+
+    def __init__(self, queue: "JobQueue", job: dict):
+        self.queue = queue
+        self.job = job
+
+    @property
+    def payload(self) -> dict:
+        return self.job["payload"]
+
+    async def progress(self, fraction: float, message: Optional[str] = None) -> None:
+        update = {"progress": max(0.0, min(1.0, fraction)), "lease_until": self.queue._lease_deadline()}
+        if message is not None:
+            update["message"] = message
+        await self.queue.collection.update_one({"id": self.job["id"]}, {"$set": update})
+
+
+class JobQueue:
+    def __init__(self, workers: int = 2, poll_interval: float = 1.0, lease_seconds: int = 600):
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self.collection = None
+        self._types: Dict[str, JobType] = {}
+        self._running: Dict[str, int] = {}
+        self._tasks = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._claim_lock: Optional[asyncio.Lock] = None
+        self._swept_at = 0.0
+
+    def handler(self, name: str, concurrency: int = 1, max_attempts: int = 3, retry_backoff: float = 5.0):
+        def decorator(func):
+            self._types[name] = JobType(name, func, concurrency, max_attempts, retry_backoff)
+            self._running.setdefault(name, 0)
+            return func
+        return decorator
+
+    def _lease_deadline(self) -> datetime:
+        return datetime.utcnow() + timedelta(seconds=self.lease_seconds)
+
+    async def enqueue(self, job_type: str, payload: Dict[str, Any], priority: int = 0) -> dict:
+        if job_type not in self._types:
+            raise ValueError(f"Unknown job type: {job_type}")
+        now = datetime.utcnow()
+        job = {
+            "id": str(uuid.uuid4()),
+            "type": job_type,
+            "payload": payload,
+            "status": QUEUED,
+            "priority": priority,
+            "attempts": 0,
+            "max_attempts": self._types[job_type].max_attempts,
+            "progress": 0.0,
+            "message": None,
+            "result": None,
+            "error": None,
+            "created_at": now,
+            "run_at": now,
+            "started_at": None,
+            "finished_at": None,
+            "lease_until": None,
+            "worker": None,
+        }
+        await self.collection.insert_one(dict(job))
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return job
+
+    async def get(self, job_id: str) -> Optional[dict]:
+        return await self.collection.find_one({"id": job_id}, {"_id": 0})
+
+    async def ensure_indexes(self) -> None:
+        await self.collection.create_index([("status", ASCENDING), ("priority", DESCENDING), ("created_at", ASCENDING)])
+        await self.collection.create_index("id", unique=True)
+
+    async def start(self, collection) -> None:
+        # No Mongo round trips here: workers just poll (and log) until the database is reachable
+        self.collection = collection
+        self._wakeup = asyncio.Event()
+        self._claim_lock = asyncio.Lock()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        # Hand our in-flight jobs back instead of waiting for their leases to expire
+        try:
+            await self.collection.update_many(
+                {"status": RUNNING, "worker": self.worker_id},
+                {"$set": {"status": QUEUED, "lease_until": None, "worker": None}, "$inc": {"attempts": -1}},
+            )
+        except Exception as e:
+            logger.warning("Could not requeue running jobs: %s", e)
+
+    async def _claim(self) -> Optional[dict]:
+        available = [name for name, t in self._types.items() if self._running[name] < t.concurrency]
+        if not available:
+            return None
+        now = datetime.utcnow()
+        if time.monotonic() - self._swept_at >= self.poll_interval:
+            self._swept_at = time.monotonic()
+            await self._fail_abandoned(now)
+        return await self.collection.find_one_and_update(
+            {
+                "type": {"$in": available},
+                "$or": [
+                    {"status": QUEUED, "run_at": {"$lte": now}},
+                    {"status": RUNNING, "lease_until": {"$lt": now},
+                     "$expr": {"$lt": ["$attempts", "$max_attempts"]}},
+                ],
+            },
+            {
+                "$set": {"status": RUNNING, "started_at": now, "lease_until": self._lease_deadline(),
+                         "worker": self.worker_id},
+                "$inc": {"attempts": 1},
+            },
+            sort=[("priority", DESCENDING), ("created_at", ASCENDING)],
+            return_document=ReturnDocument.AFTER,
+        )
+
+    async def _fail_abandoned(self, now: datetime) -> None:
+        # Lease expired on the last attempt: the worker died running it, so don't hand it out again
+        result = await self.collection.update_many(
+            {"status": RUNNING, "lease_until": {"$lt": now}, "$expr": {"$gte": ["$attempts", "$max_attempts"]}},
+            {"$set": {"status": FAILED, "finished_at": now, "lease_until": None, "worker": None,
+                      "error": "Lease expired on the last attempt (the worker running it stopped)"}},
+        )
+        if result.modified_count:
+            logger.warning("Failed %d jobs whose lease expired on their last attempt", result.modified_count)
+
+    async def _worker(self) -> None:
+        while True:
+            try:
+                # Claims are serialized so the per-type running counts can't be overshot
+                async with self._claim_lock:
+                    job = await self._claim()
+                    if job is not None:
+                        self._running[job["type"]] += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Job claim failed: %s", e)
+                job = None
+            if job is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            try:
+                await self._execute(job)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Recording the outcome failed; the job keeps its lease and is claimed again once it expires
+                logger.warning("Could not record outcome of job %s (%s): %s", job["id"], job["type"], e)
+
+    async def _execute(self, job: dict) -> None:
+        job_type = self._types[job["type"]]
+        try:
+            result = await job_type.handler(JobContext(self, job))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.exception("Job %s (%s) failed", job["id"], job["type"])
+            error = "".join(traceback.format_exception_only(type(e), e)).strip()
+            if job["attempts"] < job["max_attempts"] and not isinstance(e, PermanentJobError):
+                delay = job_type.retry_backoff * 2 ** (job["attempts"] - 1)
+                update = {"status": QUEUED, "run_at": datetime.utcnow() + timedelta(seconds=delay)}
+            else:
+                update = {"status": FAILED, "finished_at": datetime.utcnow()}
+            await self.collection.update_one(
+                {"id": job["id"]}, {"$set": {**update, "error": error, "lease_until": None, "worker": None}}
+            )
+        else:
+            await self.collection.update_one(
+                {"id": job["id"]},
+                {"$set": {"status": SUCCEEDED, "result": result, "progress": 1.0, "error": None,
+                          "finished_at": datetime.utcnow(), "lease_until": None}},
+            )
+        finally:
+            self._running[job_type.name] -= 1
+            self._wakeup.set()
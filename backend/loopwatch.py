@@ -0,0 +1,205 @@
+"""Event-loop lag monitor and blocking-call detector.
+
+A heartbeat task sleeps ``interval`` seconds at a time and records how late
+each wake-up was: that overshoot is the event-loop lag every request on the
+worker saw at that moment. A watchdog thread checks the heartbeat; once the
+loop has not come back for ``threshold`` seconds it captures the loop
+thread's stack (which, while the loop is stuck, is the blocking call itself)
+and the route of the request whose task was running. When the loop recovers
+the stall is recorded with its full duration and aggregated per route and
+call site, for the admin diagnostics endpoint.
+
+``LoopWatchMiddleware`` maps each request's task to its ASGI scope, and a
+task factory extends the mapping to tasks a request spawns (single-flight
+work, gathers), so stalls can be attributed. Both cost a dict insert and
+delete per task.
+"""
+import asyncio
+import heapq
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from datetime import datetime
+from typing import Dict, List, Optional
+
+STACK_LIMIT = 40
+APP_ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+def _route_of(scope: Optional[dict]) -> Optional[str]:
+    if scope is None:
+        return None
+    route = scope.get("route")
+    path = getattr(route, "path", None) or scope.get("path", "")
+    return f"{scope.get('method', '')} {path}".strip()
+
+
+def _culprit(stack: traceback.StackSummary) -> str:
+    # The innermost frame in our own code says more than a frame deep in a library
+    for frame in reversed(stack):
+        if frame.filename.startswith(APP_ROOT) and os.path.basename(frame.filename) != "loopwatch.py":
+            return f"{os.path.relpath(frame.filename, APP_ROOT)}:{frame.lineno} in {frame.name}"
+    frame = stack[-1]
+    return f"{frame.filename}:{frame.lineno} in {frame.name}"
+
+
+class LoopWatch:
+    def __init__(self, interval: float = 0.1, threshold: float = 0.1, samples: int = 6000,
+                 recent: int = 50, max_offenders: int = 200, enabled: bool = True):
+        self.interval = interval
+        self.threshold = threshold
+        self.enabled = enabled
+        self.max_offenders = max_offenders
+        self.lags = deque(maxlen=samples)
+        self.recent = deque(maxlen=recent)
+        self.offenders: Dict[tuple, dict] = {}
+        self.stalls = 0
+        self.active: Dict[asyncio.Task, dict] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._beat = 0.0
+        self._pending: Optional[dict] = None
+        self._task: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._parent_factory = None
+
+    def start(self) -> None:
+        if not self.enabled or self._task is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._parent_factory = self._loop.get_task_factory()
+        self._loop.set_task_factory(self._task_factory)
+        self._beat = time.monotonic()
+        self._stop.clear()
+        self._task = asyncio.create_task(self._heartbeat())
+        self._thread = threading.Thread(target=self._watchdog, name="loopwatch", daemon=True)
+        self._thread.start()
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._stop.set()
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        await asyncio.to_thread(self._thread.join)
+        self._loop.set_task_factory(self._parent_factory)
+        self._task = self._thread = None
+
+    def _task_factory(self, loop, coro, **kwargs):
+        if self._parent_factory is not None:
+            task = self._parent_factory(loop, coro, **kwargs)
+        else:
+            task = asyncio.Task(coro, loop=loop, **kwargs)
+        # Work a request spawns is attributed to that request
+        scope = self.active.get(asyncio.current_task(loop))
+        if scope is not None:
+            self.active[task] = scope
+            task.add_done_callback(self._forget)
+        return task
+
+    def _forget(self, task: asyncio.Task) -> None:
+        self.active.pop(task, None)
+
+    async def _heartbeat(self) -> None:
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            self._beat = now
+            lag = max(0.0, now - expected)
+            self.lags.append(lag)
+            pending = self._pending
+            if pending is not None:
+                self._pending = None
+                pending["duration_ms"] = round(lag * 1000, 1)
+                self._record(pending)
+
+    def _watchdog(self) -> None:
+        check_every = min(self.interval, self.threshold) / 2
+        while not self._stop.wait(check_every):
+            beat = self._beat
+            if self._pending is None and time.monotonic() - beat > self.interval + self.threshold:
+                stall = self._capture()
+                # The loop may have recovered while we were looking
+                if stall is not None and self._beat == beat:
+                    self._pending = stall
+
+    def _capture(self) -> Optional[dict]:
+        frame = sys._current_frames().get(self._loop_thread_id)
+        if frame is None:
+            return None
+        stack = traceback.extract_stack(frame, limit=STACK_LIMIT)
+        task = asyncio.current_task(self._loop)
+        return {
+            "at": datetime.utcnow(),
+            "route": _route_of(self.active.get(task)) or "(no request)",
+            "culprit": _culprit(stack),
+            "stack": "".join(stack.format()),
+        }
+
+    def _record(self, stall: dict) -> None:
+        self.stalls += 1
+        self.recent.append(stall)
+        key = (stall["route"], stall["culprit"])
+        offender = self.offenders.get(key)
+        if offender is None:
+            if len(self.offenders) >= self.max_offenders:
+                # Forget the offender that has cost the least
+                del self.offenders[min(self.offenders, key=lambda k: self.offenders[k]["total_ms"])]
+            offender = self.offenders[key] = {
+                "route": stall["route"], "culprit": stall["culprit"], "count": 0, "total_ms": 0.0, "max_ms": 0.0,
+            }
+        offender["count"] += 1
+        offender["total_ms"] = round(offender["total_ms"] + stall["duration_ms"], 1)
+        offender["max_ms"] = max(offender["max_ms"], stall["duration_ms"])
+        offender["stack"] = stall["stack"]
+
+    def percentiles(self) -> Dict[str, float]:
+        lags = sorted(self.lags) or [0.0]
+        result = {
+            name: round(lags[min(len(lags) - 1, int(len(lags) * q))] * 1000, 2)
+            for name, q in (("p50", 0.5), ("p90", 0.9), ("p99", 0.99))
+        }
+        result["max"] = round(lags[-1] * 1000, 2)
+        return result
+
+    def top_offenders(self, limit: int = 10) -> List[dict]:
+        return heapq.nlargest(limit, self.offenders.values(), key=lambda offender: offender["total_ms"])
+
+    def snapshot(self, limit: int = 10) -> dict:
+        return {
+            "enabled": self.enabled and self._task is not None,
+            "pid": os.getpid(),
+            "interval_ms": self.interval * 1000,
+            "threshold_ms": self.threshold * 1000,
+            "samples": len(self.lags),
+            "lag_ms": self.percentiles(),
+            "stalls": self.stalls,
+            "offenders": self.top_offenders(limit),
+            "recent": list(self.recent)[-limit:][::-1],
+        }
+
+
+class LoopWatchMiddleware:
+    """ASGI middleware recording which request each task is serving."""
+
+    def __init__(self, app, watch: LoopWatch):
+        self.app = app
+        self.watch = watch
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.watch.enabled:
+            await self.app(scope, receive, send)
+            return
+        task = asyncio.current_task()
+        # The router fills in scope["route"] in place, so the template is there by the time anything blocks
+        self.watch.active[task] = scope
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.watch.active.pop(task, None)
@@ -0,0 +1,201 @@
+"""Versioned, resumable document migrations.
+
+Each migration is a module in this package named ``v<NNNN>_<name>.py`` that
+defines:
+
+* ``collection``: the collection it rewrites;
+* ``query``: the documents that still need it (so an applied migration
+  matches nothing and re-running it is harmless);
+* ``transform(doc)``: returns the update for one document, or ``None`` to
+  leave it alone.
+
+``MigrationRunner`` applies pending migrations in version order. Each walks
+its collection in ``_id`` order, ``batch_size`` documents at a time, writing
+one unordered ``bulk_write`` per batch. After every batch the last ``_id`` is
+checkpointed in ``schema_migrations``, so an interrupted run resumes where it
+stopped; finished migrations are recorded there as applied. Runs throttle
+themselves (``max_rate`` documents read per second, written or not, and/or a
+pause proportional to each batch's write time) so they can run against
+production, and a lease-based lock keeps two runners from working at once.
+
+    python -m migrations status
+    python -m migrations run --dry-run
+    python -m migrations run --max-rate 2000
+"""
+import asyncio
+import importlib
+import logging
+import os
+import pkgutil
+import re
+import socket
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from types import ModuleType
+from typing import Callable, Dict, List, Optional
+
+from pymongo import UpdateOne
+from pymongo.errors import DuplicateKeyError
+
+logger = logging.getLogger(__name__)
+
+STATE_COLLECTION = "schema_migrations"
+LOCK_ID = "__lock__"
+APPLIED, RUNNING = "applied", "running"
+MODULE_NAME = re.compile(r"^v(\d{4})_(\w+)$")
+
+
+class MigrationLocked(Exception):
+    """Another runner holds the migration lock."""
+
+
+@dataclass
+class Migration:
+    version: str
+    name: str
+    collection: str
+    query: dict
+    transform: Callable[[dict], Optional[dict]]
+    description: str = ""
+
+    @classmethod
+    def from_module(cls, version: str, name: str, module: ModuleType) -> "Migration":
+        return cls(version, name, module.collection, module.query, module.transform, (module.__doc__ or "").strip())
+
+
+def discover() -> List[Migration]:
+    migrations = []
+    for info in pkgutil.iter_modules(__path__):
+        match = MODULE_NAME.match(info.name)
+        if match:
+            module = importlib.import_module(f"{__name__}.{info.name}")
+            migrations.append(Migration.from_module(match.group(1), match.group(2), module))
+    return sorted(migrations, key=lambda migration: migration.version)
+
+
+def fill_missing(doc: dict, defaults: Dict[str, Callable[[dict], object]]) -> Optional[dict]:
+    """``$set`` for the fields in ``defaults`` that ``doc`` lacks (each default is computed from the doc)."""
+    missing = {field: default(doc) for field, default in defaults.items() if field not in doc}
+    return {"$set": missing} if missing else None
+
+
+class MigrationRunner:
+    def __init__(
+        self, database, batch_size: int = 500, max_rate: Optional[float] = None, pause_ratio: float = 0.0,
+        lease_seconds: int = 300, migrations: Optional[List[Migration]] = None,
+    ):
+        self.database = database
+        self.state = database[STATE_COLLECTION]
+        self.batch_size = batch_size
+        self.max_rate = max_rate
+        self.pause_ratio = pause_ratio
+        self.lease_seconds = lease_seconds
+        self.migrations = migrations if migrations is not None else discover()
+        self.owner = f"{socket.gethostname()}:{os.getpid()}"
+
+    async def status(self) -> List[dict]:
+        records = {record["_id"]: record for record in await self.state.find({"_id": {"$ne": LOCK_ID}}).to_list(None)}
+        return [
+            {"version": m.version, "name": m.name, "collection": m.collection,
+             "status": records.get(m.version, {}).get("status", "pending"),
+             "touched": records.get(m.version, {}).get("touched", 0),
+             "applied_at": records.get(m.version, {}).get("applied_at")}
+            for m in self.migrations
+        ]
+
+    async def pending(self, target: Optional[str] = None) -> List[Migration]:
+        applied = {record["_id"] for record in await self.state.find({"status": APPLIED}, {"_id": 1}).to_list(None)}
+        return [m for m in self.migrations if m.version not in applied and (target is None or m.version <= target)]
+
+    async def dry_run(self, target: Optional[str] = None) -> Dict[str, int]:
+        """How many documents each pending migration would touch."""
+        return {
+            f"{m.version}_{m.name}": await self.database[m.collection].count_documents(m.query)
+            for m in await self.pending(target)
+        }
+
+    async def run(self, target: Optional[str] = None) -> Dict[str, int]:
+        await self._acquire_lock()
+        try:
+            results = {}
+            for migration in await self.pending(target):
+                results[f"{migration.version}_{migration.name}"] = await self._apply(migration)
+            return results
+        finally:
+            await self.state.delete_one({"_id": LOCK_ID, "owner": self.owner})
+
+    async def _acquire_lock(self) -> None:
+        now = datetime.utcnow()
+        lease = {"owner": self.owner, "expires_at": now + timedelta(seconds=self.lease_seconds)}
+        try:
+            # Take over a lock whose holder died, or create it
+            await self.state.update_one(
+                {"_id": LOCK_ID, "$or": [{"expires_at": {"$lt": now}}, {"owner": self.owner}]},
+                {"$set": lease}, upsert=True,
+            )
+        except DuplicateKeyError:
+            raise MigrationLocked("another migration run holds the lock") from None
+
+    async def _renew_lock(self) -> None:
+        result = await self.state.update_one(
+            {"_id": LOCK_ID, "owner": self.owner},
+            {"$set": {"expires_at": datetime.utcnow() + timedelta(seconds=self.lease_seconds)}},
+        )
+        if result.matched_count == 0:
+            raise MigrationLocked("migration lock was lost")
+
+    async def _apply(self, migration: Migration) -> int:
+        record = await self.state.find_one({"_id": migration.version}) or {}
+        last_id = record.get("last_id")
+        touched = record.get("touched", 0)
+        if last_id is not None:
+            logger.info("Resuming migration %s after _id %s", migration.version, last_id)
+        await self.state.update_one(
+            {"_id": migration.version},
+            {"$set": {"name": migration.name, "collection": migration.collection, "status": RUNNING},
+             "$setOnInsert": {"started_at": datetime.utcnow(), "touched": 0}},
+            upsert=True,
+        )
+        collection = self.database[migration.collection]
+        started, processed = time.perf_counter(), 0
+        while True:
+            query = migration.query if last_id is None else {"$and": [migration.query, {"_id": {"$gt": last_id}}]}
+            docs = await collection.find(query).sort("_id", 1).limit(self.batch_size).to_list(self.batch_size)
+            if not docs:
+                break
+            operations = []
+            for doc in docs:
+                update = migration.transform(doc)
+                if update:
+                    # Re-check the query so documents fixed concurrently are left alone
+                    operations.append(UpdateOne({"_id": doc["_id"], **migration.query}, update))
+            write_started = time.perf_counter()
+            if operations:
+                result = await collection.bulk_write(operations, ordered=False)
+                touched += result.modified_count
+            write_seconds = time.perf_counter() - write_started
+            last_id = docs[-1]["_id"]
+            # Every document read costs the server, whether or not it needed changing
+            processed += len(docs)
+            await self.state.update_one(
+                {"_id": migration.version},
+                {"$set": {"last_id": last_id, "touched": touched, "checkpoint_at": datetime.utcnow()}},
+            )
+            await self._renew_lock()
+            await self._throttle(started, processed, write_seconds)
+        await self.state.update_one(
+            {"_id": migration.version},
+            {"$set": {"status": APPLIED, "applied_at": datetime.utcnow(), "touched": touched},
+             "$unset": {"last_id": ""}},
+        )
+        logger.info("Applied migration %s_%s (%d documents)", migration.version, migration.name, touched)
+        return touched
+
+    async def _throttle(self, started: float, processed: int, write_seconds: float) -> None:
+        delay = write_seconds * self.pause_ratio
+        if self.max_rate:
+            # Sleep until the average rate since the start is back under the limit
+            delay = max(delay, processed / self.max_rate - (time.perf_counter() - started))
+        if delay > 0:
+            await asyncio.sleep(delay)
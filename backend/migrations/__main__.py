@@ -0,0 +1,48 @@
+import argparse
+import asyncio
+import logging
+import os
+from pathlib import Path
+
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from migrations import MigrationRunner
+
+load_dotenv(Path(__file__).parent.parent / ".env")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m migrations", description="Apply document migrations")
+    parser.add_argument("command", choices=["status", "run"])
+    parser.add_argument("--dry-run", action="store_true", help="only count the documents each migration would touch")
+    parser.add_argument("--target", help="apply migrations up to and including this version")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--max-rate", type=float, help="documents read per second")
+    parser.add_argument("--pause-ratio", type=float, default=0.0,
+                        help="sleep this multiple of each batch's write time (1.0 = at most 50%% duty cycle)")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+
+    async def run():
+        client = AsyncIOMotorClient(os.environ["MONGO_URL"])
+        try:
+            runner = MigrationRunner(client[os.environ["DB_NAME"]], args.batch_size, args.max_rate, args.pause_ratio)
+            if args.command == "status":
+                for row in await runner.status():
+                    print(f"{row['version']}_{row['name']:<32} {row['collection']:<22} {row['status']:<8} "
+                          f"{row['touched']:>9,} docs  {row['applied_at'] or ''}")
+            elif args.dry_run:
+                for name, count in (await runner.dry_run(args.target)).items():
+                    print(f"{name:<38} would touch {count:,} documents")
+            else:
+                for name, count in (await runner.run(args.target)).items():
+                    print(f"{name:<38} touched {count:,} documents")
+        finally:
+            client.close()
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,25 @@
+"""Store the Project fields added after launch on projects created before them.
+
+Until now pydantic filled these in on every read; ``id`` and ``created_at``
+even came out different on each request for documents without them.
+"""
+import uuid
+
+from migrations import fill_missing
+
+collection = "projects"
+
+DEFAULTS = {
+    "id": lambda doc: str(uuid.uuid4()),
+    "tags": lambda doc: [],
+    "images": lambda doc: [],
+    "featured_image": lambda doc: (doc.get("images") or [None])[0],
+    "is_featured": lambda doc: False,
+    "created_at": lambda doc: doc["_id"].generation_time.replace(tzinfo=None),
+}
+
+query = {"$or": [{field: {"$exists": False}} for field in DEFAULTS]}
+
+
+def transform(doc: dict):
+    return fill_missing(doc, DEFAULTS)
@@ -0,0 +1,20 @@
+"""Store the Testimonial fields added after launch on older testimonials."""
+import uuid
+
+from migrations import fill_missing
+
+collection = "testimonials"
+
+DEFAULTS = {
+    "id": lambda doc: str(uuid.uuid4()),
+    "company": lambda doc: None,
+    "image": lambda doc: None,
+    "is_featured": lambda doc: False,
+    "created_at": lambda doc: doc["_id"].generation_time.replace(tzinfo=None),
+}
+
+query = {"$or": [{field: {"$exists": False}} for field in DEFAULTS]}
+
+
+def transform(doc: dict):
+    return fill_missing(doc, DEFAULTS)
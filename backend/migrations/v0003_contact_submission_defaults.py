@@ -0,0 +1,22 @@
+"""Store ``is_read`` and friends on contact submissions that predate them.
+
+Submissions without ``is_read`` were shown as unread by the model default but
+never matched the ``is_read=false`` filter or the dashboard's unread count.
+"""
+import uuid
+
+from migrations import fill_missing
+
+collection = "contact_submissions"
+
+DEFAULTS = {
+    "id": lambda doc: str(uuid.uuid4()),
+    "is_read": lambda doc: False,
+    "submitted_at": lambda doc: doc["_id"].generation_time.replace(tzinfo=None),
+}
+
+query = {"$or": [{field: {"$exists": False}} for field in DEFAULTS]}
+
+
+def transform(doc: dict):
+    return fill_missing(doc, DEFAULTS)
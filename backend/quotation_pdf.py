@@ -0,0 +1,161 @@
+"""Quotation PDF rendering. Imported lazily by ``server.generate_quotation_pdf``."""
+import io
+
+from reportlab.lib.pagesizes import A4
+from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, PageBreak
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.units import inch
+from reportlab.lib import colors
+from reportlab.lib.enums import TA_CENTER
+
+import quotations
+
+# Item rows that fit below the letterhead on page one, and on each later page
+FIRST_PAGE_ROWS = 10
+ROWS_PER_PAGE = 27
+
+ITEMS_HEADER = ["Description", "Qty", "Unit Price (RM)", "Total (RM)"]
+ITEMS_COL_WIDTHS = [3*inch, 0.8*inch, 1.2*inch, 1.2*inch]
+HEADER_ROW_STYLE = [
+    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#f1f5f9')),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.HexColor('#1e293b')),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+]
+CELL_STYLE = [
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('ALIGN', (0, 1), (0, -1), 'LEFT'),
+    ('FONTSIZE', (0, 0), (-1, -1), 10),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
+]
+TOTAL_ROW_STYLE = [
+    ('FONTNAME', (2, -1), (-1, -1), 'Helvetica-Bold'),
+    ('BACKGROUND', (2, -1), (-1, -1), colors.HexColor('#f1f5f9')),
+]
+# One style shared by every page chunk: header row, item rows, then the page subtotal row
+PAGE_CHUNK_STYLE = TableStyle(HEADER_ROW_STYLE + CELL_STYLE + [
+    ('GRID', (0, 0), (-1, -2), 1, colors.black),
+    ('LINEBELOW', (2, -1), (-1, -1), 1, colors.black),
+    ('FONTNAME', (2, -1), (-1, -1), 'Helvetica-Oblique'),
+])
+
+
+def _item_row(item) -> list:
+    return [item.description, str(item.quantity), f"{item.unit_price:.2f}", f"{item.total:.2f}"]
+
+
+def _item_pages(items) -> list:
+    """One table per page: repeated header row, the page's items and their subtotal."""
+    flowables = []
+    start, size = 0, FIRST_PAGE_ROWS
+    while start < len(items):
+        chunk = items[start:start + size]
+        subtotal = quotations.sum_money(item.total for item in chunk)
+        rows = [ITEMS_HEADER, *map(_item_row, chunk), ["", "", "Page subtotal:", f"{subtotal:.2f}"]]
+        # repeatRows keeps the header if an unusually tall chunk still has to split
+        table = Table(rows, colWidths=ITEMS_COL_WIDTHS, repeatRows=1)
+        table.setStyle(PAGE_CHUNK_STYLE)
+        if flowables:
+            flowables.append(PageBreak())
+        flowables.append(table)
+        start, size = start + size, ROWS_PER_PAGE
+    return flowables
+
+
+def render_quotation_pdf(quotation) -> io.BytesIO:
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=A4)
+    
+    # Get the default stylesheet
+    styles = getSampleStyleSheet()
+    
+    # Create custom styles
+    title_style = ParagraphStyle(
+        'CustomTitle',
+        parent=styles['Heading1'],
+        fontSize=24,
+        spaceAfter=30,
+        alignment=TA_CENTER,
+        textColor=colors.HexColor('#1e293b')
+    )
+    
+    # Build the PDF content
+    content = []
+    
+    # Title
+    content.append(Paragraph("QUOTATION", title_style))
+    content.append(Spacer(1, 20))
+    
+    # Company header
+    company_info = [
+        ["Netrik Techworks", ""],
+        ["Professional IT Services", ""],
+        ["Malaysia", ""],
+        ["Phone: +60 12-495 3622", f"Quote #: {quotation.quote_number}"],
+        ["Email: info@netriktechworks.com", f"Date: {quotation.created_at.strftime('%d/%m/%Y')}"],
+        ["", f"Valid Until: {quotation.valid_until.strftime('%d/%m/%Y')}"]
+    ]
+    
+    company_table = Table(company_info, colWidths=[3*inch, 2*inch])
+    company_table.setStyle(TableStyle([
+        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+        ('FONTNAME', (0, 0), (0, 2), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, -1), 10),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
+    ]))
+    
+    content.append(company_table)
+    content.append(Spacer(1, 30))
+    
+    # Client information
+    client_info = [
+        ["Bill To:", ""],
+        [quotation.client_name, ""],
+        [quotation.client_address, ""],
+        [f"Phone: {quotation.client_phone}", ""],
+        [f"Email: {quotation.client_email}", ""]
+    ]
+    
+    client_table = Table(client_info, colWidths=[3*inch, 2*inch])
+    client_table.setStyle(TableStyle([
+        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+        ('FONTNAME', (0, 0), (0, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, -1), 10),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
+    ]))
+    
+    content.append(client_table)
+    content.append(Spacer(1, 30))
+    
+    # Items table (chunked per page once it no longer fits on the first one)
+    totals_rows = [
+        ["", "", "Subtotal:", f"{quotation.subtotal:.2f}"],
+        ["", "", f"GST ({quotation.tax_rate*100:.0f}%):", f"{quotation.tax_amount:.2f}"],
+        ["", "", "Total:", f"{quotation.total_amount:.2f}"]
+    ]
+    # A single table only when items and totals fit the rows of a first-page chunk (items plus subtotal)
+    if len(quotation.items) + len(totals_rows) <= FIRST_PAGE_ROWS + 1:
+        items_table = Table([ITEMS_HEADER, *map(_item_row, quotation.items), *totals_rows], colWidths=ITEMS_COL_WIDTHS)
+        items_table.setStyle(TableStyle(HEADER_ROW_STYLE + CELL_STYLE + [
+            ('GRID', (0, 0), (-1, -4), 1, colors.black),
+            ('LINEBELOW', (2, -3), (-1, -1), 1, colors.black),
+            *TOTAL_ROW_STYLE,
+        ]))
+        content.append(items_table)
+    else:
+        content.extend(_item_pages(quotation.items))
+        totals_table = Table(totals_rows, colWidths=ITEMS_COL_WIDTHS)
+        totals_table.setStyle(TableStyle(CELL_STYLE + [
+            ('LINEBELOW', (2, 0), (-1, -1), 1, colors.black),
+            *TOTAL_ROW_STYLE,
+        ]))
+        content.append(totals_table)
+    
+    if quotation.notes:
+        content.append(Spacer(1, 30))
+        content.append(Paragraph("Notes:", styles['Heading3']))
+        content.append(Paragraph(quotation.notes, styles['Normal']))
+    
+    # Build the PDF
+    doc.build(content)
+    buffer.seek(0)
+    return buffer
@@ -0,0 +1,143 @@
+"""Quotation lifecycle: allowed status transitions and expiry.
+
+``draft -> sent -> accepted`` is the happy path; ``draft`` and ``sent`` may
+also be rejected, and ``accepted``/``rejected`` are final. Open quotations
+past ``valid_until`` are moved to ``rejected`` by ``expire``, which runs
+periodically in every worker and is safe to run concurrently.
+"""
+import asyncio
+import logging
+import uuid
+from datetime import datetime
+from decimal import ROUND_HALF_UP, Decimal
+from typing import Dict, Iterable, Optional
+
+from pymongo import ASCENDING, DESCENDING, ReturnDocument
+from pymongo.errors import DuplicateKeyError, OperationFailure
+
+import analytics
+
+logger = logging.getLogger(__name__)
+
+STATUSES = ("draft", "sent", "accepted", "rejected")
+OPEN_STATUSES = ("draft", "sent")
+TRANSITIONS = {
+    "draft": {"sent", "rejected"},
+    "sent": {"accepted", "rejected"},
+    "accepted": set(),
+    "rejected": set(),
+}
+EXPIRED_STATUS = "rejected"
+CENT = Decimal("0.01")
+# Quote numbers come from a counter that only moves forward: deleting or
+# archiving quotations must never make an old number come round again
+COUNTERS = "counters"
+QUOTE_COUNTER = "quote_number"
+
+
+def to_money(value) -> Decimal:
+    # str() first so 0.1 becomes Decimal("0.1"), not its binary approximation
+    return Decimal(str(value))
+
+
+def sum_money(values: Iterable) -> Decimal:
+    return sum(map(to_money, values), Decimal(0)).quantize(CENT, rounding=ROUND_HALF_UP)
+
+
+def compute_totals(item_totals: Iterable, tax_rate) -> Dict[str, float]:
+    """Subtotal, tax and grand total rounded to the cent with exact decimal arithmetic."""
+    subtotal = sum_money(item_totals)
+    tax_amount = (subtotal * to_money(tax_rate)).quantize(CENT, rounding=ROUND_HALF_UP)
+    return {"subtotal": float(subtotal), "tax_amount": float(tax_amount), "total_amount": float(subtotal + tax_amount)}
+
+
+def can_transition(current: str, new: str) -> bool:
+    return new in TRANSITIONS.get(current, ())
+
+
+async def ensure_indexes(database) -> None:
+    # List filters all sort newest first; amount is the trailing range key
+    await database.quotations.create_index(
+        [("status", ASCENDING), ("created_at", DESCENDING), ("total_amount", ASCENDING)]
+    )
+    await database.quotations.create_index([("client_email", ASCENDING), ("created_at", DESCENDING)])
+    # Unfiltered listings and exports: without it a full export is a blocking in-memory sort
+    await database.quotations.create_index([("created_at", DESCENDING)])
+    # "Expiring soon" filter and the expiry sweep
+    await database.quotations.create_index([("status", ASCENDING), ("valid_until", ASCENDING)])
+    try:
+        await database.quotations.create_index("quote_number", unique=True)
+    except OperationFailure as e:
+        # Numbers handed out twice under the old count-based scheme; fix those by hand
+        logger.warning("Could not create unique quote_number index: %s", e)
+
+
+def _quote_sequence(quote_number: str) -> int:
+    try:
+        return int(quote_number.rsplit("-", 1)[1])
+    except (AttributeError, IndexError, ValueError):
+        return 0
+
+
+async def ensure_quote_counter(database) -> None:
+    """Create the counter above every number already issued (hot or archived)."""
+    if await database[COUNTERS].find_one({"_id": QUOTE_COUNTER}):
+        return
+    highest = 0
+    for name in ("quotations", "quotations_archive"):
+        highest = max(highest, await database[name].count_documents({}))
+        async for doc in database[name].find({}, {"_id": 0, "quote_number": 1}):
+            highest = max(highest, _quote_sequence(doc.get("quote_number")))
+    try:
+        await database[COUNTERS].update_one({"_id": QUOTE_COUNTER}, {"$max": {"seq": highest}}, upsert=True)
+    except DuplicateKeyError:
+        pass  # another worker created it first; $max keeps whichever is higher on the next call
+
+
+async def next_quote_number(database, now: Optional[datetime] = None) -> str:
+    now = now or datetime.now()
+    counter = await database[COUNTERS].find_one_and_update(
+        {"_id": QUOTE_COUNTER}, {"$inc": {"seq": 1}}, return_document=ReturnDocument.AFTER
+    )
+    if counter is None:
+        await ensure_quote_counter(database)
+        counter = await database[COUNTERS].find_one_and_update(
+            {"_id": QUOTE_COUNTER}, {"$inc": {"seq": 1}}, upsert=True, return_document=ReturnDocument.AFTER
+        )
+    return f"NT-{now.year}-{counter['seq']:04d}"
+
+
+async def expire(database, now: Optional[datetime] = None, batch_size: int = 500, pause: float = 0.05) -> int:
+    """Move open quotations past ``valid_until`` to ``rejected`` in batches; returns how many moved.
+
+    Each batch is tagged with a sweep id so only the quotations this call actually
+    moved are counted in the analytics rollups, even if another worker races it.
+    """
+    now = now or datetime.utcnow()
+    expired = {"status": {"$in": list(OPEN_STATUSES)}, "valid_until": {"$lt": now}}
+    moved_total = 0
+    while True:
+        batch = await database.quotations.find(expired, {"_id": 0, "id": 1, "status": 1}).limit(batch_size).to_list(batch_size)
+        if not batch:
+            return moved_total
+        sweep_id = str(uuid.uuid4())
+        moved = []
+        for old_status in OPEN_STATUSES:
+            ids = [q["id"] for q in batch if q["status"] == old_status]
+            if not ids:
+                continue
+            await database.quotations.update_many(
+                {"id": {"$in": ids}, "status": old_status, "valid_until": {"$lt": now}},
+                {"$set": {"status": EXPIRED_STATUS, "status_changed_at": now, "sweep_id": sweep_id}},
+            )
+            cursor = database.quotations.find(
+                {"sweep_id": sweep_id, "id": {"$in": ids}}, {"_id": 0, "created_at": 1, "total_amount": 1}
+            )
+            moved.extend({**q, "status": old_status} for q in await cursor.to_list(None))
+        await database.quotations.update_many({"sweep_id": sweep_id}, {"$unset": {"sweep_id": ""}})
+        try:
+            await analytics.record_quotation_status_change(database, moved, EXPIRED_STATUS)
+        except Exception as e:
+            logger.warning("Quotation rollup update failed: %s", e)
+        moved_total += len(moved)
+        await asyncio.sleep(pause)
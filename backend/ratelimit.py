@@ -0,0 +1,185 @@
+"""Token-bucket admission control for unauthenticated and expensive routes.
+
+Each route class has a per-client bucket and a global bucket; a request is
+admitted only if both have a token, and is otherwise answered with 429 and a
+``Retry-After`` hint. Buckets refill continuously at ``rate`` tokens/second
+up to ``burst``.
+
+State lives in one of two stores:
+
+* ``MemoryBucketStore`` (default): per process. An LRU ``OrderedDict`` gives
+  O(1) updates; beyond ``max_clients`` the least recently seen buckets that
+  have refilled completely are evicted. A full bucket is the same as no
+  bucket, so eviction never admits more than the limits allow. Partly
+  drained buckets are kept until they are full; only admitted requests drain
+  them, so the global buckets bound how many there can be.
+* ``SqliteBucketStore`` (``RATE_LIMIT_STORE=/dev/shm/...sqlite``): one
+  small database file shared by every worker on the host, so the limits
+  apply to the host as a whole rather than per worker. Its transactions can
+  wait on other workers' locks, so ``AdmissionController.admit`` runs them
+  on a small thread pool instead of the event loop.
+"""
+import asyncio
+import math
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+
+@dataclass(frozen=True)
+class Limit:
+    rate: float  # tokens per second
+    burst: int
+
+
+@dataclass(frozen=True)
+class RouteLimits:
+    per_client: Limit
+    total: Limit
+
+
+DEFAULT_LIMITS: Dict[str, RouteLimits] = {
+    # A person sends a handful of enquiries, not dozens
+    "contact": RouteLimits(per_client=Limit(rate=5 / 300, burst=5), total=Limit(rate=5.0, burst=100)),
+    "status": RouteLimits(per_client=Limit(rate=1.0, burst=20), total=Limit(rate=50.0, burst=200)),
+    # Every attempt costs a bcrypt hash; the global bucket caps the CPU a flood can burn
+    "login": RouteLimits(per_client=Limit(rate=5 / 60, burst=5), total=Limit(rate=4.0, burst=20)),
+}
+
+Bucket = Tuple[str, Limit]
+# Eviction candidates looked at per take, so a run of partly drained buckets costs O(1)
+EVICTION_SCAN = 16
+
+
+def _refill(state: Optional[Tuple[float, float]], limit: Limit, now: float) -> float:
+    if state is None:
+        return float(limit.burst)
+    tokens, updated_at = state[0], state[1]
+    return min(float(limit.burst), tokens + (now - updated_at) * limit.rate)
+
+
+def _wait(tokens: float, limit: Limit) -> float:
+    return 0.0 if tokens >= 1 else (1 - tokens) / limit.rate
+
+
+class MemoryBucketStore:
+    def __init__(self, max_clients: int = 100_000):
+        self.max_clients = max_clients
+        # key -> (tokens, updated_at, full_at)
+        self._buckets: "OrderedDict[str, Tuple[float, float, float]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def take(self, buckets: Sequence[Bucket], now: float) -> float:
+        """Take one token from every bucket, or from none; returns seconds to wait (0 if admitted)."""
+        levels = [_refill(self._buckets.get(key), limit, now) for key, limit in buckets]
+        wait = max(_wait(tokens, limit) for tokens, (_, limit) in zip(levels, buckets))
+        for tokens, (key, limit) in zip(levels, buckets):
+            tokens = tokens - 1 if not wait else tokens
+            self._buckets[key] = (tokens, now, now + (limit.burst - tokens) / limit.rate)
+            self._buckets.move_to_end(key)
+        self._evict(now)
+        return wait
+
+    def _evict(self, now: float) -> None:
+        for _ in range(EVICTION_SCAN):
+            if len(self._buckets) <= self.max_clients:
+                return
+            key, (_, _, full_at) = next(iter(self._buckets.items()))
+            if full_at <= now:
+                del self._buckets[key]
+            else:
+                # Still refilling: forgetting it would hand the client a full bucket early
+                self._buckets.move_to_end(key)
+
+    async def admit(self, buckets: Sequence[Bucket], now: float) -> float:
+        return self.take(buckets, now)
+
+
+class SqliteBucketStore:
+    def __init__(self, path: str, idle_seconds: float = 3600, threads: int = 4):
+        self.path = path
+        self.idle_seconds = idle_seconds
+        self.threads = threads
+        self._local = threading.local()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._operations = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        # One connection per thread: sqlite3 connections must not be shared between threads
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=OFF")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS buckets (key TEXT PRIMARY KEY, tokens REAL, updated_at REAL)"
+            )
+            self._local.connection = connection
+        return connection
+
+    async def admit(self, buckets: Sequence[Bucket], now: float) -> float:
+        # A dedicated pool, so a flood queues here rather than in the loop's default executor
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(self.threads, thread_name_prefix="ratelimit")
+        return await asyncio.get_running_loop().run_in_executor(self._executor, self.take, buckets, now)
+
+    def take(self, buckets: Sequence[Bucket], now: float) -> float:
+        connection = self._connect()
+        keys = [key for key, _ in buckets]
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            rows = connection.execute(
+                f"SELECT key, tokens, updated_at FROM buckets WHERE key IN ({','.join('?' * len(keys))})", keys
+            ).fetchall()
+            states = {key: (tokens, updated_at) for key, tokens, updated_at in rows}
+            levels = [_refill(states.get(key), limit, now) for key, limit in buckets]
+            wait = max(_wait(tokens, limit) for tokens, (_, limit) in zip(levels, buckets))
+            connection.executemany(
+                "INSERT OR REPLACE INTO buckets (key, tokens, updated_at) VALUES (?, ?, ?)",
+                [(key, tokens - 1 if not wait else tokens, now) for tokens, key in zip(levels, keys)],
+            )
+            self._operations += 1
+            if self._operations % 1000 == 0:
+                connection.execute("DELETE FROM buckets WHERE updated_at < ?", (now - self.idle_seconds,))
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        return wait
+
+
+class AdmissionController:
+    def __init__(self, limits: Dict[str, RouteLimits] = None, store=None, enabled: bool = True):
+        self.limits = dict(limits or DEFAULT_LIMITS)
+        self.store = store if store is not None else MemoryBucketStore()
+        self.enabled = enabled
+
+    def _buckets(self, route_class: str, client: str) -> List[Bucket]:
+        limits = self.limits[route_class]
+        return [(f"{route_class}:{client}", limits.per_client), (route_class, limits.total)]
+
+    def check(self, route_class: str, client: str, now: Optional[float] = None) -> float:
+        """Seconds the client should wait before retrying; 0 means admitted."""
+        if not self.enabled:
+            return 0.0
+        return self.store.take(self._buckets(route_class, client), time.time() if now is None else now)
+
+    async def admit(self, route_class: str, client: str, now: Optional[float] = None) -> float:
+        """``check`` for request handlers: never blocks the event loop on a shared store."""
+        if not self.enabled:
+            return 0.0
+        return await self.store.admit(self._buckets(route_class, client), time.time() if now is None else now)
+
+
+def retry_after_header(wait: float) -> str:
+    return str(max(1, math.ceil(wait)))
+
+
+def create_store(path: Optional[str]):
+    return SqliteBucketStore(path) if path else MemoryBucketStore()
@@ -0,0 +1,244 @@
+"""Full-text search over projects, testimonials and contact submissions.
+
+Two interchangeable engines (``SEARCH_BACKEND=mongo|memory``):
+
+* ``MongoTextSearch`` uses one weighted text index per collection and ranks
+  by ``textScore``.
+* ``InvertedIndex`` is an in-process index for deployments without Mongo
+  text search (in-memory or SQL stores). It is loaded once at startup and
+  maintained incrementally from the write paths; being per process, it suits
+  single-worker deployments.
+
+Both return hits with ``<mark>``-highlighted, HTML-escaped snippets. Given
+``archived`` (kind -> archive collection, for the ``collection`` archive
+backend), they also search archived documents when asked to; the in-memory
+index picks up documents archived since startup at its next load.
+"""
+import heapq
+import html
+import logging
+import math
+import re
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Collection -> {field: weight}
+SEARCH_FIELDS: Dict[str, Dict[str, int]] = {
+    "projects": {"title": 10, "tags": 5, "client": 3, "description": 1},
+    "testimonials": {"company": 3, "content": 1},
+    "contact_submissions": {"name": 10, "email": 10, "message": 1},
+}
+SNIPPET_WIDTH = 160
+STOP_WORDS = {"a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "in", "is", "it", "of", "on", "or",
+              "the", "to", "with"}
+_TOKEN = re.compile(r"[\w@.+-]+|\w+", re.UNICODE)
+
+
+def tokenize(text: str) -> List[str]:
+    tokens = []
+    for token in _TOKEN.findall(text.lower()):
+        token = token.strip(".-+")
+        if token and token not in STOP_WORDS:
+            tokens.append(token)
+    return tokens
+
+
+def _text(value) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, (list, tuple)):
+        return " ".join(str(v) for v in value)
+    return str(value)
+
+
+def title_for(kind: str, doc: dict) -> str:
+    if kind == "projects":
+        return doc.get("title") or ""
+    if kind == "testimonials":
+        return f"{doc.get('name')} ({doc['company']})" if doc.get("company") else doc.get("name") or ""
+    return f"{doc.get('name')} <{doc.get('email')}>"
+
+
+def highlight(doc: dict, kind: str, terms: Iterable[str], width: int = SNIPPET_WIDTH) -> str:
+    """Snippet around the first matching term in the highest-weighted field that has one."""
+    pattern = re.compile("|".join(re.escape(t) for t in sorted(set(terms), key=len, reverse=True)), re.IGNORECASE)
+    fields = sorted(SEARCH_FIELDS[kind].items(), key=lambda item: -item[1])
+    text, match = "", None
+    for field, _ in fields:
+        text = _text(doc.get(field))
+        match = pattern.search(text) if terms else None
+        if match:
+            break
+    if not match:
+        text = _text(doc.get(fields[-1][0]))
+        return html.escape(text[:width]) + ("…" if len(text) > width else "")
+
+    start = max(0, match.start() - width // 3)
+    end = min(len(text), start + width)
+    window = text[start:end]
+    parts, last = [], 0
+    for m in pattern.finditer(window):
+        parts.append(html.escape(window[last:m.start()]))
+        parts.append(f"<mark>{html.escape(m.group())}</mark>")
+        last = m.end()
+    parts.append(html.escape(window[last:]))
+    return ("…" if start else "") + "".join(parts) + ("…" if end < len(text) else "")
+
+
+def _hit(kind: str, doc: dict, score: float, terms: List[str]) -> dict:
+    return {
+        "type": kind,
+        "id": doc["id"],
+        "title": title_for(kind, doc),
+        "score": round(score, 4),
+        "snippet": highlight(doc, kind, terms),
+    }
+
+
+def _projection(kind: str) -> dict:
+    projection = {"_id": 0, "id": 1, "name": 1, "email": 1, "title": 1, "company": 1}
+    projection.update({field: 1 for field in SEARCH_FIELDS[kind]})
+    return projection
+
+
+class MongoTextSearch:
+    def __init__(self, archived: Optional[Dict[str, str]] = None):
+        self.archived = archived or {}
+
+    async def ensure_indexes(self, database) -> None:
+        for kind, fields in SEARCH_FIELDS.items():
+            for name in filter(None, (kind, self.archived.get(kind))):
+                try:
+                    await database[name].create_index(
+                        [(field, "text") for field in fields], weights=fields, name="search_text",
+                        default_language="english",
+                    )
+                except Exception as e:
+                    logger.warning("Could not create text index on %s: %s", name, e)
+
+    async def load(self, database) -> None:
+        pass
+
+    def index(self, kind: str, doc: dict) -> None:
+        pass
+
+    def remove(self, kind: str, ids: Iterable[str]) -> None:
+        pass
+
+    async def search(
+        self, database, query: str, kinds: List[str], offset: int, limit: int, include_archived: bool = False
+    ) -> Tuple[int, List[dict]]:
+        terms = tokenize(query)
+        text_query = {"$text": {"$search": query}}
+        total = 0
+        candidates: Dict[Tuple[str, str], tuple] = {}
+        for kind in kinds:
+            names = [kind]
+            if include_archived and kind in self.archived:
+                names.append(self.archived[kind])
+            projection = {**_projection(kind), "score": {"$meta": "textScore"}}
+            for name in names:
+                cursor = database[name].find(text_query, projection).sort([("score", {"$meta": "textScore"})])
+                docs = await cursor.limit(offset + limit).to_list(offset + limit)
+                total += await database[name].count_documents(text_query)
+                for doc in docs:
+                    # A document the archiver copied but had not yet deleted is in both collections
+                    candidates.setdefault((kind, doc["id"]), (doc["score"], kind, doc))
+        ranked = heapq.nlargest(offset + limit, candidates.values(), key=lambda c: c[0])[offset:]
+        return total, [_hit(kind, doc, score, terms) for score, kind, doc in ranked]
+
+
+class InvertedIndex:
+    def __init__(self, archived: Optional[Dict[str, str]] = None):
+        self.archived = archived or {}
+        # kind -> term -> {doc id: 1 + log(weighted term frequency)}
+        self._postings: Dict[str, Dict[str, Dict[str, float]]] = {kind: {} for kind in SEARCH_FIELDS}
+        self._doc_terms: Dict[Tuple[str, str], List[str]] = {}
+        self._docs: Dict[Tuple[str, str], dict] = {}
+        self._archived: Set[Tuple[str, str]] = set()
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    async def ensure_indexes(self, database) -> None:
+        pass
+
+    async def load(self, database, batch_size: int = 1000) -> None:
+        for kind in SEARCH_FIELDS:
+            async for doc in database[kind].find({}, _projection(kind), batch_size=batch_size):
+                self.index(kind, doc)
+            if kind in self.archived:
+                async for doc in database[self.archived[kind]].find({}, _projection(kind), batch_size=batch_size):
+                    if (kind, doc["id"]) not in self._docs:
+                        self.index(kind, doc, archived=True)
+        logger.info("Search index loaded with %d documents", len(self))
+
+    def index(self, kind: str, doc: dict, archived: bool = False) -> None:
+        key = (kind, doc["id"])
+        self._unindex(key)
+        if archived:
+            self._archived.add(key)
+        weights = Counter()
+        for field, weight in SEARCH_FIELDS[kind].items():
+            for term in tokenize(_text(doc.get(field))):
+                weights[term] += weight
+        postings = self._postings[kind]
+        for term, weight in weights.items():
+            postings.setdefault(term, {})[doc["id"]] = 1 + math.log(weight)
+        self._doc_terms[key] = list(weights)
+        self._docs[key] = {field: doc.get(field) for field in _projection(kind) if field != "_id"}
+
+    def remove(self, kind: str, ids: Iterable[str]) -> None:
+        for doc_id in ids:
+            self._unindex((kind, doc_id))
+
+    def _unindex(self, key: Tuple[str, str]) -> None:
+        kind, doc_id = key
+        postings = self._postings[kind]
+        for term in self._doc_terms.pop(key, ()):
+            docs = postings[term]
+            docs.pop(doc_id, None)
+            if not docs:
+                del postings[term]
+        self._docs.pop(key, None)
+        self._archived.discard(key)
+
+    async def search(
+        self, database, query: str, kinds: List[str], offset: int, limit: int, include_archived: bool = False
+    ) -> Tuple[int, List[dict]]:
+        return self.search_sync(query, kinds, offset, limit, include_archived)
+
+    def search_sync(
+        self, query: str, kinds: List[str], offset: int, limit: int, include_archived: bool = False
+    ) -> Tuple[int, List[dict]]:
+        terms = tokenize(query)
+        total_docs = max(len(self._docs), 1)
+        total = 0
+        candidates = []
+        for kind in kinds:
+            matches = [self._postings[kind][term] for term in set(terms) if term in self._postings[kind]]
+            if not matches:
+                continue
+            scores: Dict[str, float] = {}
+            for docs in matches:
+                idf = math.log(1 + total_docs / len(docs))
+                get = scores.get
+                for doc_id, weight in docs.items():
+                    scores[doc_id] = get(doc_id, 0.0) + weight * idf
+            if self._archived and not include_archived:
+                scores = {doc_id: score for doc_id, score in scores.items() if (kind, doc_id) not in self._archived}
+            total += len(scores)
+            top = heapq.nlargest(offset + limit, scores.items(), key=lambda item: item[1])
+            candidates.extend((score, kind, doc_id) for doc_id, score in top)
+        ranked = heapq.nlargest(offset + limit, candidates, key=lambda c: c[0])[offset:]
+        return total, [_hit(kind, self._docs[(kind, doc_id)], score, terms) for score, kind, doc_id in ranked]
+
+
+def create_engine(backend: str, archived: Optional[Dict[str, str]] = None):
+    if backend == "memory":
+        return InvertedIndex(archived)
+    if backend == "mongo":
+        return MongoTextSearch(archived)
+    raise ValueError(f"Unknown search backend: {backend}")
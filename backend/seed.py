@@ -0,0 +1,173 @@
+"""Bulk-seed a database with deterministic synthetic data for scale testing.
+
+Documents come from ``benchmarks.fixtures.generate``, so the same ``--seed``
+always yields the same documents, however the run is batched or parallelised.
+Batches are generated in a process pool and inserted with up to
+``--concurrency`` unordered ``insert_many`` calls in flight. With
+``--images`` every image URL on a project or testimonial gets a placeholder
+JPEG under the uploads directory, so the seeded data renders in the frontend::
+
+    python seed.py --projects 10000 --testimonials 2000 --quotations 100000 \\
+        --contact-submissions 1000000 --status-checks 100000 --drop
+    python seed.py --projects 500 --images --db netrik_staging
+
+Fixture dates fall in the two years after 2024-01-01; ``--until`` shifts them
+so the newest falls on the given date (status checks older than the TTL
+retention window are otherwise removed as soon as they are inserted).
+"""
+import argparse
+import asyncio
+import hashlib
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from benchmarks import fixtures
+
+KINDS = list(fixtures.GENERATORS)
+# Newest date the fixtures produce (see fixtures._date)
+FIXTURE_END = fixtures.BASE_DATE + timedelta(days=731)
+IMAGE_SIZE = (800, 600)
+
+
+def _image_paths(kind: str, doc: dict) -> List[str]:
+    if kind == "projects":
+        return list(doc["images"])
+    if kind == "testimonials" and doc["image"]:
+        return [doc["image"]]
+    return []
+
+
+def write_placeholder(path: Path, label: str, size=IMAGE_SIZE) -> int:
+    from PIL import Image, ImageDraw
+
+    # Colour derived from the name, so reruns write identical files
+    red, green, blue = hashlib.sha256(label.encode()).digest()[:3]
+    image = Image.new("RGB", size, (red // 2 + 64, green // 2 + 64, blue // 2 + 64))
+    ImageDraw.Draw(image).text((20, 20), label, fill=(255, 255, 255))
+    path.parent.mkdir(parents=True, exist_ok=True)
+    image.save(path, "JPEG", quality=70)
+    return path.stat().st_size
+
+
+def _shift(doc: dict, delta: timedelta) -> dict:
+    for key, value in doc.items():
+        if isinstance(value, datetime):
+            doc[key] = value + delta
+    return doc
+
+
+def generate_batch(kind: str, start: int, count: int, seed: int, delta: Optional[timedelta],
+                   uploads: Optional[str]) -> Tuple[List[dict], int]:
+    """One batch of documents, plus how many placeholder images were written for it."""
+    docs = fixtures.generate(kind, start, count, seed)
+    if delta:
+        docs = [_shift(doc, delta) for doc in docs]
+    images = 0
+    if uploads:
+        for doc in docs:
+            for url in _image_paths(kind, doc):
+                # URLs look like /uploads/projects/<name>.jpg
+                path = Path(uploads) / url.split("/uploads/", 1)[1]
+                if not path.exists():
+                    write_placeholder(path, path.stem)
+                    images += 1
+    return docs, images
+
+
+async def seed_collection(
+    database, kind: str, count: int, seed: int = 0, batch_size: int = 1000, concurrency: int = 4,
+    executor: Optional[Executor] = None, until: Optional[datetime] = None, uploads: Optional[Path] = None,
+) -> dict:
+    loop = asyncio.get_running_loop()
+    delta = until - FIXTURE_END if until else None
+    slots = asyncio.Semaphore(concurrency)
+    totals = {"documents": 0, "images": 0}
+
+    async def batch(start: int) -> None:
+        async with slots:
+            docs, images = await loop.run_in_executor(
+                executor, generate_batch, kind, start, min(batch_size, count - start), seed, delta,
+                str(uploads) if uploads else None,
+            )
+            await database[kind].insert_many(docs, ordered=False)
+            totals["documents"] += len(docs)
+            totals["images"] += images
+
+    started = time.perf_counter()
+    await asyncio.gather(*(batch(start) for start in range(0, count, batch_size)))
+    totals["seconds"] = time.perf_counter() - started
+    return totals
+
+
+async def seed_database(
+    database, counts: Dict[str, int], seed: int = 0, batch_size: int = 1000, concurrency: int = 4,
+    processes: Optional[int] = None, until: Optional[datetime] = None, uploads: Optional[Path] = None,
+    drop: bool = False,
+) -> Dict[str, dict]:
+    """Seed each collection in ``counts``; returns documents, images and seconds per collection.
+
+    ``processes=0`` generates in the event loop's default thread pool instead
+    of a process pool (handy for small fixtures and debugging).
+    """
+    executor = ProcessPoolExecutor(processes) if processes != 0 else None
+    try:
+        results = {}
+        for kind, count in counts.items():
+            if drop:
+                await database[kind].drop()
+            if count:
+                results[kind] = await seed_collection(
+                    database, kind, count, seed, batch_size, concurrency, executor, until, uploads
+                )
+        return results
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Seed the database with deterministic synthetic data")
+    for kind in KINDS:
+        parser.add_argument(f"--{kind.replace('_', '-')}", type=int, default=0, metavar="N", dest=kind)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=4, help="insert_many calls in flight")
+    parser.add_argument("--processes", type=int, default=None, help="generator processes (default: CPU count)")
+    parser.add_argument("--until", type=datetime.fromisoformat, help="shift dates so the newest is this date")
+    parser.add_argument("--images", action="store_true", help="write placeholder images for image URLs")
+    parser.add_argument("--uploads", default="uploads", help="uploads directory for --images")
+    parser.add_argument("--db", help="database name (default: DB_NAME)")
+    parser.add_argument("--drop", action="store_true", help="drop each seeded collection first")
+    args = parser.parse_args()
+    counts = {kind: getattr(args, kind) for kind in KINDS if getattr(args, kind)}
+    if not counts:
+        parser.error("nothing to seed; pass e.g. --projects 1000")
+
+    from dotenv import load_dotenv
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    load_dotenv(Path(__file__).parent / ".env")
+
+    async def run():
+        client = AsyncIOMotorClient(os.environ["MONGO_URL"])
+        try:
+            results = await seed_database(
+                client[args.db or os.environ["DB_NAME"]], counts, args.seed, args.batch_size, args.concurrency,
+                args.processes, args.until, Path(args.uploads) if args.images else None, args.drop,
+            )
+        finally:
+            client.close()
+        for kind, result in results.items():
+            images = f"   {result['images']:,} images" if args.images else ""
+            print(f"{kind:<22} {result['documents']:>10,} docs {result['seconds']:8.1f}s "
+                  f"{result['documents'] / result['seconds']:>10,.0f} docs/s{images}")
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+"""Production serving mode: N uvicorn workers sharing one listening socket.
+
+    python serve.py --workers 4 --port 8001
+
+Workers share public responses through ``cache.SharedResponseCache``. The
+Mongo connection budget (``MONGO_TOTAL_POOL_SIZE``) is split between them so
+adding workers doesn't multiply the number of connections to the database.
+"""
+import argparse
+import os
+
+import uvicorn
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run the Netrik Techworks API")
+    parser.add_argument("--host", default=os.environ.get("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.environ.get("PORT", "8001")))
+    parser.add_argument("--workers", type=int, default=int(os.environ.get("WEB_CONCURRENCY", os.cpu_count() or 1)))
+    args = parser.parse_args()
+
+    total_pool = int(os.environ.get("MONGO_TOTAL_POOL_SIZE", "100"))
+    os.environ["MONGO_MAX_POOL_SIZE"] = str(max(1, total_pool // args.workers))
+    os.environ["MONGO_MIN_POOL_SIZE"] = str(min(int(os.environ.get("MONGO_MIN_POOL_SIZE", "5")),
+                                                int(os.environ["MONGO_MAX_POOL_SIZE"])))
+
+    uvicorn.run("server:app", host=args.host, port=args.port, workers=args.workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,27 +1,46 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Depends, UploadFile, File, status
+from fastapi import FastAPI, APIRouter, HTTPException, Depends, UploadFile, File, Header, Query, Request, status
+from fastapi.encoders import jsonable_encoder
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ASCENDING, DESCENDING, ReturnDocument
 import os
 import logging
 from pathlib import Path
 from pydantic import BaseModel, Field, EmailStr
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Union
 import uuid
 from datetime import datetime, timedelta
 import jwt
 from passlib.context import CryptContext
 import aiofiles
+import asyncio
 import shutil
-from reportlab.lib.pagesizes import letter, A4
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, Image
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
-from reportlab.lib import colors
-from reportlab.lib.enums import TA_CENTER, TA_LEFT
 import io
-from fastapi.responses import FileResponse
+import json
+import time
+from contextlib import asynccontextmanager
+from fastapi.responses import FileResponse, JSONResponse, Response, StreamingResponse
+
+from cache import SharedResponseCache, TTLCache
+from snapshots import SnapshotStore
+from jobs import JobContext, JobQueue, PermanentJobError
+from events import EventBroker
+from facets import FacetIndex
+from loopwatch import LoopWatch, LoopWatchMiddleware
+from singleflight import SingleFlight
+import analytics
+import archive
+import exports
+import idempotency
+import ratelimit
+import status_checks
+import quotations
+import search
+from compression import (
+    CompressionMiddleware, MIN_SIZE as COMPRESSION_MIN_SIZE, PRECOMPRESSED_LEVELS, compress, negotiate_encoding,
+)
 
 
 ROOT_DIR = Path(__file__).parent
@@ -34,23 +53,172 @@ ACCESS_TOKEN_EXPIRE_HOURS = 24
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 security = HTTPBearer()
+optional_security = HTTPBearer(auto_error=False)
 
-# MongoDB connection
+# MongoDB connection (the client is created per worker in the lifespan below)
 mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
+MONGO_MIN_POOL_SIZE = int(os.environ.get('MONGO_MIN_POOL_SIZE', '5'))
+MONGO_MAX_POOL_SIZE = int(os.environ.get('MONGO_MAX_POOL_SIZE', '100'))
+client: Optional[AsyncIOMotorClient] = None
+db = None
+
+UPLOAD_FOLDERS = ["uploads/projects", "uploads/testimonials", "uploads/invoices", "uploads/staging"]
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+# Batch image uploads: files per request, and how many are written at once
+IMAGE_BATCH_MAX_FILES = int(os.environ.get('IMAGE_BATCH_MAX_FILES', '100'))
+IMAGE_UPLOAD_CONCURRENCY = int(os.environ.get('IMAGE_UPLOAD_CONCURRENCY', '8'))
+
+# Short-lived cache for the admin dashboard summary
+summary_cache = TTLCache(ttl=float(os.environ.get('SUMMARY_CACHE_SECONDS', '10')))
+
+# Live admin notifications (new leads, read-state changes), shared by all workers through Mongo
+event_broker = EventBroker(
+    replay_size=int(os.environ.get('EVENT_REPLAY_SIZE', '1000')),
+    queue_size=int(os.environ.get('EVENT_QUEUE_SIZE', '256')),
+    storage=os.environ.get('EVENT_STORAGE', 'capped'),
+    capped_bytes=int(os.environ.get('EVENT_CAPPED_BYTES', str(8 * 2**20))),
+    poll_interval=float(os.environ.get('EVENT_POLL_SECONDS', '0.5')),
+)
+
+# Background jobs for heavy admin work (handlers are registered further down)
+job_queue = JobQueue(workers=int(os.environ.get('JOB_WORKERS', '2')))
+
+# Serialized public responses shared by every worker on this host
+public_cache = SharedResponseCache()
+snapshot_store = SnapshotStore()
+snapshot_state: Dict[str, Any] = {"task": None, "dirty": False}
+
+# Category/tag counts and tag postings for the portfolio (synced via the cache generation)
+facet_index = FacetIndex()
+
+# Identical concurrent reads and renders run once and share the result
+flights = SingleFlight(timeout=float(os.environ.get('SINGLE_FLIGHT_TIMEOUT', '30')))
+PDF_RENDER_TIMEOUT = float(os.environ.get('PDF_RENDER_TIMEOUT', '300'))
+
+# Stored responses for retried POSTs carrying an Idempotency-Key
+idempotency_store = idempotency.IdempotencyStore(ttl=float(os.environ.get('IDEMPOTENCY_TTL_SECONDS', '86400')))
+
+# Token buckets for unauthenticated writes and login (RATE_LIMIT_STORE shares them across workers)
+admission = ratelimit.AdmissionController(
+    store=ratelimit.create_store(os.environ.get('RATE_LIMIT_STORE')),
+    enabled=os.environ.get('RATE_LIMITS_ENABLED', 'true').lower() != 'false',
+)
+RATE_LIMIT_TRUST_PROXY = os.environ.get('RATE_LIMIT_TRUST_PROXY', 'false').lower() == 'true'
+
+# Legacy status checks: bounded storage plus an optional hourly rollup
+status_check_retention = status_checks.StatusCheckRetention(
+    storage=os.environ.get('STATUS_CHECK_STORAGE', 'ttl'),
+    retention_days=float(os.environ.get('STATUS_CHECK_RETENTION_DAYS', '30')),
+    capped_bytes=int(os.environ.get('STATUS_CHECK_CAPPED_BYTES', str(16 * 2**20))),
+    capped_max=int(os.environ['STATUS_CHECK_CAPPED_MAX']) if os.environ.get('STATUS_CHECK_CAPPED_MAX') else None,
+    rollup=os.environ.get('STATUS_CHECK_ROLLUP', 'true').lower() != 'false',
+    rollup_days=float(os.environ.get('STATUS_CHECK_ROLLUP_DAYS', '365')),
+)
+
+# Cold contact submissions and quotations (see archive.py); listings read them only on request
+cold_storage = archive.create_archive(os.environ.get('ARCHIVE_BACKEND', 'collection'))
+
+# Event-loop lag monitor; stalls past the threshold are captured with their stack and route
+loop_watch = LoopWatch(
+    interval=float(os.environ.get('LOOP_LAG_INTERVAL_SECONDS', '0.1')),
+    threshold=float(os.environ.get('LOOP_STALL_THRESHOLD_SECONDS', '0.1')),
+    enabled=os.environ.get('LOOP_WATCH_ENABLED', 'true').lower() != 'false',
+)
+
+# Full-text search (Mongo text indexes, or an in-process index kept current on writes); archived
+# leads are searchable on request while they stay in Mongo
+search_engine = search.create_engine(
+    os.environ.get('SEARCH_BACKEND', 'mongo'),
+    archived={kind: f"{kind}_archive" for kind in archive.TIERS if kind in search.SEARCH_FIELDS}
+    if isinstance(cold_storage, archive.CollectionArchive) else None,
+)
+
+# Open quotations past valid_until are swept to rejected this often
+QUOTATION_SWEEP_SECONDS = float(os.environ.get('QUOTATION_SWEEP_SECONDS', '3600'))
+QUOTATION_SWEEP_BATCH_SIZE = int(os.environ.get('QUOTATION_SWEEP_BATCH_SIZE', '500'))
+
+# Worker state reported by the health endpoints
+worker_state: Dict[str, Any] = {"started_at": None, "ready_at": None, "warmup_error": None}
+
+async def ensure_indexes():
+    await analytics.ensure_indexes(db)
+    await job_queue.ensure_indexes()
+    await quotations.ensure_indexes(db)
+    await idempotency_store.ensure_indexes(db)
+    await status_check_retention.ensure_storage(db)
+    await event_broker.ensure_storage(db)
+    await search_engine.ensure_indexes(db)
+    await cold_storage.ensure_indexes(db)
+    # Multikey index for tag filtering
+    await db.projects.create_index("tags")
+    # Lead listings and exports sort newest first, optionally filtered by read state or service
+    await db.contact_submissions.create_index([("submitted_at", DESCENDING)])
+    await db.contact_submissions.create_index([("is_read", ASCENDING), ("submitted_at", DESCENDING)])
+    await db.contact_submissions.create_index([("service", ASCENDING), ("submitted_at", DESCENDING)])
+
+async def warm_up_database():
+    # Open the minimum pool eagerly so the first real request doesn't pay for connection setup
+    while True:
+        try:
+            await client.admin.command("ping")
+            await asyncio.gather(*(db.command("ping") for _ in range(MONGO_MIN_POOL_SIZE)))
+            await ensure_indexes()
+            await search_engine.load(db)
+            worker_state["ready_at"] = time.time()
+            worker_state["warmup_error"] = None
+            logger.info("Worker warm after %.3fs", worker_state["ready_at"] - worker_state["started_at"])
+            # The startup invalidation made any existing snapshot stale
+            schedule_snapshot_publish()
+            return
+        except Exception as e:
+            worker_state["warmup_error"] = str(e)
+            logger.warning("Database warm-up failed, retrying: %s", e)
+            await asyncio.sleep(2)
+
+async def sweep_expired_quotations():
+    while True:
+        if worker_state["ready_at"] is not None:
+            try:
+                moved = await quotations.expire(db, batch_size=QUOTATION_SWEEP_BATCH_SIZE)
+                if moved:
+                    logger.info("Expired %d quotations", moved)
+            except Exception as e:
+                logger.warning("Quotation expiry sweep failed: %s", e)
+        await asyncio.sleep(QUOTATION_SWEEP_SECONDS if worker_state["ready_at"] is not None else 2)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global client, db
+    worker_state["started_at"] = time.time()
+    for folder in UPLOAD_FOLDERS:
+        os.makedirs(folder, exist_ok=True)
+    # Entries cached by a previous run may predate writes made while we were down
+    public_cache.invalidate()
+
+    client = AsyncIOMotorClient(mongo_url, minPoolSize=MONGO_MIN_POOL_SIZE, maxPoolSize=MONGO_MAX_POOL_SIZE)
+    db = client[os.environ['DB_NAME']]
+    loop_watch.start()
+    # Job workers and the event tail only poll; their indexes are created with the rest during warm-up
+    await job_queue.start(db.jobs)
+    await event_broker.start(db)
+    warm_up_task = asyncio.create_task(warm_up_database())
+    sweeper_task = asyncio.create_task(sweep_expired_quotations())
+    try:
+        yield
+    finally:
+        warm_up_task.cancel()
+        sweeper_task.cancel()
+        await job_queue.stop()
+        await event_broker.stop()
+        await loop_watch.stop()
+        client.close()
 
 # Create the main app without a prefix
-app = FastAPI(title="Netrik Techworks API", version="1.0.0")
+app = FastAPI(title="Netrik Techworks API", version="1.0.0", lifespan=lifespan)
 
 # Create a router with the /api prefix
 api_router = APIRouter(prefix="/api")
 
-# Ensure upload directories exist
-os.makedirs("uploads/projects", exist_ok=True)
-os.makedirs("uploads/testimonials", exist_ok=True)
-os.makedirs("uploads/invoices", exist_ok=True)
-
 # Authentication Models
 class AdminLogin(BaseModel):
     username: str
@@ -104,6 +272,7 @@ class Quotation(BaseModel):
     created_at: datetime = Field(default_factory=datetime.utcnow)
     valid_until: datetime
     notes: Optional[str] = None
+    status_changed_at: Optional[datetime] = None
 
 class QuotationCreate(BaseModel):
     client_name: str
@@ -114,6 +283,9 @@ class QuotationCreate(BaseModel):
     valid_days: int = 30
     notes: Optional[str] = None
 
+class QuotationStatusUpdate(BaseModel):
+    status: str
+
 # Project Models
 class Project(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
@@ -183,6 +355,168 @@ class StatusCheck(BaseModel):
 class StatusCheckCreate(BaseModel):
     client_name: str
 
+class StatusCheckRollup(BaseModel):
+    hour: datetime
+    client_name: str
+    count: int
+
+# Bulk Operation Models
+BULK_MAX_ITEMS = 10000
+
+class BulkSelection(BaseModel):
+    # Either explicit ids, a filter, or both (ids narrowed by the filter)
+    ids: Optional[List[str]] = Field(None, max_length=BULK_MAX_ITEMS)
+
+class ContactSubmissionBulkFilter(BaseModel):
+    is_read: Optional[bool] = None
+    service: Optional[str] = None
+
+class ContactSubmissionBulkRead(BulkSelection):
+    filter: Optional[ContactSubmissionBulkFilter] = None
+    is_read: bool = True
+
+class ProjectBulkFilter(BaseModel):
+    category: Optional[str] = None
+    is_featured: Optional[bool] = None
+
+class ProjectBulkSelection(BulkSelection):
+    filter: Optional[ProjectBulkFilter] = None
+
+class ProjectBulkFeature(ProjectBulkSelection):
+    is_featured: bool
+
+class TestimonialBulkFilter(BaseModel):
+    is_featured: Optional[bool] = None
+    rating: Optional[int] = Field(None, ge=1, le=5)
+
+class TestimonialBulkSelection(BulkSelection):
+    filter: Optional[TestimonialBulkFilter] = None
+
+class TestimonialBulkFeature(TestimonialBulkSelection):
+    is_featured: bool
+
+class BulkResult(BaseModel):
+    matched: int
+    modified: int
+    results: Dict[str, str]  # id -> updated, unchanged, deleted, not_found
+
+# Image Upload Models
+class ImageUploadResult(BaseModel):
+    filename: str
+    image_url: Optional[str] = None
+    error: Optional[str] = None
+
+class ImageBatchUploadResult(BaseModel):
+    uploaded: int
+    failed: int
+    featured_image: Optional[str] = None
+    results: List[ImageUploadResult]
+
+# Facet Models
+class FacetCount(BaseModel):
+    value: str
+    count: int
+
+class ProjectFacets(BaseModel):
+    total: int
+    categories: List[FacetCount]
+    tags: List[FacetCount]
+
+# Search Models
+class SearchHit(BaseModel):
+    type: str
+    id: str
+    title: str
+    score: float
+    snippet: str
+
+class SearchResults(BaseModel):
+    query: str
+    total: int
+    page: int
+    page_size: int
+    results: List[SearchHit]
+
+# Diagnostics Models
+class LoopLagPercentiles(BaseModel):
+    p50: float
+    p90: float
+    p99: float
+    max: float
+
+class LoopOffender(BaseModel):
+    route: str
+    culprit: str
+    count: int
+    total_ms: float
+    max_ms: float
+    stack: str
+
+class LoopStall(BaseModel):
+    at: datetime
+    route: str
+    culprit: str
+    duration_ms: float
+    stack: str
+
+class EventLoopDiagnostics(BaseModel):
+    enabled: bool
+    pid: int
+    interval_ms: float
+    threshold_ms: float
+    samples: int
+    lag_ms: LoopLagPercentiles
+    stalls: int
+    offenders: List[LoopOffender]
+    recent: List[LoopStall]
+
+# Dashboard Models
+class AdminSummary(BaseModel):
+    total_leads: int
+    unread_leads: int
+    leads_per_service: Dict[str, int]
+    total_quotations: int
+    quotations_per_status: Dict[str, int]
+    pipeline_value_per_status: Dict[str, float]
+    open_pipeline_value: float  # draft + sent
+    total_projects: int
+    projects_per_category: Dict[str, int]
+    total_testimonials: int
+    average_testimonial_rating: Optional[float] = None
+    generated_at: datetime
+
+# Analytics Models
+class LeadRollup(BaseModel):
+    day: datetime
+    service: str
+    count: int
+
+class QuotationRollup(BaseModel):
+    month: datetime
+    status: str
+    count: int
+    total_amount: float
+
+# Background Job Models
+class Job(BaseModel):
+    id: str
+    type: str
+    status: str  # queued, running, succeeded, failed
+    priority: int = 0
+    attempts: int = 0
+    max_attempts: int
+    progress: float = 0.0
+    message: Optional[str] = None
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+class JobAccepted(BaseModel):
+    job_id: str
+    status: str
+
 # Authentication utility functions
 def verify_password(plain_password, hashed_password):
     return pwd_context.verify(plain_password, hashed_password)
@@ -201,13 +535,43 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     return encoded_jwt
 
 async def get_current_admin(credentials: HTTPAuthorizationCredentials = Depends(security)):
+    return verify_admin_token(credentials.credentials)
+
+def client_address(request: Request) -> str:
+    # Behind our ingress the peer is the proxy; the last X-Forwarded-For hop is the one it appended
+    forwarded = request.headers.get("x-forwarded-for")
+    if RATE_LIMIT_TRUST_PROXY and forwarded:
+        return forwarded.rsplit(",", 1)[-1].strip()
+    return request.client.host if request.client else "unknown"
+
+def admission_control(route_class: str):
+    async def check(request: Request):
+        wait = await admission.admit(route_class, client_address(request))
+        if wait:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many requests, please retry later",
+                headers={"Retry-After": ratelimit.retry_after_header(wait)},
+            )
+    return check
+
+async def get_current_admin_for_stream(
+    token: Optional[str] = None,
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security),
+):
+    # Browsers' EventSource can't set headers, so streams also accept ?token=
+    if credentials is not None:
+        return verify_admin_token(credentials.credentials)
+    return verify_admin_token(token or "")
+
+def verify_admin_token(token: str) -> str:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
     try:
-        payload = jwt.decode(credentials.credentials, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         username: str = payload.get("sub")
         if username is None:
             raise credentials_exception
@@ -221,119 +585,165 @@ async def get_current_admin(credentials: HTTPAuthorizationCredentials = Depends(
         raise credentials_exception
     return token_data.username
 
+# Public response caching
+def render_json(content: Any) -> bytes:
+    return json.dumps(
+        jsonable_encoder(content), ensure_ascii=False, allow_nan=False, separators=(",", ":")
+    ).encode("utf-8")
+
+class BufferResponse(Response):
+    # Starlette only renders bytes; a cache hit is a view of the shared mapping, sent without copying
+    def render(self, content: Any) -> Any:
+        return content if isinstance(content, memoryview) else super().render(content)
+
+def json_body_response(body: Union[bytes, memoryview], encoding: Optional[str] = None) -> Response:
+    headers = {"Vary": "Accept-Encoding"}
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return BufferResponse(content=body, media_type="application/json", headers=headers)
+
+async def coalesce(key, work, timeout: Optional[float] = None):
+    # Identical concurrent work (e.g. a burst of cache misses right after an admin write) runs once
+    try:
+        return await flights.do(key, work, timeout)
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail="Timed out waiting for a shared result")
+
+async def cached_json_response(request: Request, key: str, load) -> Response:
+    # Published snapshot files first, then the shared response cache, then Mongo.
+    # The identity body and each compressed variant are cached side by side,
+    # so a cache hit never re-serializes or re-compresses.
+    generation = public_cache.generation()
+    encoding = negotiate_encoding(request.headers.get("accept-encoding"))
+    snapshot = snapshot_store.lookup(key, encoding, generation)
+    if snapshot is not None:
+        path, snapshot_encoding = snapshot
+        headers = {"Vary": "Accept-Encoding"}
+        if snapshot_encoding:
+            headers["Content-Encoding"] = snapshot_encoding
+        return FileResponse(path, media_type="application/json", headers=headers)
+
+    if encoding:
+        encoded = public_cache.get(f"{key}|{encoding}", generation)
+        if encoded is not None:
+            return json_body_response(encoded, encoding)
+
+    body = public_cache.get(key, generation)
+    if body is None:
+        async def load_body():
+            rendered = render_json(await load())
+            public_cache.set(key, rendered, generation)
+            return rendered
+        body = await coalesce(("json", key, generation), load_body)
+    if encoding and len(body) >= COMPRESSION_MIN_SIZE:
+        async def compress_body():
+            compressed = await asyncio.to_thread(compress, body, encoding, PRECOMPRESSED_LEVELS[encoding])
+            public_cache.set(f"{key}|{encoding}", compressed, generation)
+            return compressed
+        encoded = await coalesce(("json", key, encoding, generation), compress_body)
+        return json_body_response(encoded, encoding)
+    return json_body_response(body)
+
+def invalidate_public_content():
+    # Called after every admin write to projects or testimonials (project writes patch facet_index first)
+    before = public_cache.generation()
+    facet_index.advance(before, public_cache.invalidate())
+    schedule_snapshot_publish()
+
+def projects_cache_key(category: Optional[str], featured_only: bool, tags: Optional[List[str]] = None, tag_match: str = "all") -> str:
+    key = f"projects?category={category or ''}&featured_only={featured_only}"
+    if tags:
+        key += f"&tags={','.join(sorted(set(tags)))}&tag_match={tag_match}"
+    return key
+
+PROJECT_FACETS_CACHE_KEY = "projects/facets"
+
+def testimonials_cache_key(featured_only: bool) -> str:
+    return f"testimonials?featured_only={featured_only}"
+
+async def load_public_projects(
+    category: Optional[str], featured_only: bool, tags: Optional[List[str]] = None, tag_match: str = "all"
+) -> List[Project]:
+    filter_query = {}
+    if category:
+        filter_query["category"] = category
+    if featured_only:
+        filter_query["is_featured"] = True
+    if tags:
+        filter_query["tags"] = {"$all" if tag_match == "all" else "$in": sorted(set(tags))}
+
+    projects = await db.projects.find(filter_query).sort("completion_date", -1).to_list(1000)
+    return [Project(**project) for project in projects]
+
+async def load_public_testimonials(featured_only: bool) -> List[Testimonial]:
+    filter_query = {}
+    if featured_only:
+        filter_query["is_featured"] = True
+
+    testimonials = await db.testimonials.find(filter_query).sort("created_at", -1).to_list(1000)
+    return [Testimonial(**testimonial) for testimonial in testimonials]
+
+# Static snapshot publishing
+async def publish_public_snapshots() -> str:
+    generation = public_cache.generation()
+    bodies = {}
+    for category in [None, *await db.projects.distinct("category")]:
+        for featured_only in (False, True):
+            projects = await load_public_projects(category, featured_only)
+            bodies[projects_cache_key(category, featured_only)] = render_json(projects)
+    for featured_only in (False, True):
+        bodies[testimonials_cache_key(featured_only)] = render_json(await load_public_testimonials(featured_only))
+    await facet_index.sync(db, generation)
+    bodies[PROJECT_FACETS_CACHE_KEY] = render_json(facet_index.counts())
+    return await asyncio.to_thread(snapshot_store.publish, bodies, generation)
+
+async def _snapshot_publisher():
+    # Coalesces bursts of admin writes into as few rebuilds as possible
+    while snapshot_state["dirty"]:
+        snapshot_state["dirty"] = False
+        try:
+            await publish_public_snapshots()
+        except Exception:
+            logger.exception("Publishing public snapshots failed")
+
+def schedule_snapshot_publish():
+    snapshot_state["dirty"] = True
+    task = snapshot_state["task"]
+    if task is None or task.done():
+        snapshot_state["task"] = asyncio.create_task(_snapshot_publisher())
+
+async def render_quotation_pdf_file(quotation: Quotation):
+    # Concurrent renders of the same quotation (double clicks, a job racing a download) share one
+    async def render():
+        # Rendering is CPU-bound, so it runs off the event loop
+        pdf_buffer = await asyncio.to_thread(generate_quotation_pdf, quotation)
+
+        # Save PDF to file system
+        pdf_filename = f"quotation_{quotation.quote_number}.pdf"
+        pdf_path = f"uploads/invoices/{pdf_filename}"
+        async with aiofiles.open(pdf_path, "wb") as f:
+            await f.write(pdf_buffer.getvalue())
+        return pdf_path, pdf_filename
+    return await coalesce(("pdf", quotation.id), render, PDF_RENDER_TIMEOUT)
+
 # PDF Generation utility
+# ReportLab is heavy and PDFs are a rare admin-only path, so it is only imported on first render.
 def generate_quotation_pdf(quotation: Quotation) -> io.BytesIO:
-    buffer = io.BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=A4)
-    
-    # Get the default stylesheet
-    styles = getSampleStyleSheet()
-    
-    # Create custom styles
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Heading1'],
-        fontSize=24,
-        spaceAfter=30,
-        alignment=TA_CENTER,
-        textColor=colors.HexColor('#1e293b')
-    )
-    
-    # Build the PDF content
-    content = []
-    
-    # Title
-    content.append(Paragraph("QUOTATION", title_style))
-    content.append(Spacer(1, 20))
-    
-    # Company header
-    company_info = [
-        ["Netrik Techworks", ""],
-        ["Professional IT Services", ""],
-        ["Malaysia", ""],
-        ["Phone: +60 12-495 3622", f"Quote #: {quotation.quote_number}"],
-        ["Email: info@netriktechworks.com", f"Date: {quotation.created_at.strftime('%d/%m/%Y')}"],
-        ["", f"Valid Until: {quotation.valid_until.strftime('%d/%m/%Y')}"]
-    ]
-    
-    company_table = Table(company_info, colWidths=[3*inch, 2*inch])
-    company_table.setStyle(TableStyle([
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('FONTNAME', (0, 0), (0, 2), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, -1), 10),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
-    ]))
-    
-    content.append(company_table)
-    content.append(Spacer(1, 30))
-    
-    # Client information
-    client_info = [
-        ["Bill To:", ""],
-        [quotation.client_name, ""],
-        [quotation.client_address, ""],
-        [f"Phone: {quotation.client_phone}", ""],
-        [f"Email: {quotation.client_email}", ""]
-    ]
-    
-    client_table = Table(client_info, colWidths=[3*inch, 2*inch])
-    client_table.setStyle(TableStyle([
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('FONTNAME', (0, 0), (0, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, -1), 10),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
-    ]))
-    
-    content.append(client_table)
-    content.append(Spacer(1, 30))
-    
-    # Items table
-    items_data = [["Description", "Qty", "Unit Price (RM)", "Total (RM)"]]
-    for item in quotation.items:
-        items_data.append([
-            item.description,
-            str(item.quantity),
-            f"{item.unit_price:.2f}",
-            f"{item.total:.2f}"
-        ])
-    
-    # Add totals
-    items_data.extend([
-        ["", "", "Subtotal:", f"{quotation.subtotal:.2f}"],
-        ["", "", f"GST ({quotation.tax_rate*100:.0f}%):", f"{quotation.tax_amount:.2f}"],
-        ["", "", "Total:", f"{quotation.total_amount:.2f}"]
-    ])
-    
-    items_table = Table(items_data, colWidths=[3*inch, 0.8*inch, 1.2*inch, 1.2*inch])
-    items_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#f1f5f9')),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.HexColor('#1e293b')),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('ALIGN', (0, 1), (0, -1), 'LEFT'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, -1), 10),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
-        ('GRID', (0, 0), (-1, -4), 1, colors.black),
-        ('LINEBELOW', (2, -3), (-1, -1), 1, colors.black),
-        ('FONTNAME', (2, -1), (-1, -1), 'Helvetica-Bold'),
-        ('BACKGROUND', (2, -1), (-1, -1), colors.HexColor('#f1f5f9')),
-    ]))
-    
-    content.append(items_table)
-    
-    if quotation.notes:
-        content.append(Spacer(1, 30))
-        content.append(Paragraph("Notes:", styles['Heading3']))
-        content.append(Paragraph(quotation.notes, styles['Normal']))
-    
-    # Build the PDF
-    doc.build(content)
-    buffer.seek(0)
-    return buffer
+    from quotation_pdf import render_quotation_pdf
+    return render_quotation_pdf(quotation)
+
 
+async def idempotent_response(scope: str, key: Optional[str], payload: BaseModel, handler):
+    # Without a key the handler just runs; with one, retries replay the first response
+    if key is None:
+        return await handler()
+    async def run():
+        return jsonable_encoder(await handler())
+    record, replayed = await idempotency_store.run(db, scope, key, idempotency.fingerprint(jsonable_encoder(payload)), run)
+    return JSONResponse(record["body"], headers={"Idempotent-Replayed": "true"} if replayed else None)
 
 # Authentication routes
-@api_router.post("/admin/login", response_model=Token)
+@api_router.post("/admin/login", response_model=Token, dependencies=[Depends(admission_control("login"))])
 async def admin_login(admin_login: AdminLogin):
     # Secure admin credentials with 12-character passwords
     admin_credentials = {
@@ -357,18 +767,63 @@ async def admin_login(admin_login: AdminLogin):
     return {"access_token": access_token, "token_type": "bearer"}
 
 # Contact Form routes
-@api_router.post("/contact", response_model=ContactSubmission)
-async def submit_contact_form(submission: ContactSubmissionCreate):
+@api_router.post("/contact", response_model=ContactSubmission, dependencies=[Depends(admission_control("contact"))])
+async def submit_contact_form(
+    submission: ContactSubmissionCreate, idempotency_key: Optional[str] = Header(None, max_length=255)
+):
+    return await idempotent_response("contact", idempotency_key, submission, lambda: store_contact_submission(submission))
+
+async def store_contact_submission(submission: ContactSubmissionCreate) -> ContactSubmission:
     contact_dict = submission.dict()
     contact_obj = ContactSubmission(**contact_dict)
     result = await db.contact_submissions.insert_one(contact_obj.dict())
+    await update_rollups(analytics.record_lead(db, contact_obj.dict()))
+    search_engine.index("contact_submissions", contact_obj.dict())
+    await event_broker.publish("contact_submission.created", jsonable_encoder(contact_obj))
     return contact_obj
 
+def contact_submission_filter(is_read: Optional[bool] = None, service: Optional[str] = None) -> Dict[str, Any]:
+    # Shared by the list and export endpoints
+    filter_query = {}
+    if is_read is not None:
+        filter_query["is_read"] = is_read
+    if service:
+        filter_query["service"] = service
+    return filter_query
+
+def export_response(kind: str, export_format: str, cursor) -> StreamingResponse:
+    filename = f"{kind}-{datetime.utcnow():%Y%m%d-%H%M%S}.{export_format}"
+    return StreamingResponse(
+        exports.encode(kind, export_format, cursor),
+        media_type=exports.MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
 @api_router.get("/admin/contact-submissions", response_model=List[ContactSubmission])
-async def get_contact_submissions(current_admin: str = Depends(get_current_admin)):
-    submissions = await db.contact_submissions.find().sort("submitted_at", -1).to_list(1000)
+async def get_contact_submissions(
+    filter_query: Dict[str, Any] = Depends(contact_submission_filter),
+    include_archived: bool = False,
+    current_admin: str = Depends(get_current_admin)
+):
+    if include_archived:
+        submissions = await archive.find_with_archive(db, cold_storage, "contact_submissions", filter_query, 0, 1000)
+    else:
+        submissions = await db.contact_submissions.find(filter_query).sort("submitted_at", -1).to_list(1000)
     return [ContactSubmission(**submission) for submission in submissions]
 
+@api_router.get("/admin/contact-submissions/export")
+async def export_contact_submissions(
+    export_format: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$"),
+    filter_query: Dict[str, Any] = Depends(contact_submission_filter),
+    include_archived: bool = False,
+    current_admin: str = Depends(get_current_admin)
+):
+    if include_archived:
+        cursor = archive.stream_with_archive(db, cold_storage, "contact_submissions", filter_query, batch_size=1000)
+    else:
+        cursor = db.contact_submissions.find(filter_query, {"_id": 0}, batch_size=1000).sort("submitted_at", -1)
+    return export_response("contact_submissions", export_format, cursor)
+
 @api_router.patch("/admin/contact-submissions/{submission_id}/read")
 async def mark_submission_as_read(submission_id: str, current_admin: str = Depends(get_current_admin)):
     result = await db.contact_submissions.update_one(
@@ -377,19 +832,112 @@ async def mark_submission_as_read(submission_id: str, current_admin: str = Depen
     )
     if result.matched_count == 0:
         raise HTTPException(status_code=404, detail="Submission not found")
+    if result.modified_count:
+        await event_broker.publish("contact_submission.read", {"id": submission_id, "is_read": True})
     return {"message": "Submission marked as read"}
 
+@api_router.get("/admin/events")
+async def admin_event_stream(request: Request, current_admin: str = Depends(get_current_admin_for_stream)):
+    last_event_id = request.headers.get("last-event-id") or request.query_params.get("last_event_id")
+    subscriber = event_broker.subscribe(last_event_id or None)
+    return StreamingResponse(
+        event_broker.stream(subscriber),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+# Dashboard routes
+async def compute_admin_summary() -> AdminSummary:
+    # One aggregation round trip per collection and archive, all in parallel
+    leads_pipeline = [{"$facet": {
+        "total": [{"$count": "count"}],
+        "unread": [{"$match": {"is_read": False}}, {"$count": "count"}],
+        "per_service": [{"$group": {"_id": "$service", "count": {"$sum": 1}}}],
+    }}]
+    quotations_pipeline = [{"$group": {"_id": "$status", "count": {"$sum": 1}, "value": {"$sum": "$total_amount"}}}]
+    projects_pipeline = [{"$group": {"_id": "$category", "count": {"$sum": 1}}}]
+    testimonials_pipeline = [{"$group": {"_id": None, "count": {"$sum": 1}, "average_rating": {"$avg": "$rating"}}}]
+
+    leads, quotation_statuses, projects, testimonials, archived_leads, archived_quotations = await asyncio.gather(
+        db.contact_submissions.aggregate(leads_pipeline).to_list(1),
+        db.quotations.aggregate(quotations_pipeline).to_list(None),
+        db.projects.aggregate(projects_pipeline).to_list(None),
+        db.testimonials.aggregate(testimonials_pipeline).to_list(1),
+        # Archived leads are all read, and archived quotations all accepted or rejected
+        cold_storage.group(db, archive.TIERS["contact_submissions"], "service"),
+        cold_storage.group(db, archive.TIERS["quotations"], "status", "total_amount"),
+    )
+
+    leads = leads[0] if leads else {"total": [], "unread": [], "per_service": []}
+    testimonials = testimonials[0] if testimonials else {"count": 0, "average_rating": None}
+    leads_per_service = {s["_id"]: s["count"] for s in leads["per_service"]}
+    for service, group in archived_leads.items():
+        leads_per_service[service] = leads_per_service.get(service, 0) + group["count"]
+    quotations_per_status = {q["_id"]: q["count"] for q in quotation_statuses}
+    pipeline_value = {q["_id"]: q["value"] for q in quotation_statuses}
+    for quotation_status, group in archived_quotations.items():
+        quotations_per_status[quotation_status] = quotations_per_status.get(quotation_status, 0) + group["count"]
+        pipeline_value[quotation_status] = pipeline_value.get(quotation_status, 0) + group["value"]
+    pipeline_value = {key: round(value, 2) for key, value in pipeline_value.items()}
+    average_rating = testimonials["average_rating"]
+    return AdminSummary(
+        total_leads=sum(leads_per_service.values()),
+        unread_leads=leads["unread"][0]["count"] if leads["unread"] else 0,
+        leads_per_service=leads_per_service,
+        total_quotations=sum(quotations_per_status.values()),
+        quotations_per_status=quotations_per_status,
+        pipeline_value_per_status=pipeline_value,
+        open_pipeline_value=round(pipeline_value.get("draft", 0) + pipeline_value.get("sent", 0), 2),
+        total_projects=sum(p["count"] for p in projects),
+        projects_per_category={p["_id"]: p["count"] for p in projects},
+        total_testimonials=testimonials["count"],
+        average_testimonial_rating=round(average_rating, 2) if average_rating is not None else None,
+        generated_at=datetime.utcnow(),
+    )
+
+@api_router.get("/admin/summary", response_model=AdminSummary)
+async def get_admin_summary(current_admin: str = Depends(get_current_admin)):
+    summary = summary_cache.get("summary")
+    if summary is None:
+        summary = await compute_admin_summary()
+        summary_cache.set("summary", summary)
+    return summary
+
+# Analytics routes
+async def update_rollups(update):
+    # Rollups are derived data: a failure here must not fail a write that is already stored.
+    # `python analytics.py rebuild` repairs any drift.
+    try:
+        await update
+    except Exception:
+        logger.exception("Updating analytics rollups failed")
+
+@api_router.get("/admin/analytics/leads", response_model=List[LeadRollup])
+async def get_lead_analytics(
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    service: Optional[str] = None,
+    current_admin: str = Depends(get_current_admin)
+):
+    end = end or datetime.utcnow()
+    start = start or end - timedelta(days=30)
+    return await analytics.lead_series(db, start, end, service)
+
+@api_router.get("/admin/analytics/quotations", response_model=List[QuotationRollup])
+async def get_quotation_analytics(
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    status_filter: Optional[str] = Query(None, alias="status"),
+    current_admin: str = Depends(get_current_admin)
+):
+    end = end or datetime.utcnow()
+    start = start or end - timedelta(days=365)
+    return await analytics.quotation_series(db, start, end, status_filter)
+
 # Quotation routes
-@api_router.post("/admin/quotations", response_model=Quotation)
-async def create_quotation(quotation_data: QuotationCreate, current_admin: str = Depends(get_current_admin)):
-    # Generate quote number
-    quote_count = await db.quotations.count_documents({}) + 1
-    quote_number = f"NT-{datetime.now().year}-{quote_count:04d}"
-    
-    # Calculate totals
-    subtotal = sum(item.total for item in quotation_data.items)
-    tax_amount = subtotal * 0.06  # 6% GST
-    total_amount = subtotal + tax_amount
+def build_quotation(quotation_data: QuotationCreate, quote_number: str) -> Quotation:
+    # Calculate totals to the cent
+    totals = quotations.compute_totals((item.total for item in quotation_data.items), 0.06)  # 6% GST
     
     # Set validity date
     valid_until = datetime.utcnow() + timedelta(days=quotation_data.valid_days)
@@ -397,43 +945,123 @@ async def create_quotation(quotation_data: QuotationCreate, current_admin: str =
     quotation_dict = quotation_data.dict()
     quotation_dict.update({
         "quote_number": quote_number,
-        "subtotal": subtotal,
-        "tax_amount": tax_amount,
-        "total_amount": total_amount,
+        **totals,
         "valid_until": valid_until
     })
-    
-    quotation_obj = Quotation(**quotation_dict)
-    result = await db.quotations.insert_one(quotation_obj.dict())
+    return Quotation(**quotation_dict)
+
+@api_router.post("/admin/quotations", response_model=Quotation)
+async def create_quotation(
+    quotation_data: QuotationCreate,
+    idempotency_key: Optional[str] = Header(None, max_length=255),
+    current_admin: str = Depends(get_current_admin)
+):
+    return await idempotent_response(
+        f"quotations:{current_admin}", idempotency_key, quotation_data, lambda: store_quotation(quotation_data)
+    )
+
+async def store_quotation(quotation_data: QuotationCreate) -> Quotation:
+    quote_number = await quotations.next_quote_number(db)
+    quotation_obj = build_quotation(quotation_data, quote_number)
+    quotation_doc = quotation_obj.dict()
+    result = await db.quotations.insert_one(quotation_doc)
+    await update_rollups(analytics.record_quotation(db, quotation_doc))
     return quotation_obj
 
+def quotation_filter(
+    status_filter: Optional[str] = Query(None, alias="status"),
+    client_email: Optional[str] = None,
+    expiring_within_days: Optional[int] = Query(None, ge=0),
+    min_amount: Optional[float] = Query(None, ge=0),
+    max_amount: Optional[float] = Query(None, ge=0),
+) -> Dict[str, Any]:
+    # Shared by the list and export endpoints
+    filter_query = {}
+    if status_filter:
+        filter_query["status"] = status_filter
+    if client_email:
+        filter_query["client_email"] = client_email
+    if expiring_within_days is not None:
+        now = datetime.utcnow()
+        filter_query["valid_until"] = {"$gte": now, "$lte": now + timedelta(days=expiring_within_days)}
+        filter_query.setdefault("status", {"$in": list(quotations.OPEN_STATUSES)})
+    if min_amount is not None or max_amount is not None:
+        filter_query["total_amount"] = {}
+        if min_amount is not None:
+            filter_query["total_amount"]["$gte"] = min_amount
+        if max_amount is not None:
+            filter_query["total_amount"]["$lte"] = max_amount
+    return filter_query
+
 @api_router.get("/admin/quotations", response_model=List[Quotation])
-async def get_quotations(current_admin: str = Depends(get_current_admin)):
-    quotations = await db.quotations.find().sort("created_at", -1).to_list(1000)
-    return [Quotation(**quotation) for quotation in quotations]
+async def get_quotations(
+    filter_query: Dict[str, Any] = Depends(quotation_filter),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(1000, ge=1, le=1000),
+    include_archived: bool = False,
+    current_admin: str = Depends(get_current_admin)
+):
+    if include_archived:
+        found = await archive.find_with_archive(db, cold_storage, "quotations", filter_query, skip, limit)
+        return [Quotation(**quotation) for quotation in found]
+    cursor = db.quotations.find(filter_query).sort("created_at", -1).skip(skip).limit(limit)
+    return [Quotation(**quotation) for quotation in await cursor.to_list(limit)]
+
+@api_router.get("/admin/quotations/export")
+async def export_quotations(
+    export_format: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$"),
+    filter_query: Dict[str, Any] = Depends(quotation_filter),
+    include_archived: bool = False,
+    current_admin: str = Depends(get_current_admin)
+):
+    if include_archived:
+        cursor = archive.stream_with_archive(db, cold_storage, "quotations", filter_query, batch_size=500)
+    else:
+        cursor = db.quotations.find(filter_query, {"_id": 0}, batch_size=500).sort("created_at", -1)
+    return export_response("quotations", export_format, cursor)
 
 @api_router.get("/admin/quotations/{quotation_id}", response_model=Quotation)
 async def get_quotation(quotation_id: str, current_admin: str = Depends(get_current_admin)):
-    quotation = await db.quotations.find_one({"id": quotation_id})
+    quotation = await archive.find_one_with_archive(db, cold_storage, "quotations", {"id": quotation_id})
     if not quotation:
         raise HTTPException(status_code=404, detail="Quotation not found")
     return Quotation(**quotation)
 
+@api_router.patch("/admin/quotations/{quotation_id}/status", response_model=Quotation)
+async def update_quotation_status(
+    quotation_id: str, status_update: QuotationStatusUpdate, current_admin: str = Depends(get_current_admin)
+):
+    new_status = status_update.status
+    if new_status not in quotations.STATUSES:
+        raise HTTPException(status_code=400, detail=f"Unknown status: {new_status}")
+    quotation = await db.quotations.find_one({"id": quotation_id})
+    if not quotation:
+        raise HTTPException(status_code=404, detail="Quotation not found")
+    if not quotations.can_transition(quotation["status"], new_status):
+        raise HTTPException(status_code=409, detail=f"Cannot change status from {quotation['status']} to {new_status}")
+    if new_status == "accepted" and quotation["valid_until"] < datetime.utcnow():
+        raise HTTPException(status_code=409, detail="Quotation has expired")
+
+    # Conditional on the status we validated against, so concurrent changes can't both apply
+    updated = await db.quotations.find_one_and_update(
+        {"id": quotation_id, "status": quotation["status"]},
+        {"$set": {"status": new_status, "status_changed_at": datetime.utcnow()}},
+        return_document=ReturnDocument.AFTER,
+    )
+    if updated is None:
+        raise HTTPException(status_code=409, detail="Quotation status was changed concurrently")
+    await update_rollups(analytics.record_quotation_status_change(db, [quotation], new_status))
+    await event_broker.publish("quotation.status_changed", {"id": quotation_id, "from": quotation["status"], "to": new_status})
+    return Quotation(**updated)
+
 @api_router.get("/admin/quotations/{quotation_id}/pdf")
 async def download_quotation_pdf(quotation_id: str, current_admin: str = Depends(get_current_admin)):
-    quotation_data = await db.quotations.find_one({"id": quotation_id})
+    quotation_data = await archive.find_one_with_archive(db, cold_storage, "quotations", {"id": quotation_id})
     if not quotation_data:
         raise HTTPException(status_code=404, detail="Quotation not found")
     
     quotation = Quotation(**quotation_data)
-    pdf_buffer = generate_quotation_pdf(quotation)
-    
-    # Save PDF to file system
-    pdf_filename = f"quotation_{quotation.quote_number}.pdf"
-    pdf_path = f"uploads/invoices/{pdf_filename}"
-    
-    with open(pdf_path, "wb") as f:
-        f.write(pdf_buffer.getvalue())
+    pdf_path, pdf_filename = await render_quotation_pdf_file(quotation)
     
     return FileResponse(
         path=pdf_path,
@@ -441,24 +1069,44 @@ async def download_quotation_pdf(quotation_id: str, current_admin: str = Depends
         media_type="application/pdf"
     )
 
+@api_router.post("/admin/quotations/{quotation_id}/pdf", response_model=JobAccepted, status_code=status.HTTP_202_ACCEPTED)
+async def enqueue_quotation_pdf(quotation_id: str, current_admin: str = Depends(get_current_admin)):
+    if not await archive.find_one_with_archive(db, cold_storage, "quotations", {"id": quotation_id}):
+        raise HTTPException(status_code=404, detail="Quotation not found")
+    job = await job_queue.enqueue("quotation_pdf", {"quotation_id": quotation_id})
+    return {"job_id": job["id"], "status": job["status"]}
+
 # Project routes
 @api_router.post("/admin/projects", response_model=Project)
 async def create_project(project_data: ProjectCreate, current_admin: str = Depends(get_current_admin)):
     project_dict = project_data.dict()
     project_obj = Project(**project_dict)
     result = await db.projects.insert_one(project_obj.dict())
+    search_engine.index("projects", project_obj.dict())
+    facet_index.apply(project_obj.dict())
+    invalidate_public_content()
     return project_obj
 
 @api_router.get("/projects", response_model=List[Project])
-async def get_projects(category: Optional[str] = None, featured_only: bool = False):
-    filter_query = {}
-    if category:
-        filter_query["category"] = category
-    if featured_only:
-        filter_query["is_featured"] = True
-    
-    projects = await db.projects.find(filter_query).sort("completion_date", -1).to_list(1000)
-    return [Project(**project) for project in projects]
+async def get_projects(
+    request: Request,
+    category: Optional[str] = None,
+    featured_only: bool = False,
+    tags: Optional[List[str]] = Query(None),
+    tag_match: str = Query("all", pattern="^(all|any)$"),
+):
+    return await cached_json_response(
+        request,
+        projects_cache_key(category, featured_only, tags, tag_match),
+        lambda: load_public_projects(category, featured_only, tags, tag_match),
+    )
+
+@api_router.get("/projects/facets", response_model=ProjectFacets)
+async def get_project_facets(request: Request):
+    async def load():
+        await facet_index.sync(db, public_cache.generation())
+        return facet_index.counts()
+    return await cached_json_response(request, PROJECT_FACETS_CACHE_KEY, load)
 
 @api_router.get("/admin/projects", response_model=List[Project])
 async def get_admin_projects(current_admin: str = Depends(get_current_admin)):
@@ -467,10 +1115,21 @@ async def get_admin_projects(current_admin: str = Depends(get_current_admin)):
 
 @api_router.get("/projects/{project_id}", response_model=Project)
 async def get_project(project_id: str):
-    project = await db.projects.find_one({"id": project_id})
-    if not project:
+    async def load():
+        project = await db.projects.find_one({"id": project_id})
+        if not project:
+            raise HTTPException(status_code=404, detail="Project not found")
+        return Project(**project)
+    return await coalesce(("project", project_id, public_cache.generation()), load)
+
+@api_router.get("/projects/{project_id}/related", response_model=List[Project])
+async def get_related_projects(project_id: str, limit: int = Query(6, ge=1, le=24)):
+    await facet_index.sync(db, public_cache.generation())
+    if project_id not in facet_index:
         raise HTTPException(status_code=404, detail="Project not found")
-    return Project(**project)
+    related_ids = facet_index.related(project_id, limit)
+    projects = {project["id"]: project for project in await db.projects.find({"id": {"$in": related_ids}}).to_list(limit)}
+    return [Project(**projects[related_id]) for related_id in related_ids if related_id in projects]
 
 @api_router.patch("/admin/projects/{project_id}", response_model=Project)
 async def update_project(project_id: str, project_update: ProjectUpdate, current_admin: str = Depends(get_current_admin)):
@@ -485,6 +1144,9 @@ async def update_project(project_id: str, project_update: ProjectUpdate, current
         raise HTTPException(status_code=404, detail="Project not found")
     
     updated_project = await db.projects.find_one({"id": project_id})
+    search_engine.index("projects", updated_project)
+    facet_index.apply(updated_project)
+    invalidate_public_content()
     return Project(**updated_project)
 
 @api_router.delete("/admin/projects/{project_id}")
@@ -492,12 +1154,16 @@ async def delete_project(project_id: str, current_admin: str = Depends(get_curre
     result = await db.projects.delete_one({"id": project_id})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Project not found")
+    search_engine.remove("projects", [project_id])
+    facet_index.remove(project_id)
+    invalidate_public_content()
     return {"message": "Project deleted successfully"}
 
 @api_router.post("/admin/projects/{project_id}/images")
 async def upload_project_image(
     project_id: str, 
     file: UploadFile = File(...), 
+    background: bool = False,
     current_admin: str = Depends(get_current_admin)
 ):
     # Check if project exists
@@ -512,28 +1178,165 @@ async def upload_project_image(
     # Generate unique filename
     file_extension = file.filename.split(".")[-1]
     unique_filename = f"{uuid.uuid4()}.{file_extension}"
-    file_path = f"uploads/projects/{unique_filename}"
+    file_path = f"uploads/{'staging' if background else 'projects'}/{unique_filename}"
     
     # Save file
     async with aiofiles.open(file_path, 'wb') as out_file:
         content = await file.read()
         await out_file.write(content)
-    
-    # Update project with new image
+
+    if background:
+        # Processing and attaching the image happen in the job queue
+        job = await job_queue.enqueue("project_image", {"project_id": project_id, "filename": unique_filename})
+        return JSONResponse(status_code=status.HTTP_202_ACCEPTED, content={"job_id": job["id"], "status": job["status"]})
+
     image_url = f"/uploads/projects/{unique_filename}"
-    await db.projects.update_one(
+    await attach_project_image(project_id, image_url)
+    return {"image_url": image_url}
+
+async def attach_project_image(project_id: str, image_url: str):
+    await attach_project_images(project_id, [image_url])
+
+async def attach_project_images(project_id: str, image_urls: List[str]) -> Optional[dict]:
+    # One atomic update: append the images and make the first one featured if the project has none
+    project = await db.projects.find_one_and_update(
         {"id": project_id},
-        {"$push": {"images": image_url}}
+        [{"$set": {
+            "images": {"$concatArrays": [{"$ifNull": ["$images", []]}, image_urls]},
+            "featured_image": {"$ifNull": ["$featured_image", image_urls[0]]},
+        }}],
+        projection={"_id": 0, "featured_image": 1},
+        return_document=ReturnDocument.AFTER,
     )
-    
-    # If it's the first image, set as featured image
-    if not project.get("featured_image"):
-        await db.projects.update_one(
-            {"id": project_id},
-            {"$set": {"featured_image": image_url}}
-        )
-    
-    return {"image_url": image_url}
+    invalidate_public_content()
+    return project
+
+@api_router.post("/admin/projects/{project_id}/images/batch", response_model=ImageBatchUploadResult)
+async def upload_project_images(
+    project_id: str,
+    files: List[UploadFile] = File(...),
+    current_admin: str = Depends(get_current_admin)
+):
+    if len(files) > IMAGE_BATCH_MAX_FILES:
+        raise HTTPException(status_code=400, detail=f"At most {IMAGE_BATCH_MAX_FILES} files per request")
+    if not await db.projects.count_documents({"id": project_id}, limit=1):
+        raise HTTPException(status_code=404, detail="Project not found")
+
+    slots = asyncio.Semaphore(IMAGE_UPLOAD_CONCURRENCY)
+
+    async def save(file: UploadFile) -> ImageUploadResult:
+        result = ImageUploadResult(filename=file.filename or "")
+        if not (file.content_type or "").startswith("image/"):
+            result.error = "File must be an image"
+            return result
+        unique_filename = f"{uuid.uuid4()}.{(file.filename or '').split('.')[-1]}"
+        file_path = f"uploads/projects/{unique_filename}"
+        async with slots:
+            try:
+                async with aiofiles.open(file_path, 'wb') as out_file:
+                    while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                        await out_file.write(chunk)
+            except OSError as e:
+                logger.warning("Could not store %s: %s", file.filename, e)
+                await asyncio.to_thread(Path(file_path).unlink, missing_ok=True)
+                result.error = "Could not store file"
+                return result
+        result.image_url = f"/uploads/projects/{unique_filename}"
+        return result
+
+    results = await asyncio.gather(*(save(file) for file in files))
+    image_urls = [result.image_url for result in results if result.image_url]
+    project = None
+    if image_urls:
+        project = await attach_project_images(project_id, image_urls)
+        if project is None:
+            # Deleted while the files were being written
+            for image_url in image_urls:
+                await asyncio.to_thread(Path(image_url.lstrip("/")).unlink, missing_ok=True)
+            raise HTTPException(status_code=404, detail="Project not found")
+    return ImageBatchUploadResult(
+        uploaded=len(image_urls),
+        failed=len(results) - len(image_urls),
+        featured_image=project["featured_image"] if project else None,
+        results=results,
+    )
+
+# Bulk routes
+async def select_bulk_targets(collection, selection: BulkSelection, filter_model: Optional[BaseModel], field: Optional[str] = None):
+    query = {k: v for k, v in filter_model.dict().items() if v is not None} if filter_model else {}
+    if selection.ids is not None:
+        query["id"] = {"$in": selection.ids}
+    elif not query:
+        raise HTTPException(status_code=400, detail="Provide ids or a non-empty filter")
+
+    projection = {"_id": 0, "id": 1}
+    if field:
+        projection[field] = 1
+    docs = await collection.find(query, projection).to_list(BULK_MAX_ITEMS + 1)
+    if len(docs) > BULK_MAX_ITEMS:
+        raise HTTPException(status_code=400, detail=f"Selection matches more than {BULK_MAX_ITEMS} documents")
+    return docs
+
+def bulk_outcomes(selection: BulkSelection, docs: List[dict], outcome) -> Dict[str, str]:
+    results = {doc["id"]: outcome(doc) for doc in docs}
+    for missing in set(selection.ids or []) - results.keys():
+        results[missing] = "not_found"
+    return results
+
+async def bulk_set(collection, selection: BulkSelection, filter_model: Optional[BaseModel], field: str, value) -> BulkResult:
+    docs = await select_bulk_targets(collection, selection, filter_model, field)
+    changed = {doc["id"] for doc in docs if doc.get(field) != value}
+    if changed:
+        await collection.update_many({"id": {"$in": list(changed)}}, {"$set": {field: value}})
+    results = bulk_outcomes(selection, docs, lambda doc: "updated" if doc["id"] in changed else "unchanged")
+    return BulkResult(matched=len(docs), modified=len(changed), results=results)
+
+async def bulk_delete(collection, selection: BulkSelection, filter_model: Optional[BaseModel]) -> BulkResult:
+    docs = await select_bulk_targets(collection, selection, filter_model)
+    result = await collection.delete_many({"id": {"$in": [doc["id"] for doc in docs]}}) if docs else None
+    results = bulk_outcomes(selection, docs, lambda doc: "deleted")
+    return BulkResult(matched=len(docs), modified=result.deleted_count if result else 0, results=results)
+
+@api_router.post("/admin/contact-submissions/bulk/read", response_model=BulkResult)
+async def bulk_mark_submissions_read(selection: ContactSubmissionBulkRead, current_admin: str = Depends(get_current_admin)):
+    result = await bulk_set(db.contact_submissions, selection, selection.filter, "is_read", selection.is_read)
+    updated = [submission_id for submission_id, outcome in result.results.items() if outcome == "updated"]
+    if updated:
+        await event_broker.publish("contact_submission.bulk_read", {"ids": updated, "is_read": selection.is_read})
+    return result
+
+@api_router.post("/admin/projects/bulk/delete", response_model=BulkResult)
+async def bulk_delete_projects(selection: ProjectBulkSelection, current_admin: str = Depends(get_current_admin)):
+    result = await bulk_delete(db.projects, selection, selection.filter)
+    deleted = [project_id for project_id, outcome in result.results.items() if outcome == "deleted"]
+    search_engine.remove("projects", deleted)
+    for project_id in deleted:
+        facet_index.remove(project_id)
+    if result.modified:
+        invalidate_public_content()
+    return result
+
+@api_router.post("/admin/projects/bulk/feature", response_model=BulkResult)
+async def bulk_feature_projects(selection: ProjectBulkFeature, current_admin: str = Depends(get_current_admin)):
+    result = await bulk_set(db.projects, selection, selection.filter, "is_featured", selection.is_featured)
+    if result.modified:
+        invalidate_public_content()
+    return result
+
+@api_router.post("/admin/testimonials/bulk/delete", response_model=BulkResult)
+async def bulk_delete_testimonials(selection: TestimonialBulkSelection, current_admin: str = Depends(get_current_admin)):
+    result = await bulk_delete(db.testimonials, selection, selection.filter)
+    search_engine.remove("testimonials", [testimonial_id for testimonial_id, outcome in result.results.items() if outcome == "deleted"])
+    if result.modified:
+        invalidate_public_content()
+    return result
+
+@api_router.post("/admin/testimonials/bulk/feature", response_model=BulkResult)
+async def bulk_feature_testimonials(selection: TestimonialBulkFeature, current_admin: str = Depends(get_current_admin)):
+    result = await bulk_set(db.testimonials, selection, selection.filter, "is_featured", selection.is_featured)
+    if result.modified:
+        invalidate_public_content()
+    return result
 
 # Testimonial routes
 @api_router.post("/admin/testimonials", response_model=Testimonial)
@@ -541,16 +1344,15 @@ async def create_testimonial(testimonial_data: TestimonialCreate, current_admin:
     testimonial_dict = testimonial_data.dict()
     testimonial_obj = Testimonial(**testimonial_dict)
     result = await db.testimonials.insert_one(testimonial_obj.dict())
+    search_engine.index("testimonials", testimonial_obj.dict())
+    invalidate_public_content()
     return testimonial_obj
 
 @api_router.get("/testimonials", response_model=List[Testimonial])
-async def get_testimonials(featured_only: bool = False):
-    filter_query = {}
-    if featured_only:
-        filter_query["is_featured"] = True
-    
-    testimonials = await db.testimonials.find(filter_query).sort("created_at", -1).to_list(1000)
-    return [Testimonial(**testimonial) for testimonial in testimonials]
+async def get_testimonials(request: Request, featured_only: bool = False):
+    return await cached_json_response(
+        request, testimonials_cache_key(featured_only), lambda: load_public_testimonials(featured_only)
+    )
 
 @api_router.get("/admin/testimonials", response_model=List[Testimonial])
 async def get_admin_testimonials(current_admin: str = Depends(get_current_admin)):
@@ -568,8 +1370,10 @@ async def update_testimonial(testimonial_id: str, testimonial_update: Testimonia
     
     if result.matched_count == 0:
         raise HTTPException(status_code=404, detail="Testimonial not found")
+    invalidate_public_content()
     
     updated_testimonial = await db.testimonials.find_one({"id": testimonial_id})
+    search_engine.index("testimonials", updated_testimonial)
     return Testimonial(**updated_testimonial)
 
 @api_router.delete("/admin/testimonials/{testimonial_id}")
@@ -577,6 +1381,8 @@ async def delete_testimonial(testimonial_id: str, current_admin: str = Depends(g
     result = await db.testimonials.delete_one({"id": testimonial_id})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Testimonial not found")
+    search_engine.remove("testimonials", [testimonial_id])
+    invalidate_public_content()
     return {"message": "Testimonial deleted successfully"}
 
 @api_router.post("/admin/testimonials/{testimonial_id}/image")
@@ -610,9 +1416,26 @@ async def upload_testimonial_image(
         {"id": testimonial_id},
         {"$set": {"image": image_url}}
     )
+    invalidate_public_content()
     
     return {"image_url": image_url}
 
+# Search route (admin only: results include contact submissions)
+@api_router.get("/search", response_model=SearchResults)
+async def search_content(
+    q: str = Query(..., min_length=1, max_length=200),
+    types: List[str] = Query(list(search.SEARCH_FIELDS)),
+    page: int = Query(1, ge=1),
+    page_size: int = Query(20, ge=1, le=100),
+    include_archived: bool = False,
+    current_admin: str = Depends(get_current_admin),
+):
+    unknown = set(types) - search.SEARCH_FIELDS.keys()
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown search types: {', '.join(sorted(unknown))}")
+    total, hits = await search_engine.search(db, q, types, (page - 1) * page_size, page_size, include_archived)
+    return SearchResults(query=q, total=total, page=page, page_size=page_size, results=hits)
+
 # File serving route for uploaded images
 @api_router.get("/uploads/{folder}/{filename}")
 async def serve_uploaded_file(folder: str, filename: str):
@@ -626,17 +1449,87 @@ async def serve_uploaded_file(folder: str, filename: str):
 async def root():
     return {"message": "Netrik Techworks API v1.0.0"}
 
-@api_router.post("/status", response_model=StatusCheck)
+# Background job routes
+@job_queue.handler("quotation_pdf", concurrency=2)
+async def quotation_pdf_job(job: JobContext):
+    quotation_id = job.payload["quotation_id"]
+    quotation_data = await archive.find_one_with_archive(db, cold_storage, "quotations", {"id": quotation_id})
+    if not quotation_data:
+        raise PermanentJobError("Quotation not found")
+    await job.progress(0.1, "Rendering PDF")
+    pdf_path, pdf_filename = await render_quotation_pdf_file(Quotation(**quotation_data))
+    return {"path": pdf_path, "filename": pdf_filename, "download_url": f"/api/admin/jobs/{job.job['id']}/download"}
+
+@job_queue.handler("project_image", concurrency=4)
+async def project_image_job(job: JobContext):
+    staged_path = f"uploads/staging/{job.payload['filename']}"
+    final_path = f"uploads/projects/{job.payload['filename']}"
+    if not await db.projects.count_documents({"id": job.payload["project_id"]}, limit=1):
+        await asyncio.to_thread(Path(staged_path).unlink, missing_ok=True)
+        raise PermanentJobError("Project not found")
+    # A retry after a crash may find the file already moved
+    if os.path.exists(staged_path):
+        await asyncio.to_thread(os.replace, staged_path, final_path)
+    image_url = f"/uploads/projects/{job.payload['filename']}"
+    await attach_project_image(job.payload["project_id"], image_url)
+    return {"image_url": image_url}
+
+@api_router.get("/admin/jobs/{job_id}", response_model=Job)
+async def get_job(job_id: str, current_admin: str = Depends(get_current_admin)):
+    job = await job_queue.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return Job(**job)
+
+@api_router.get("/admin/jobs/{job_id}/download")
+async def download_job_result(job_id: str, current_admin: str = Depends(get_current_admin)):
+    job = await job_queue.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    result = job.get("result") or {}
+    if job["status"] != "succeeded" or "path" not in result:
+        raise HTTPException(status_code=409, detail=f"Job has no downloadable result (status: {job['status']})")
+    return FileResponse(path=result["path"], filename=result.get("filename"))
+
+# Health routes
+@api_router.get("/health/live")
+async def liveness():
+    return {"status": "alive", "uptime": time.time() - worker_state["started_at"]}
+
+@api_router.get("/health/ready")
+async def readiness():
+    if worker_state["ready_at"] is None:
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={"status": "warming", "error": worker_state["warmup_error"]},
+        )
+    return {"status": "ready", "warmup_seconds": worker_state["ready_at"] - worker_state["started_at"]}
+
+@api_router.get("/admin/diagnostics/event-loop", response_model=EventLoopDiagnostics)
+async def get_event_loop_diagnostics(
+    limit: int = Query(10, ge=1, le=50),
+    current_admin: str = Depends(get_current_admin)
+):
+    # Per worker process: each worker has its own loop (see pid)
+    return loop_watch.snapshot(limit)
+
+@api_router.post("/status", response_model=StatusCheck, dependencies=[Depends(admission_control("status"))])
 async def create_status_check(input: StatusCheckCreate):
     status_dict = input.dict()
     status_obj = StatusCheck(**status_dict)
-    _ = await db.status_checks.insert_one(status_obj.dict())
+    await status_check_retention.record(db, status_obj.dict())
     return status_obj
 
 @api_router.get("/status", response_model=List[StatusCheck])
-async def get_status_checks():
-    status_checks = await db.status_checks.find().to_list(1000)
-    return [StatusCheck(**status_check) for status_check in status_checks]
+async def get_status_checks(limit: int = Query(1000, ge=1, le=1000)):
+    # Newest first, straight off the retention index
+    checks = await status_check_retention.latest(db, limit)
+    return [StatusCheck(**status_check) for status_check in checks]
+
+@api_router.get("/status/rollups", response_model=List[StatusCheckRollup])
+async def get_status_check_rollups(days: int = Query(7, ge=1, le=366), client_name: Optional[str] = None):
+    end = datetime.utcnow()
+    return await status_check_retention.rollups(db, end - timedelta(days=days), end, client_name)
 
 # Include the router in the main app
 app.include_router(api_router)
@@ -648,6 +1541,8 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(CompressionMiddleware)
+app.add_middleware(LoopWatchMiddleware, watch=loop_watch)
 
 # Configure logging
 logging.basicConfig(
@@ -656,10 +1551,8 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-@app.on_event("shutdown")
-async def shutdown_db_client():
-    client.close()
-
 if __name__ == "__main__":
-    import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8001)
+    # Single worker by default; set WEB_CONCURRENCY or run serve.py --workers N for production
+    os.environ.setdefault("WEB_CONCURRENCY", "1")
+    from serve import main
+    main()
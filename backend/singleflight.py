@@ -0,0 +1,45 @@
+"""Coalesce identical concurrent work into one execution.
+
+``SingleFlight.do(key, func)`` runs ``func`` once for all callers that ask for
+the same key while it is in flight; every caller gets the same result, or the
+same exception. The work runs in its own task, so a caller that times out or
+disconnects doesn't cancel it for the others. Nothing is kept after the call
+completes: this deduplicates concurrent work, it is not a cache.
+"""
+import asyncio
+from typing import Awaitable, Callable, Dict, Hashable, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    def __init__(self, timeout: Optional[float] = None, enabled: bool = True):
+        self.timeout = timeout
+        self.enabled = enabled
+        self.executions = 0
+        self.coalesced = 0
+        self._calls: Dict[Hashable, asyncio.Task] = {}
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[T]], timeout: Optional[float] = None) -> T:
+        """Await the shared result for ``key``; raises ``asyncio.TimeoutError`` after ``timeout`` seconds."""
+        if not self.enabled:
+            return await func()
+        task = self._calls.get(key)
+        if task is None:
+            self.executions += 1
+            task = asyncio.ensure_future(func())
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._finished(key, done))
+        else:
+            self.coalesced += 1
+        return await asyncio.wait_for(asyncio.shield(task), timeout if timeout is not None else self.timeout)
+
+    def _finished(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        # Every waiter may have timed out; mark the exception as retrieved either way
+        if not task.cancelled():
+            task.exception()
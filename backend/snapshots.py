@@ -0,0 +1,135 @@
+"""Static JSON snapshots of the public portfolio.
+
+After admin writes to projects or testimonials the API republishes every
+public listing (each category x featured combination) as a new snapshot
+version: plain JSON plus precompressed ``.gz``/``.br`` variants, written into a
+fresh directory and switched in by atomically replacing the ``CURRENT``
+pointer. The public routes serve these files directly and only fall back to
+the response cache/Mongo when a snapshot is missing or older than the current
+shared cache generation.
+
+Rebuild everything by hand (from the ``backend`` directory)::
+
+    python snapshots.py rebuild
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import shutil
+import time
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from compression import MIN_SIZE, PRECOMPRESSED_LEVELS, compress, supported_encodings
+
+SNAPSHOT_DIR = Path(os.environ.get("SNAPSHOT_DIR", "snapshots"))
+KEEP_VERSIONS = 3
+EXTENSIONS = {"gzip": "gz", "br": "br"}
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class SnapshotStore:
+    def __init__(self, directory: Path = SNAPSHOT_DIR):
+        self.directory = Path(directory)
+        self._pointer: Optional[dict] = None
+        self._pointer_mtime: Optional[int] = None
+
+    def current(self) -> Optional[dict]:
+        path = self.directory / "CURRENT"
+        try:
+            mtime = path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return None
+        if mtime != self._pointer_mtime:
+            try:
+                self._pointer = json.loads(path.read_bytes())
+            except (OSError, ValueError):
+                return None
+            self._pointer_mtime = mtime
+        return self._pointer
+
+    def lookup(self, key: str, encoding: Optional[str], generation: int) -> Optional[Tuple[Path, Optional[str]]]:
+        """Return the file (and its encoding) serving ``key``, if a fresh snapshot has it."""
+        pointer = self.current()
+        if not pointer or pointer["generation"] != generation:
+            return None
+        entry = pointer["files"].get(key)
+        if entry is None:
+            return None
+        version_dir = self.directory / pointer["version"]
+        if encoding and encoding in entry["encodings"]:
+            return version_dir / f"{entry['name']}.{EXTENSIONS[encoding]}", encoding
+        return version_dir / entry["name"], None
+
+    def publish(self, bodies: Dict[str, bytes], generation: int) -> str:
+        """Write a new snapshot version and point ``CURRENT`` at it. Blocking; run in a thread."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        version = f"v{time.time_ns()}-{os.getpid()}"
+        staging = self.directory / f".{version}.tmp"
+        staging.mkdir()
+
+        files = {}
+        for key, body in bodies.items():
+            name = hashlib.sha1(key.encode("utf-8")).hexdigest() + ".json"
+            (staging / name).write_bytes(body)
+            encodings = []
+            if len(body) >= MIN_SIZE:
+                for encoding in supported_encodings():
+                    compressed = compress(body, encoding, PRECOMPRESSED_LEVELS[encoding])
+                    (staging / f"{name}.{EXTENSIONS[encoding]}").write_bytes(compressed)
+                    encodings.append(encoding)
+            files[key] = {"name": name, "encodings": encodings}
+        os.rename(staging, self.directory / version)
+
+        # Never replace a snapshot built from newer data (another worker may have raced us)
+        current = self.current()
+        if current and current["generation"] > generation:
+            shutil.rmtree(self.directory / version, ignore_errors=True)
+            return current["version"]
+
+        pointer = {"version": version, "generation": generation, "published_at": time.time(), "files": files}
+        _write_atomic(self.directory / "CURRENT", json.dumps(pointer).encode("utf-8"))
+        self._prune()
+        return version
+
+    def _prune(self) -> None:
+        versions = sorted(
+            (p for p in self.directory.iterdir() if p.is_dir() and p.name.startswith("v")),
+            key=lambda p: int(p.name[1:].split("-", 1)[0]),
+        )
+        for stale in versions[:-KEEP_VERSIONS]:
+            shutil.rmtree(stale, ignore_errors=True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Manage static snapshots of the public portfolio")
+    parser.add_argument("command", choices=["rebuild"])
+    parser.parse_args()
+
+    import server
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    async def rebuild():
+        server.client = AsyncIOMotorClient(server.mongo_url)
+        server.db = server.client[os.environ["DB_NAME"]]
+        try:
+            version = await server.publish_public_snapshots()
+        finally:
+            server.client.close()
+        print(f"Published snapshot {version} to {server.snapshot_store.directory.resolve()}")
+
+    asyncio.run(rebuild())
+
+
+if __name__ == "__main__":
+    main()
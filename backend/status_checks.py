@@ -0,0 +1,133 @@
+"""Bounded storage for the legacy ``status_checks`` collection.
+
+Two retention modes (``STATUS_CHECK_STORAGE``):
+
+* ``ttl`` (default): a TTL index on ``timestamp`` drops checks older than
+  ``retention_days``; the same index serves newest-first reads.
+* ``capped``: the collection is created as (or converted to) a capped
+  collection of ``capped_bytes`` (and optionally ``capped_max`` documents).
+  Mongo keeps insertion order, so newest-first is a reverse natural-order
+  scan.
+
+Either way storage and the cost of ``latest`` stay flat however long the
+endpoint has been in use. With ``rollup`` enabled every write also bumps an
+hourly per-client count in ``status_check_rollups_hourly`` (kept for
+``rollup_days``), so history survives after the raw checks are gone.
+"""
+import logging
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from pymongo import ASCENDING, DESCENDING
+from pymongo.errors import CollectionInvalid, OperationFailure
+
+logger = logging.getLogger(__name__)
+
+COLLECTION = "status_checks"
+ROLLUPS = "status_check_rollups_hourly"
+INDEX_OPTIONS_CONFLICT = (85, 86)
+NAMESPACE_EXISTS = 48
+
+
+def _hour(value: datetime) -> datetime:
+    return value.replace(minute=0, second=0, microsecond=0)
+
+
+async def _ttl_index(collection, keys, expire_after: int) -> None:
+    try:
+        await collection.create_index(keys, expireAfterSeconds=expire_after)
+    except OperationFailure as e:
+        if e.code not in INDEX_OPTIONS_CONFLICT:
+            raise
+        # Same keys with a different (or no) TTL: change it in place
+        await collection.database.command(
+            "collMod", collection.name, index={"keyPattern": dict(keys), "expireAfterSeconds": expire_after}
+        )
+
+
+class StatusCheckRetention:
+    def __init__(
+        self,
+        storage: str = "ttl",
+        retention_days: float = 30,
+        capped_bytes: int = 16 * 2**20,
+        capped_max: Optional[int] = None,
+        rollup: bool = True,
+        rollup_days: float = 365,
+    ):
+        if storage not in ("ttl", "capped"):
+            raise ValueError(f"Unknown status check storage: {storage}")
+        self.storage = storage
+        self.retention_days = retention_days
+        self.capped_bytes = capped_bytes
+        self.capped_max = capped_max
+        self.rollup = rollup
+        self.rollup_days = rollup_days
+
+    async def ensure_storage(self, database) -> None:
+        collection = database[COLLECTION]
+        if self.storage == "capped":
+            await self._ensure_capped(database)
+        else:
+            await _ttl_index(collection, [("timestamp", DESCENDING)], int(self.retention_days * 86400))
+        if self.rollup:
+            await database[ROLLUPS].create_index([("hour", ASCENDING), ("client_name", ASCENDING)])
+            await _ttl_index(database[ROLLUPS], [("expires_at", ASCENDING)], 0)
+
+    async def _ensure_capped(self, database) -> None:
+        limits = {"size": self.capped_bytes}
+        if self.capped_max:
+            limits["max"] = self.capped_max
+        if COLLECTION not in await database.list_collection_names(filter={"name": COLLECTION}):
+            logger.info("Creating capped collection %s (%d bytes)", COLLECTION, self.capped_bytes)
+            try:
+                await database.create_collection(COLLECTION, capped=True, **limits)
+                return
+            except CollectionInvalid:
+                pass  # another worker created it first; convert below if it is not capped
+            except OperationFailure as e:
+                if e.code != NAMESPACE_EXISTS:
+                    raise
+        if (await database[COLLECTION].options()).get("capped"):
+            return
+        logger.info("Converting %s to a capped collection (%d bytes)", COLLECTION, self.capped_bytes)
+        try:
+            await database.command({"convertToCapped": COLLECTION, **limits})
+        except OperationFailure as e:
+            # Another worker converting at the same moment; fine once it is capped
+            if not (await database[COLLECTION].options()).get("capped"):
+                raise
+            logger.info("%s was capped concurrently: %s", COLLECTION, e)
+
+    async def record(self, database, check: dict) -> None:
+        await database[COLLECTION].insert_one(check)
+        if not self.rollup:
+            return
+        hour = _hour(check["timestamp"])
+        try:
+            await database[ROLLUPS].update_one(
+                {"_id": {"hour": hour, "client_name": check["client_name"]}},
+                {
+                    "$inc": {"count": 1},
+                    "$setOnInsert": {
+                        "hour": hour,
+                        "client_name": check["client_name"],
+                        "expires_at": hour + timedelta(days=self.rollup_days),
+                    },
+                },
+                upsert=True,
+            )
+        except Exception:
+            # The check is already stored; a missed increment must not turn it into a 500
+            logger.exception("Updating status check rollup failed")
+
+    async def latest(self, database, limit: int) -> List[dict]:
+        sort = [("$natural", DESCENDING)] if self.storage == "capped" else [("timestamp", DESCENDING)]
+        return await database[COLLECTION].find({}, {"_id": 0}).sort(sort).limit(limit).to_list(limit)
+
+    async def rollups(self, database, start: datetime, end: datetime, client_name: Optional[str] = None) -> List[dict]:
+        query = {"hour": {"$gte": _hour(start), "$lte": end}}
+        if client_name:
+            query["client_name"] = client_name
+        cursor = database[ROLLUPS].find(query, {"_id": 0, "expires_at": 0}).sort([("hour", ASCENDING), ("client_name", ASCENDING)])
+        return await cursor.to_list(None)
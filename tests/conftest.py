@@ -0,0 +1,41 @@
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+BACKEND = Path(__file__).resolve().parent.parent / "backend"
+sys.path.insert(0, str(BACKEND))
+
+
+@pytest.fixture
+def db():
+    mongomock_motor = pytest.importorskip("mongomock_motor")
+    return mongomock_motor.AsyncMongoMockClient()["netrik_test"]
+
+
+@pytest.fixture
+def client(tmp_path_factory, monkeypatch):
+    """The app against an in-memory Mongo, with uploads and the shared cache under a temp directory."""
+    mongomock_motor = pytest.importorskip("mongomock_motor")
+    from fastapi.testclient import TestClient
+
+    os.environ.setdefault("SHARED_CACHE_DIR", str(tmp_path_factory.getbasetemp() / "response-cache"))
+    # mongomock has no capped collections or tailable cursors
+    os.environ.setdefault("EVENT_STORAGE", "ttl")
+    os.environ.setdefault("EVENT_POLL_SECONDS", "0.02")
+    import ratelimit
+    import server
+
+    monkeypatch.chdir(tmp_path_factory.mktemp("app"))
+    monkeypatch.setattr(server, "AsyncIOMotorClient", lambda *args, **kwargs: mongomock_motor.AsyncMongoMockClient())
+    monkeypatch.setattr(server.admission, "store", ratelimit.MemoryBucketStore())
+    server.public_cache.invalidate()
+    with TestClient(server.app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def auth(client):
+    response = client.post("/api/admin/login", json={"username": "v", "password": "a1b-2c3.d4e-5f6"})
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
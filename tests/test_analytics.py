@@ -0,0 +1,39 @@
+import analytics
+
+LEAD = {"name": "Ann", "email": "ann@example.com", "phone": "1", "service": "Web", "message": "hi"}
+QUOTATION = {
+    "client_name": "Acme",
+    "client_email": "ops@acme.com",
+    "client_phone": "1",
+    "client_address": "KL",
+    "items": [{"description": "Site", "quantity": 2, "unit_price": 50.0, "total": 100.0}],
+}
+
+
+def test_contact_submissions_increment_the_daily_lead_rollup(client, auth):
+    for service in ("Web", "Web", "Branding"):
+        assert client.post("/api/contact", json=dict(LEAD, service=service)).status_code == 200
+    rows = client.get("/api/admin/analytics/leads", headers=auth).json()
+    assert {row["service"]: row["count"] for row in rows} == {"Branding": 1, "Web": 2}
+
+
+def test_quotations_increment_and_move_between_status_buckets(client, auth):
+    first = client.post("/api/admin/quotations", headers=auth, json=QUOTATION).json()
+    client.post("/api/admin/quotations", headers=auth, json=QUOTATION)
+    client.patch(f"/api/admin/quotations/{first['id']}/status", headers=auth, json={"status": "sent"})
+    rows = client.get("/api/admin/analytics/quotations", headers=auth).json()
+    assert {row["status"]: (row["count"], row["total_amount"]) for row in rows} == {
+        "draft": (1, 106.0),
+        "sent": (1, 106.0),
+    }
+
+
+def test_a_failed_rollup_update_does_not_fail_the_write(client, auth, monkeypatch):
+    async def unavailable(*args, **kwargs):
+        raise ConnectionError("rollups unavailable")
+
+    monkeypatch.setattr(analytics, "record_lead", unavailable)
+    monkeypatch.setattr(analytics, "record_quotation", unavailable)
+    assert client.post("/api/contact", json=LEAD).status_code == 200
+    assert client.post("/api/admin/quotations", headers=auth, json=QUOTATION).status_code == 200
+    assert client.get("/api/admin/analytics/leads", headers=auth).json() == []
@@ -0,0 +1,145 @@
+import asyncio
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+import analytics
+import archive
+import server
+from benchmarks import fixtures
+
+NOW = fixtures.BASE_DATE + timedelta(days=731)
+EVERYTHING = (datetime(2000, 1, 1), datetime(2100, 1, 1))
+ITEM = {"description": "Site", "quantity": 1, "unit_price": 100, "total": 100}
+QUOTATION = {"client_name": "n", "client_email": "a@example.com", "client_phone": "1", "client_address": "a", "items": [ITEM]}
+
+
+def _seed(db):
+    rng = random.Random(1)
+    leads = [fixtures.make_contact_submission(rng) for _ in range(300)]
+    quotes = [fixtures.make_quotation(rng, number=i) for i in range(200)]
+
+    async def insert():
+        await db.contact_submissions.insert_many([dict(doc) for doc in leads])
+        await db.quotations.insert_many([dict(doc) for doc in quotes])
+
+    asyncio.run(insert())
+    return leads, quotes
+
+
+@pytest.fixture(params=["collection", "ndjson"])
+def cold_storage(request, tmp_path):
+    return archive.create_archive(request.param, str(tmp_path / "archive"))
+
+
+def test_matches():
+    doc = {"status": "sent", "total": 5, "created_at": datetime(2024, 1, 1)}
+    assert archive.matches(doc, {"status": "sent", "total": {"$gte": 5, "$lt": 6}})
+    assert archive.matches(doc, {"status": {"$in": ["sent", "draft"]}})
+    assert not archive.matches(doc, {"created_at": {"$gt": datetime(2024, 1, 1)}})
+    assert not archive.matches(doc, {"missing": {"$gte": 1}})
+    with pytest.raises(ValueError):
+        archive.matches(doc, {"total": {"$regex": "5"}})
+
+
+def test_run_moves_cold_documents_once(db, cold_storage):
+    leads, quotes = _seed(db)
+    dry = asyncio.run(archive.run(db, cold_storage, dry_run=True, now=NOW))
+    moved = asyncio.run(archive.run(db, cold_storage, batch_size=37, now=NOW))
+    assert dry == moved
+    assert moved["contact_submissions"] > 0 and moved["quotations"] > 0
+    assert asyncio.run(archive.run(db, cold_storage, now=NOW)) == {"contact_submissions": 0, "quotations": 0}
+
+    merged = asyncio.run(archive.find_with_archive(db, cold_storage, "contact_submissions", {}, 0, 1000))
+    newest_first = sorted(leads, key=lambda doc: doc["submitted_at"], reverse=True)
+    assert [doc["id"] for doc in merged] == [doc["id"] for doc in newest_first]
+
+    query = {"status": {"$in": ["accepted"]}}
+    page = asyncio.run(archive.find_with_archive(db, cold_storage, "quotations", query, 5, 10))
+    accepted = sorted((q for q in quotes if q["status"] == "accepted"), key=lambda q: q["created_at"], reverse=True)
+    assert [doc["id"] for doc in page] == [doc["id"] for doc in accepted[5:15]]
+
+
+def test_rebuild_keeps_archived_history(db, cold_storage):
+    _seed(db)
+    asyncio.run(analytics.rebuild(db, cold_storage))
+    leads = asyncio.run(analytics.lead_series(db, *EVERYTHING))
+    quotations = asyncio.run(analytics.quotation_series(db, *EVERYTHING))
+
+    asyncio.run(archive.run(db, cold_storage, now=NOW))
+    # An interrupted run leaves a batch both archived and still hot
+    straggler = asyncio.run(db.quotations.find_one({}, {"_id": 0}))
+    asyncio.run(cold_storage.store(db, archive.TIERS["quotations"], [straggler | {"_id": "0" * 24}]))
+    asyncio.run(analytics.rebuild(db, cold_storage, batch_size=16))
+
+    assert asyncio.run(analytics.lead_series(db, *EVERYTHING)) == leads
+    rebuilt = asyncio.run(analytics.quotation_series(db, *EVERYTHING))
+    assert [(r["month"], r["status"], r["count"]) for r in rebuilt] == [(r["month"], r["status"], r["count"]) for r in quotations]
+    assert [r["total_amount"] for r in rebuilt] == pytest.approx([r["total_amount"] for r in quotations])
+
+
+def test_group_counts_archived_documents(db, cold_storage):
+    _seed(db)
+    moved = asyncio.run(archive.run(db, cold_storage, names=["quotations"], now=NOW))["quotations"]
+    groups = asyncio.run(cold_storage.group(db, archive.TIERS["quotations"], "status", "total_amount"))
+    assert sum(group["count"] for group in groups.values()) == moved
+    assert set(groups) <= {"accepted", "rejected"}
+
+
+def test_summary_counts_archived_quotations(client, auth):
+    for _ in range(3):
+        assert client.post("/api/admin/quotations", json=QUOTATION, headers=auth).status_code == 200
+
+    async def archive_one():
+        await server.db.quotations.update_one({}, {"$set": {"status": "rejected", "created_at": datetime(2020, 1, 1)}})
+        return await archive.run(server.db, server.cold_storage, names=["quotations"])
+
+    assert client.portal.call(archive_one) == {"quotations": 1}
+    server.summary_cache.clear()
+    summary = client.get("/api/admin/summary", headers=auth).json()
+    assert summary["total_quotations"] == 3
+    assert summary["quotations_per_status"] == {"draft": 2, "rejected": 1}
+
+
+def test_archived_quotations_open_from_listings(client, auth):
+    quotation = client.post("/api/admin/quotations", json=QUOTATION, headers=auth).json()
+
+    async def archive_it():
+        await server.db.quotations.update_one({}, {"$set": {"status": "rejected", "created_at": datetime(2020, 1, 1)}})
+        return await archive.run(server.db, server.cold_storage, names=["quotations"])
+
+    assert client.portal.call(archive_it) == {"quotations": 1}
+    listed = client.get("/api/admin/quotations?include_archived=true", headers=auth).json()
+    assert [q["id"] for q in listed] == [quotation["id"]]
+    response = client.get(f"/api/admin/quotations/{quotation['id']}", headers=auth)
+    assert response.status_code == 200 and response.json()["status"] == "rejected"
+    pdf = client.get(f"/api/admin/quotations/{quotation['id']}/pdf", headers=auth)
+    assert pdf.status_code == 200 and pdf.content.startswith(b"%PDF")
+    assert client.get("/api/admin/quotations/missing", headers=auth).status_code == 404
+
+
+def test_find_one_with_archive(db, cold_storage):
+    leads, _ = _seed(db)
+    asyncio.run(archive.run(db, cold_storage, names=["contact_submissions"], now=NOW))
+    archived = next(lead for lead in leads if archive.matches(lead, archive.TIERS["contact_submissions"].cold_query(NOW)))
+    found = asyncio.run(archive.find_one_with_archive(db, cold_storage, "contact_submissions", {"id": archived["id"]}))
+    assert found["id"] == archived["id"]
+    assert asyncio.run(archive.find_one_with_archive(db, cold_storage, "contact_submissions", {"id": "missing"})) is None
+
+
+def test_stream_with_archive_merges_tiers_newest_first(db, cold_storage):
+    leads, _ = _seed(db)
+    asyncio.run(archive.run(db, cold_storage, names=["contact_submissions"], now=NOW))
+    straggler = asyncio.run(db.contact_submissions.find_one({}, {"_id": 0}))
+    asyncio.run(cold_storage.store(db, archive.TIERS["contact_submissions"], [straggler | {"_id": "0" * 24}]))
+
+    async def collect(query):
+        return [doc async for doc in archive.stream_with_archive(db, cold_storage, "contact_submissions", query, 7)]
+
+    streamed = asyncio.run(collect({}))
+    assert sorted(doc["id"] for doc in streamed) == sorted(doc["id"] for doc in leads)
+    dates = [doc["submitted_at"] for doc in streamed]
+    assert dates == sorted(dates, reverse=True)
+    read = asyncio.run(collect({"is_read": True}))
+    assert len(read) == sum(doc["is_read"] for doc in leads)
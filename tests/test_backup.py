@@ -0,0 +1,139 @@
+import asyncio
+import json
+import os
+import random
+import time
+from unittest import mock
+
+import pytest
+
+import backup
+from benchmarks import fixtures
+
+
+def _seed(database):
+    rng = random.Random(3)
+
+    async def insert():
+        await database.quotations.insert_many([fixtures.make_quotation(rng, number=i) for i in range(250)])
+        await database.contact_submissions.insert_many([fixtures.make_contact_submission(rng) for _ in range(90)])
+        await database.quotations.create_index("id", unique=True)
+
+    asyncio.run(insert())
+
+
+@pytest.fixture
+def source(db):
+    _seed(db)
+    return db
+
+
+@pytest.fixture
+def uploads(tmp_path):
+    directory = tmp_path / "uploads"
+    (directory / "projects").mkdir(parents=True)
+    (directory / "projects" / "a.jpg").write_bytes(b"x" * 1000)
+    (directory / "projects" / "b.jpg").write_bytes(b"y" * 10)
+    return directory
+
+
+def test_backup_and_resumed_restore_round_trip(source, uploads, tmp_path):
+    destination = tmp_path / "backup"
+    manifest = asyncio.run(backup.backup(source, destination, uploads, chunk_documents=100, batch_size=30))
+    assert manifest["collections"]["quotations"]["documents"] == 250
+    assert len(manifest["collections"]["quotations"]["chunks"]) == 3
+    assert manifest["uploads_stats"]["copied"] == 2
+    assert backup.verify(destination) == []
+
+    target = source.client["restored"]
+    # Interrupted restore: part of the first chunk was already loaded
+    first = manifest["collections"]["quotations"]["chunks"][0]
+    docs = backup._read_chunk(destination / "collections" / "quotations" / first["file"], first["sha256"])
+    asyncio.run(target.quotations.insert_many(docs[:50]))
+    (destination / f".restore-{target.name}.json").write_text(json.dumps({"done": []}))
+
+    restored_uploads = tmp_path / "restored-uploads"
+    asyncio.run(backup.restore(target, destination, restored_uploads, workers=3, batch_size=40))
+    assert asyncio.run(target.quotations.count_documents({})) == 250
+    assert asyncio.run(target.contact_submissions.count_documents({})) == 90
+    original = asyncio.run(source.quotations.find_one(sort=[("_id", 1)]))
+    assert asyncio.run(target.quotations.find_one({"_id": original["_id"]})) == original
+    assert "id_1" in asyncio.run(target.quotations.index_information())
+    assert (restored_uploads / "projects" / "a.jpg").read_bytes() == b"x" * 1000
+
+
+def test_uploads_are_mirrored_incrementally(source, uploads, tmp_path):
+    destination = tmp_path / "backup"
+    first = asyncio.run(backup.backup(source, destination, uploads, collections=["quotations"]))
+    manifest = asyncio.run(backup.backup(source, destination, uploads, collections=["quotations"]))
+    assert manifest["uploads_stats"] == {"copied": 0, "unchanged": 2, "removed": 0, "bytes_copied": 0}
+
+    later = time.time() + 5
+    os.utime(uploads / "projects" / "a.jpg", (later, later))
+    (uploads / "projects" / "b.jpg").unlink()
+    manifest = asyncio.run(backup.backup(source, destination, uploads, collections=["quotations"]))
+    assert manifest["uploads_stats"] == {"copied": 0, "unchanged": 1, "removed": 1, "bytes_copied": 0}
+    assert not (destination / "uploads" / first["uploads"]["projects/b.jpg"]["file"]).exists()
+    assert backup.verify(destination) == []
+
+
+def test_interrupted_backup_keeps_the_previous_uploads(source, uploads, tmp_path):
+    destination = tmp_path / "backup"
+    asyncio.run(backup.backup(source, destination, uploads, collections=["quotations"]))
+    previous = (destination / backup.MANIFEST).read_text()
+
+    (uploads / "projects" / "a.jpg").write_bytes(b"z" * 2000)
+    with mock.patch.object(backup, "_write_json", side_effect=OSError("disk full")), pytest.raises(OSError):
+        asyncio.run(backup.backup(source, destination, uploads, collections=["quotations"]))
+    # The old manifest still describes what is on disk
+    assert (destination / backup.MANIFEST).read_text() == previous
+    assert backup.verify(destination) == []
+
+    manifest = asyncio.run(backup.backup(source, destination, uploads, collections=["quotations"]))
+    assert manifest["uploads_stats"]["copied"] == 1
+    mirrored = sorted(p.relative_to(destination / "uploads").as_posix() for p in (destination / "uploads").rglob("*.jpg"))
+    assert mirrored == sorted(entry["file"] for entry in manifest["uploads"].values())
+    restored = tmp_path / "restored-uploads"
+    asyncio.run(backup.restore(source.client["restored"], destination, restored, collections=["quotations"]))
+    assert (restored / "projects" / "a.jpg").read_bytes() == b"z" * 2000
+
+
+def test_interrupted_backup_keeps_the_previous_one(source, tmp_path):
+    destination = tmp_path / "backup"
+    asyncio.run(backup.backup(source, destination, chunk_documents=100))
+    previous = (destination / backup.MANIFEST).read_text()
+
+    write_chunk, calls = backup._write_chunk, []
+
+    def failing(path, lines):
+        calls.append(path)
+        if len(calls) == 3:
+            raise OSError("disk full")
+        return write_chunk(path, lines)
+
+    with mock.patch.object(backup, "_write_chunk", failing), pytest.raises(OSError):
+        asyncio.run(backup.backup(source, destination, chunk_documents=100))
+    assert (destination / backup.MANIFEST).read_text() == previous
+    assert backup.verify(destination) == []
+
+    manifest = asyncio.run(backup.backup(source, destination, chunk_documents=100))
+    listed = sum(len(entry["chunks"]) for entry in manifest["collections"].values())
+    # Chunks of earlier runs are pruned once the new manifest is in place
+    assert len(list(destination.rglob("*.ndjson.gz"))) == listed
+    assert backup.verify(destination) == []
+
+
+def test_verify_reports_damage(source, tmp_path):
+    destination = tmp_path / "backup"
+    manifest = asyncio.run(backup.backup(source, destination, collections=["quotations"]))
+    chunk = manifest["collections"]["quotations"]["chunks"][0]["file"]
+    (destination / "collections" / "quotations" / chunk).write_bytes(b"junk")
+    assert backup.verify(destination) == [f"quotations/{chunk}: checksum mismatch"]
+    assert backup.verify(tmp_path / "nowhere") == [f"{tmp_path / 'nowhere' / backup.MANIFEST} is missing"]
+
+
+def test_verify_checks_upload_contents(source, uploads, tmp_path):
+    destination = tmp_path / "backup"
+    manifest = asyncio.run(backup.backup(source, destination, uploads, collections=["quotations"]))
+    (destination / "uploads" / manifest["uploads"]["projects/a.jpg"]["file"]).write_bytes(b"q" * 1000)
+    assert backup.verify(destination) == ["uploads/projects/a.jpg: checksum mismatch"]
@@ -0,0 +1,49 @@
+PROJECT = {"description": "d", "client": "c", "category": "Web", "completion_date": "2024-01-01T00:00:00"}
+LEAD = {"name": "Ann", "email": "ann@example.com", "phone": "1", "service": "Web", "message": "hi"}
+
+
+def _project(client, auth, title, **fields):
+    return client.post("/api/admin/projects", headers=auth, json={**PROJECT, "title": title, **fields}).json()["id"]
+
+
+def test_bulk_feature_reports_each_id(client, auth):
+    plain = _project(client, auth, "plain")
+    featured = _project(client, auth, "featured", is_featured=True)
+    response = client.post(
+        "/api/admin/projects/bulk/feature", headers=auth, json={"ids": [plain, featured, "missing"], "is_featured": True}
+    )
+    assert response.json() == {
+        "matched": 2,
+        "modified": 1,
+        "results": {plain: "updated", featured: "unchanged", "missing": "not_found"},
+    }
+    assert all(p["is_featured"] for p in client.get("/api/projects").json())
+
+
+def test_bulk_delete_by_filter_and_ids(client, auth):
+    web = _project(client, auth, "web")
+    other = _project(client, auth, "other", category="Branding")
+    response = client.post(
+        "/api/admin/projects/bulk/delete", headers=auth, json={"ids": [web, other, "missing"], "filter": {"category": "Web"}}
+    )
+    # The filter narrows the ids: "other" is not selected, and so not reported as found either
+    assert response.json()["results"] == {web: "deleted", other: "not_found", "missing": "not_found"}
+    assert [p["id"] for p in client.get("/api/projects").json()] == [other]
+
+
+def test_bulk_read_by_filter(client, auth):
+    for service in ("Web", "Web", "Branding"):
+        client.post("/api/contact", json=dict(LEAD, service=service))
+    response = client.post("/api/admin/contact-submissions/bulk/read", headers=auth, json={"filter": {"service": "Web"}})
+    body = response.json()
+    assert (body["matched"], body["modified"], set(body["results"].values())) == (2, 2, {"updated"})
+    unread = client.get("/api/admin/contact-submissions?is_read=false", headers=auth).json()
+    assert [lead["service"] for lead in unread] == ["Branding"]
+
+
+def test_an_empty_selection_is_rejected(client, auth):
+    for body in ({}, {"filter": {}}, {"filter": {"category": None}}):
+        response = client.post("/api/admin/projects/bulk/delete", headers=auth, json=body)
+        assert response.status_code == 400
+    response = client.post("/api/admin/projects/bulk/delete", headers=auth, json={"ids": []})
+    assert response.json() == {"matched": 0, "modified": 0, "results": {}}
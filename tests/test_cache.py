@@ -0,0 +1,74 @@
+import multiprocessing
+
+from cache import SharedResponseCache, TTLCache
+
+
+def test_entries_are_hidden_once_the_generation_moves(tmp_path):
+    writer, reader = SharedResponseCache(tmp_path), SharedResponseCache(tmp_path)
+    generation = writer.generation()
+    writer.set("projects", b"[1]", generation)
+    assert reader.get("projects") == b"[1]"
+    assert writer.invalidate() == generation + 1
+    assert reader.get("projects") is None
+    # A body loaded before the bump is stored under the old generation and never served
+    writer.set("projects", b"[stale]", generation)
+    assert reader.get("projects") is None
+
+
+def test_hits_are_views_of_the_mapping(tmp_path):
+    cache = SharedResponseCache(tmp_path)
+    generation = cache.generation()
+    cache.set("projects", b"[1]", generation)
+    body = cache.get("projects")
+    assert isinstance(body, memoryview) and body.readonly and body == b"[1]"
+    # A response still sending from the view outlives the entry it came from
+    cache.invalidate()
+    assert cache.get("projects") is None
+    assert body.tobytes() == b"[1]"
+
+
+def _invalidate(directory, times):
+    cache = SharedResponseCache(directory)
+    for _ in range(times):
+        cache.invalidate()
+
+
+def test_concurrent_invalidations_are_never_lost(tmp_path):
+    processes = [multiprocessing.Process(target=_invalidate, args=(tmp_path, 500)) for _ in range(4)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    assert SharedResponseCache(tmp_path).generation() == 2000
+
+
+PROJECT = {"title": "A", "description": "d", "client": "c", "category": "Web", "completion_date": "2024-01-01T00:00:00"}
+
+
+def test_public_listing_is_cached_until_an_admin_write(client, auth, monkeypatch):
+    import server
+
+    client.post("/api/admin/projects", headers=auth, json=PROJECT)
+    assert len(client.get("/api/projects").json()) == 1
+    load = server.load_public_projects
+
+    async def unreachable(*args, **kwargs):
+        raise AssertionError("served from Mongo instead of the cache")
+
+    monkeypatch.setattr(server, "load_public_projects", unreachable)
+    assert len(client.get("/api/projects").json()) == 1
+    monkeypatch.setattr(server, "load_public_projects", load)
+    client.post("/api/admin/projects", headers=auth, json=dict(PROJECT, title="B"))
+    assert len(client.get("/api/projects").json()) == 2
+
+
+def test_ttl_cache_expires_and_bounds_entries(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr("cache.time.monotonic", lambda: now[0])
+    cache = TTLCache(ttl=10, maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.set("c", 3)
+    assert cache.get("a") is None and cache.get("c") == 3
+    now[0] += 11
+    assert cache.get("b") is None
@@ -0,0 +1,120 @@
+import gzip
+import threading
+
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse, Response, StreamingResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+import compression
+from compression import DEFAULT_LEVELS, CompressionMiddleware, levels_for_path, negotiate_encoding
+
+BODY = "netrik " * 1000
+
+
+@pytest.mark.parametrize(
+    "header, expected",
+    [
+        (None, None),
+        ("identity", None),
+        ("gzip", "gzip"),
+        ("gzip, br", "br"),
+        ("br;q=0.5, gzip;q=0.8", "gzip"),
+        ("br;q=0, gzip", "gzip"),
+        ("*;q=0.1", "br"),
+        ("gzip;q=0, *", "br"),
+        ("gzip;q=bogus", None),
+    ],
+)
+def test_negotiation_honours_q_values(header, expected, monkeypatch):
+    monkeypatch.setattr(compression, "supported_encodings", lambda: ["br", "gzip"])
+    assert negotiate_encoding(header) == expected
+
+
+def test_negotiation_without_brotli_falls_back_to_gzip(monkeypatch):
+    monkeypatch.setattr(compression, "brotli", None)
+    assert negotiate_encoding("br, gzip;q=0.5") == "gzip"
+    assert negotiate_encoding("br") is None
+
+
+def test_admin_routes_use_cheaper_levels():
+    admin = levels_for_path("/api/admin/contact-submissions")
+    assert all(admin[encoding] < DEFAULT_LEVELS[encoding] for encoding in DEFAULT_LEVELS)
+    assert levels_for_path("/api/projects") == DEFAULT_LEVELS
+
+
+async def text(request):
+    return PlainTextResponse(BODY)
+
+
+async def tiny(request):
+    return PlainTextResponse("ok")
+
+
+async def stream(request):
+    async def chunks():
+        for _ in range(3):
+            yield BODY.encode()
+
+    return StreamingResponse(chunks(), media_type="text/plain")
+
+
+async def encoded(request):
+    return Response(gzip.compress(BODY.encode()), media_type="text/plain", headers={"Content-Encoding": "gzip"})
+
+
+def _app(**options):
+    app = Starlette(
+        routes=[Route("/text", text), Route("/tiny", tiny), Route("/stream", stream), Route("/encoded", encoded)]
+    )
+    app.add_middleware(CompressionMiddleware, minimum_size=100, **options)
+    return TestClient(app)
+
+
+@pytest.fixture
+def app_client(monkeypatch):
+    monkeypatch.setattr(compression, "supported_encodings", lambda: ["gzip"])
+    return _app()
+
+
+def test_compresses_large_complete_responses(app_client):
+    response = app_client.get("/text", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert int(response.headers["content-length"]) < len(BODY)
+    assert response.text == BODY
+
+
+def test_identity_when_not_accepted_or_too_small(app_client):
+    assert "content-encoding" not in app_client.get("/text", headers={"Accept-Encoding": "identity"}).headers
+    assert "content-encoding" not in app_client.get("/tiny", headers={"Accept-Encoding": "gzip"}).headers
+
+
+def test_streaming_responses_pass_through(app_client):
+    response = app_client.get("/stream", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in response.headers
+    assert response.text == BODY * 3
+
+
+def test_already_encoded_bodies_are_not_compressed_twice(app_client):
+    response = app_client.get("/encoded", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.text == BODY
+
+
+@pytest.mark.parametrize("thread_min_size, threaded", [(10**6, False), (1000, True)])
+def test_large_bodies_are_compressed_off_the_event_loop(thread_min_size, threaded, monkeypatch):
+    monkeypatch.setattr(compression, "supported_encodings", lambda: ["gzip"])
+    compress, threads = compression.compress, []
+
+    def recording(*args):
+        threads.append(threading.current_thread())
+        return compress(*args)
+
+    monkeypatch.setattr(compression, "compress", recording)
+    with _app(thread_min_size=thread_min_size) as client:
+        loop_thread = client.portal.call(threading.current_thread)
+        response = client.get("/text", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip" and response.text == BODY
+    assert (threads[0] is not loop_thread) == threaded
@@ -0,0 +1,100 @@
+import asyncio
+
+from events import EventBroker
+
+
+async def _next_frame(broker, subscriber):
+    stream = broker.stream(subscriber, heartbeat=1)
+    await stream.__anext__()  # retry hint
+    return (await asyncio.wait_for(stream.__anext__(), 2)).decode()
+
+
+async def _settle(*brokers):
+    # Let every tail loop load the sequence and pick up what was published
+    for _ in range(100):
+        await asyncio.sleep(0.01)
+        if all(broker.epoch is not None and not broker._pending for broker in brokers):
+            await asyncio.sleep(0.05)
+            return
+
+
+def _workers(count=2, **kwargs):
+    return [EventBroker(storage="ttl", poll_interval=0.01, **kwargs) for _ in range(count)]
+
+
+def test_events_reach_subscribers_of_every_worker(db):
+    async def scenario():
+        first, second = _workers()
+        await first.ensure_storage(db)
+        for broker in (first, second):
+            await broker.start(db)
+        await _settle(first, second)
+        subscriber = second.subscribe()
+        published = await first.publish("contact_submission.created", {"id": "a"})
+        frame = await _next_frame(second, subscriber)
+        for broker in (first, second):
+            await broker.stop()
+        return published, frame
+
+    published, frame = asyncio.run(scenario())
+    assert frame == f'id: {published.id}\nevent: contact_submission.created\ndata: {{"id":"a"}}\n\n'
+
+
+def test_resume_on_another_worker_from_last_event_id(db):
+    async def scenario():
+        first, second = _workers()
+        for broker in (first, second):
+            await broker.start(db)
+        await _settle(first, second)
+        published = [await first.publish("contact_submission.read", {"n": n}) for n in range(5)]
+        await _settle(first, second)
+        # The client saw the first two events on worker one and reconnects to worker two
+        subscriber = second.subscribe(published[1].id)
+        replayed = [subscriber.queue.get_nowait().seq for _ in range(subscriber.queue.qsize())]
+        for broker in (first, second):
+            await broker.stop()
+        return [event.seq for event in published], replayed
+
+    published, replayed = asyncio.run(scenario())
+    assert replayed == published[2:]
+
+
+def test_unknown_or_evicted_ids_get_a_resync(db):
+    async def scenario():
+        (broker,) = _workers(count=1, replay_size=2)
+        await broker.start(db)
+        await _settle(broker)
+        published = [await broker.publish("quotation.status_changed", {"n": n}) for n in range(5)]
+        await _settle(broker)
+        frames = []
+        for last_event_id in (published[0].id, "1700000000000000", f"other-epoch:{published[-1].seq}"):
+            subscriber = broker.subscribe(last_event_id)
+            frames.append(await _next_frame(broker, subscriber))
+        await broker.stop()
+        return published, frames
+
+    published, frames = asyncio.run(scenario())
+    for frame in frames:
+        assert frame == f"id: {published[-1].id}\nevent: resync\ndata: {{}}\n\n"
+
+
+def test_out_of_order_inserts_are_delivered_in_sequence(db):
+    async def scenario():
+        (broker,) = _workers(count=1, gap_timeout=0.2)
+        await broker.start(db)
+        await _settle(broker)
+        subscriber = broker.subscribe()
+        epoch = broker.epoch
+        await db.counters.update_one({"_id": "admin_events"}, {"$inc": {"seq": 3}})
+        # Seq 2 lands before 1, and seq 3's publisher died before inserting
+        for seq in (2, 1, 4):
+            await db.admin_events.insert_one({"epoch": epoch, "seq": seq, "type": "t", "data": "{}"})
+        await asyncio.sleep(0.1)
+        early = [subscriber.queue.get_nowait().seq for _ in range(subscriber.queue.qsize())]
+        await asyncio.sleep(0.3)
+        late = [subscriber.queue.get_nowait().seq for _ in range(subscriber.queue.qsize())]
+        await broker.stop()
+        return early, late
+
+    early, late = asyncio.run(scenario())
+    assert (early, late) == ([1, 2], [4])
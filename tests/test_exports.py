@@ -0,0 +1,97 @@
+import asyncio
+import csv
+import io
+import json
+from datetime import datetime
+
+import exports
+
+LEAD = {"name": "Ann", "email": "ann@example.com", "phone": "1", "service": "Web", "message": "hi, \"there\"\nbye"}
+QUOTATION = {
+    "client_name": "Acme",
+    "client_email": "ops@acme.com",
+    "client_phone": "1",
+    "client_address": "KL",
+    "items": [
+        {"description": "Site", "quantity": 2, "unit_price": 50.0, "total": 100.0},
+        {"description": "Logo", "quantity": 1, "unit_price": 20.0, "total": 20.0},
+    ],
+}
+
+
+async def _docs(docs):
+    for doc in docs:
+        yield dict(doc)
+
+
+async def _collect(stream):
+    return [chunk async for chunk in stream]
+
+
+def test_contact_submission_export_rows(client, auth):
+    client.post("/api/contact", json=LEAD)
+    (created,) = client.get("/api/admin/contact-submissions", headers=auth).json()  # as stored (ms precision)
+    response = client.get("/api/admin/contact-submissions/export?format=csv", headers=auth)
+    assert response.headers["content-type"] == "text/csv; charset=utf-8"
+    assert "attachment" in response.headers["content-disposition"]
+    header, row = csv.reader(io.StringIO(response.text))
+    assert header == exports.CONTACT_SUBMISSION_COLUMNS
+    assert dict(zip(header, row)) == {**{k: str(v) for k, v in created.items()}, "is_read": "False"}
+
+    response = client.get("/api/admin/contact-submissions/export", headers=auth)
+    (line,) = response.text.splitlines()
+    assert json.loads(line) == created
+
+
+def test_quotation_csv_has_one_row_per_item(client, auth):
+    quotation = client.post("/api/admin/quotations", headers=auth, json=QUOTATION).json()
+    response = client.get("/api/admin/quotations/export?format=csv", headers=auth)
+    header, *rows = csv.reader(io.StringIO(response.text))
+    assert header == exports.QUOTATION_COLUMNS + exports.QUOTATION_ITEM_COLUMNS
+    assert [row[header.index("quote_number")] for row in rows] == [quotation["quote_number"]] * 2
+    assert [row[-5:] for row in rows] == [["1", "Site", "2", "50.0", "100.0"], ["2", "Logo", "1", "20.0", "20.0"]]
+
+
+def test_quotation_without_items_still_gets_a_row():
+    doc = {"id": "q", "items": []}
+    (row,) = exports.quotation_rows(doc)
+    assert row[0] == "q" and row[-5:] == [None] * 5
+
+
+def test_streams_flush_in_chunks(monkeypatch):
+    monkeypatch.setattr(exports, "CHUNK_SIZE", 1000)
+    docs = [{"_id": i, "id": str(i), "name": "x" * 50, "submitted_at": datetime(2024, 1, 1)} for i in range(100)]
+    for stream in (
+        exports.encode("contact_submissions", "ndjson", _docs(docs)),
+        exports.encode("contact_submissions", "csv", _docs(docs)),
+    ):
+        chunks = asyncio.run(_collect(stream))
+        assert len(chunks) > 1
+        assert all(len(chunk) >= 1000 for chunk in chunks[:-1])
+        assert all(len(chunk) < 1100 for chunk in chunks)
+
+    (chunk,) = asyncio.run(_collect(exports.ndjson_stream(_docs(docs[:1]))))
+    assert json.loads(chunk) == {"id": "0", "name": "x" * 50, "submitted_at": "2024-01-01T00:00:00"}
+
+
+def test_exports_include_archived_documents_on_request(client, auth):
+    import server
+
+    client.post("/api/contact", json=LEAD)
+    archived = {**LEAD, "id": "old", "is_read": True, "submitted_at": datetime(2020, 1, 1)}
+    client.portal.call(server.db.contact_submissions_archive.insert_one, archived)
+
+    hot_only = client.get("/api/admin/contact-submissions/export", headers=auth).text.splitlines()
+    everything = client.get("/api/admin/contact-submissions/export?include_archived=true", headers=auth).text.splitlines()
+    assert len(hot_only) == 1
+    assert [json.loads(line)["id"] for line in everything][1:] == ["old"]
+
+
+def test_export_sorts_are_backed_by_indexes(client):
+    import server
+
+    client.portal.call(server.ensure_indexes)
+    leads = client.portal.call(server.db.contact_submissions.index_information)
+    quotes = client.portal.call(server.db.quotations.index_information)
+    assert [("submitted_at", -1)] in [spec["key"] for spec in leads.values()]
+    assert [("created_at", -1)] in [spec["key"] for spec in quotes.values()]
@@ -0,0 +1,100 @@
+from datetime import datetime, timedelta, timezone
+
+from facets import FacetIndex
+
+
+def _project(project_id, category, tags, completion_date=None):
+    return {"id": project_id, "category": category, "tags": tags, "completion_date": completion_date}
+
+
+def _index(*projects):
+    index = FacetIndex()
+    for project in projects:
+        index.apply(project)
+    return index
+
+
+def _create(client, auth, title, tags, completion_date, category="Web"):
+    response = client.post("/api/admin/projects", headers=auth, json={
+        "title": title, "description": "d", "client": "c", "category": category, "tags": tags,
+        "completion_date": completion_date,
+    })
+    assert response.status_code == 200, response.text
+    return response.json()["id"]
+
+
+def test_counts_and_patches():
+    index = _index(
+        _project("a", "Web", ["react", "aws"]),
+        _project("b", "Web", ["react", "react", "seo"]),
+        _project("c", "IT", ["react"]),
+    )
+    counts = index.counts()
+    assert counts["total"] == 3
+    assert counts["categories"] == [{"value": "Web", "count": 2}, {"value": "IT", "count": 1}]
+    assert counts["tags"][0] == {"value": "react", "count": 3}
+
+    index.apply(_project("b", "IT", ["seo"]))
+    index.remove("c")
+    counts = index.counts()
+    assert counts["categories"] == [{"value": "IT", "count": 1}, {"value": "Web", "count": 1}]
+    assert {tag["value"] for tag in counts["tags"]} == {"react", "aws", "seo"}
+    assert "c" not in index
+
+
+def test_related_ranks_by_overlap_then_recency():
+    index = _index(
+        _project("a", "Web", ["react", "aws", "seo"]),
+        _project("b", "Web", ["react", "aws"], datetime(2023, 1, 1)),
+        _project("c", "Web", ["react"], datetime(2025, 1, 1)),
+        _project("d", "Web", ["react"], datetime(2024, 1, 1)),
+        _project("e", "Web", ["go"]),
+    )
+    assert index.related("a", 10) == ["b", "c", "d"]
+    assert index.related("a", 2) == ["b", "c"]
+
+
+def test_related_mixes_offset_and_naive_dates():
+    # A date straight from a request carries an offset; dates loaded from Mongo are naive UTC
+    index = _index(
+        _project("a", "Web", ["react"]),
+        _project("b", "Web", ["react"], datetime(2025, 6, 1, 2, tzinfo=timezone(timedelta(hours=5)))),
+        _project("c", "Web", ["react"], datetime(2025, 5, 31, 22)),
+        _project("d", "Web", ["react"]),
+    )
+    assert index.related("a", 10) == ["c", "b", "d"]
+
+
+def test_related_projects_with_utc_suffixed_dates(client, auth):
+    # toISOString() sends "...Z"
+    first = _create(client, auth, "A", ["react"], "2024-05-01T00:00:00.000Z")
+    _create(client, auth, "B", ["react"], "2024-06-01T00:00:00")
+    _create(client, auth, "C", ["react"], "2024-07-01T00:00:00.000Z")
+    response = client.get(f"/api/projects/{first}/related")
+    assert response.status_code == 200
+    assert [project["title"] for project in response.json()] == ["C", "B"]
+
+
+def test_advance_only_skips_our_own_bump():
+    index = FacetIndex()
+    index.generation = 4
+    index.advance(4, 5)
+    assert index.generation == 5
+    index.advance(4, 6)
+    assert index.generation == 5
+
+
+def test_tag_filters_and_facet_counts(client, auth):
+    _create(client, auth, "A", ["react", "aws"], "2024-01-01T00:00:00")
+    _create(client, auth, "B", ["react"], "2024-02-01T00:00:00", category="IT")
+    _create(client, auth, "C", ["seo"], "2024-03-01T00:00:00")
+
+    def titles(query):
+        return [project["title"] for project in client.get(f"/api/projects?{query}").json()]
+
+    assert titles("tags=react&tags=aws") == ["A"]
+    assert titles("tags=aws&tags=seo&tag_match=any") == ["C", "A"]
+    facets = client.get("/api/projects/facets").json()
+    assert facets["total"] == 3
+    assert facets["categories"] == [{"value": "Web", "count": 2}, {"value": "IT", "count": 1}]
+    assert facets["tags"][0] == {"value": "react", "count": 2}
@@ -0,0 +1,27 @@
+import time
+
+import server
+
+
+def _wait_until_ready(client, timeout=5.0):
+    # Warm-up runs in the background after startup
+    deadline = time.monotonic() + timeout
+    while (response := client.get("/api/health/ready")).status_code != 200 and time.monotonic() < deadline:
+        assert response.json()["status"] == "warming"
+        time.sleep(0.01)
+    return response
+
+
+def test_liveness_and_readiness_after_warm_up(client):
+    assert client.get("/api/health/live").json()["status"] == "alive"
+    assert _wait_until_ready(client).json()["status"] == "ready"
+
+
+def test_not_ready_while_warming(client, monkeypatch):
+    _wait_until_ready(client)
+    monkeypatch.setitem(server.worker_state, "ready_at", None)
+    monkeypatch.setitem(server.worker_state, "warmup_error", "mongo unreachable")
+    response = client.get("/api/health/ready")
+    assert response.status_code == 503
+    assert response.json() == {"status": "warming", "error": "mongo unreachable"}
+    assert client.get("/api/health/live").status_code == 200
@@ -0,0 +1,118 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import HTTPException
+
+import idempotency
+from idempotency import IdempotencyStore
+
+
+def _handler(calls):
+    async def handler():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"id": len(calls)}
+    return handler
+
+
+def test_replays_the_stored_response(db):
+    async def scenario():
+        store, calls = IdempotencyStore(), []
+        first = await store.run(db, "contact", "k", "fp", _handler(calls))
+        second = await store.run(db, "contact", "k", "fp", _handler(calls))
+        store._cache.clear()
+        third = await store.run(db, "contact", "k", "fp", _handler(calls))
+        return first, second, third, calls
+
+    first, second, third, calls = asyncio.run(scenario())
+    assert first[0]["body"] == second[0]["body"] == third[0]["body"] == {"id": 1}
+    assert [first[1], second[1], third[1]] == [False, True, True]
+    assert len(calls) == 1
+
+
+def test_concurrent_requests_execute_once(db):
+    async def scenario():
+        store, calls = IdempotencyStore(), []
+        results = await asyncio.gather(*(store.run(db, "q", "k", "fp", _handler(calls)) for _ in range(10)))
+        return results, calls
+
+    results, calls = asyncio.run(scenario())
+    assert len(calls) == 1
+    assert sum(replayed for _, replayed in results) == 9
+
+
+def test_reused_key_with_a_different_body_is_rejected(db):
+    async def scenario():
+        store = IdempotencyStore()
+        await store.run(db, "q", "k", "fp", _handler([]))
+        await store.run(db, "q", "k", "other", _handler([]))
+
+    with pytest.raises(HTTPException) as raised:
+        asyncio.run(scenario())
+    assert raised.value.status_code == 422
+
+
+def test_failed_request_releases_its_claim(db):
+    async def scenario():
+        store = IdempotencyStore()
+
+        async def boom():
+            raise RuntimeError("boom")
+
+        with pytest.raises(RuntimeError):
+            await store.run(db, "q", "k", "fp", boom)
+        return await store.run(db, "q", "k", "fp", _handler([]))
+
+    record, replayed = asyncio.run(scenario())
+    assert record["body"] == {"id": 1} and not replayed
+
+
+def test_in_progress_record_of_another_request_is_never_replayed(db):
+    async def scenario():
+        store = IdempotencyStore(wait_timeout=0.2)
+        now = datetime.utcnow()
+        # Another worker is still running the key for a different body
+        await db[idempotency.COLLECTION].insert_one({
+            "_id": "q:k", "status": idempotency.IN_PROGRESS, "fingerprint": "theirs",
+            "locked_until": now + timedelta(seconds=60), "expires_at": now + timedelta(days=1),
+        })
+        statuses = []
+        for fingerprint in ("mine", "theirs"):
+            try:
+                await store.run(db, "q", "k", fingerprint, _handler([]))
+            except HTTPException as e:
+                statuses.append(e.status_code)
+        return statuses
+
+    assert asyncio.run(scenario()) == [422, 409]
+
+
+def test_fingerprint_ignores_key_order():
+    assert idempotency.fingerprint({"a": 1, "b": [1, 2]}) == idempotency.fingerprint({"b": [1, 2], "a": 1})
+    assert idempotency.fingerprint({"a": 1}) != idempotency.fingerprint({"a": 2})
+
+
+CONTACT = {"name": "Ann", "email": "ann@example.com", "phone": "1", "service": "Web", "message": "hi"}
+
+
+def test_contact_idempotency_key(client):
+    headers = {"Idempotency-Key": "contact-1"}
+    first = client.post("/api/contact", json=CONTACT, headers=headers)
+    second = client.post("/api/contact", json=CONTACT, headers=headers)
+    assert first.json() == second.json()
+    assert second.headers["idempotent-replayed"] == "true"
+    assert client.post("/api/contact", json=dict(CONTACT, message="other"), headers=headers).status_code == 422
+
+
+def test_quotation_retries_do_not_take_a_new_number(client, auth):
+    quotation = {
+        "client_name": "Acme", "client_email": "ops@acme.com", "client_phone": "1", "client_address": "KL",
+        "items": [{"description": "Site", "quantity": 1, "unit_price": 100.0, "total": 100.0}],
+    }
+    headers = {**auth, "Idempotency-Key": "q-1"}
+    first = client.post("/api/admin/quotations", json=quotation, headers=headers).json()
+    retried = client.post("/api/admin/quotations", json=quotation, headers=headers).json()
+    fresh = client.post("/api/admin/quotations", json=quotation, headers=auth).json()
+    assert retried["quote_number"] == first["quote_number"]
+    assert fresh["quote_number"].endswith("-0002")
@@ -0,0 +1,166 @@
+import asyncio
+from datetime import datetime, timedelta
+
+from jobs import JobQueue
+
+
+class FlakyCollection:
+    """Wraps a collection so that the next ``failures`` update_one calls raise."""
+
+    def __init__(self, collection, failures):
+        self.collection = collection
+        self.failures = failures
+
+    def __getattr__(self, name):
+        return getattr(self.collection, name)
+
+    async def update_one(self, *args, **kwargs):
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("Mongo unavailable")
+        return await self.collection.update_one(*args, **kwargs)
+
+
+async def _settled(queue, job_id):
+    for _ in range(300):
+        stored = await queue.get(job_id)
+        if stored["status"] in ("succeeded", "failed"):
+            return stored
+        await asyncio.sleep(0.01)
+    return stored
+
+
+def test_job_runs_to_completion(db):
+    async def scenario():
+        queue = JobQueue(workers=1, poll_interval=0.01)
+
+        @queue.handler("double")
+        async def double(context):
+            await context.progress(0.5, "halfway")
+            return context.payload["n"] * 2
+
+        await queue.start(db.jobs)
+        await queue.ensure_indexes()
+        job = await queue.enqueue("double", {"n": 21})
+        stored = await _settled(queue, job["id"])
+        await queue.stop()
+        return stored
+
+    stored = asyncio.run(scenario())
+    assert (stored["status"], stored["result"], stored["progress"], stored["attempts"]) == ("succeeded", 42, 1.0, 1)
+
+
+def test_failing_job_is_retried_up_to_max_attempts(db):
+    async def scenario():
+        queue = JobQueue(workers=1, poll_interval=0.01)
+
+        @queue.handler("broken", max_attempts=2, retry_backoff=0)
+        async def broken(context):
+            raise RuntimeError("boom")
+
+        await queue.start(db.jobs)
+        job = await queue.enqueue("broken", {})
+        stored = await _settled(queue, job["id"])
+        await queue.stop()
+        return stored
+
+    stored = asyncio.run(scenario())
+    assert (stored["status"], stored["attempts"]) == ("failed", 2)
+    assert stored["error"] == "RuntimeError: boom"
+
+
+def test_expired_lease_is_claimed_again(db):
+    async def scenario():
+        queue = JobQueue(workers=1, poll_interval=0.01)
+
+        @queue.handler("echo")
+        async def echo(context):
+            return context.payload
+
+        queue.collection = db.jobs
+        job = await queue.enqueue("echo", {"x": 1})
+        # A worker in a dead process claimed it and its lease ran out
+        await db.jobs.update_one(
+            {"id": job["id"]},
+            {"$set": {"status": "running", "attempts": 1, "lease_until": datetime.utcnow() - timedelta(seconds=1)}},
+        )
+        await queue.start(db.jobs)
+        stored = await _settled(queue, job["id"])
+        await queue.stop()
+        return stored
+
+    stored = asyncio.run(scenario())
+    assert (stored["status"], stored["result"], stored["attempts"]) == ("succeeded", {"x": 1}, 2)
+
+
+def test_expired_lease_on_the_last_attempt_fails_the_job(db):
+    async def scenario():
+        queue = JobQueue(workers=1, poll_interval=0.01)
+        runs = []
+
+        @queue.handler("crashy", max_attempts=2)
+        async def crashy(context):
+            runs.append(context.job["id"])
+
+        queue.collection = db.jobs
+        job = await queue.enqueue("crashy", {})
+        # Both attempts killed the worker running it
+        await db.jobs.update_one(
+            {"id": job["id"]},
+            {"$set": {"status": "running", "attempts": 2, "lease_until": datetime.utcnow() - timedelta(seconds=1)}},
+        )
+        await queue.start(db.jobs)
+        stored = await _settled(queue, job["id"])
+        await queue.stop()
+        return stored, runs
+
+    stored, runs = asyncio.run(scenario())
+    assert (stored["status"], stored["attempts"], runs) == ("failed", 2, [])
+    assert "Lease expired" in stored["error"]
+
+
+class UnreachableCollection:
+    def __getattr__(self, name):
+        async def fail(*args, **kwargs):
+            raise ConnectionError("Mongo unavailable")
+        return fail
+
+
+def test_start_does_not_wait_for_the_database():
+    async def scenario():
+        queue = JobQueue(workers=2, poll_interval=0.01)
+        await asyncio.wait_for(queue.start(UnreachableCollection()), 0.5)
+        await asyncio.sleep(0.05)
+        alive = [not task.done() for task in queue._tasks]
+        await queue.stop()
+        return alive
+
+    # Workers keep polling (and logging) until Mongo is back
+    assert asyncio.run(scenario()) == [True, True]
+
+
+def test_workers_survive_failed_outcome_writes(db):
+    async def scenario():
+        queue = JobQueue(workers=2, poll_interval=0.01, lease_seconds=0)
+        runs = []
+
+        @queue.handler("noop", concurrency=2)
+        async def noop(context):
+            runs.append(context.payload["n"])
+
+        await queue.start(FlakyCollection(db.jobs, failures=2))
+        jobs = [await queue.enqueue("noop", {"n": n}) for n in range(2)]
+        for _ in range(300):
+            statuses = [(await queue.get(job["id"]))["status"] for job in jobs]
+            if statuses == ["succeeded", "succeeded"]:
+                break
+            await asyncio.sleep(0.01)
+        alive = [not task.done() for task in queue._tasks]
+        await queue.stop()
+        return statuses, alive, runs
+
+    statuses, alive, runs = asyncio.run(scenario())
+    assert statuses == ["succeeded", "succeeded"]
+    assert alive == [True, True]
+    # Two outcomes were lost, so those runs were repeated once their lease expired
+    assert len(runs) == 4 and set(runs) == {0, 1}
@@ -0,0 +1,57 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+from loopwatch import LoopWatch, LoopWatchMiddleware
+
+SCOPE = {"type": "http", "method": "GET", "path": "/api/things/42", "route": SimpleNamespace(path="/api/things/{id}")}
+
+
+def block(seconds=0.3):
+    time.sleep(seconds)
+
+
+async def handler(scope, receive, send):
+    block()
+    await asyncio.sleep(0.05)  # let the heartbeat close the first stall
+    # Work the request spawns is attributed to it as well
+    await asyncio.create_task(spawned())
+
+
+async def spawned():
+    block()
+
+
+def _watch(scenario):
+    async def run():
+        watch = LoopWatch(interval=0.02, threshold=0.05)
+        watch.start()
+        try:
+            await asyncio.sleep(0.05)
+            await scenario(watch)
+            await asyncio.sleep(0.1)  # let the heartbeat record the last stall
+        finally:
+            await watch.stop()
+        return watch
+
+    return asyncio.run(run())
+
+
+def test_stalls_are_attributed_to_the_route_and_call_site():
+    watch = _watch(lambda watch: LoopWatchMiddleware(handler, watch)(dict(SCOPE), None, None))
+    assert watch.stalls == 2
+    [offender] = watch.top_offenders()
+    assert offender["route"] == "GET /api/things/{id}"
+    assert offender["culprit"].endswith("in block") and "test_loopwatch.py" in offender["culprit"]
+    assert offender["count"] == 2 and offender["max_ms"] >= 200
+    assert "time.sleep" in offender["stack"]
+    assert watch.active == {}  # the request and its task are forgotten once done
+    assert watch.snapshot()["lag_ms"]["max"] >= 200
+
+
+def test_stalls_outside_requests():
+    async def scenario(watch):
+        block()
+
+    watch = _watch(scenario)
+    assert [(o["route"], o["count"]) for o in watch.top_offenders()] == [("(no request)", 1)]
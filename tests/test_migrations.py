@@ -0,0 +1,78 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+
+import migrations
+from migrations import MigrationLocked, MigrationRunner
+
+EXPECTED = {"0001_project_defaults": 10, "0002_testimonial_defaults": 0, "0003_contact_submission_defaults": 7}
+
+
+def _seed(db):
+    async def insert():
+        await db.projects.insert_many([{"title": f"p{i}", "images": ["/a.jpg"] if i % 2 else []} for i in range(10)])
+        await db.projects.insert_one({
+            "id": "x", "title": "ok", "tags": [], "images": [], "featured_image": None, "is_featured": False,
+            "created_at": datetime(2024, 1, 1),
+        })
+        await db.contact_submissions.insert_many([{"id": str(i), "submitted_at": datetime(2024, 1, 1)} for i in range(7)])
+
+    asyncio.run(insert())
+
+
+def test_discover_orders_by_version():
+    assert [migration.version for migration in migrations.discover()] == ["0001", "0002", "0003"]
+
+
+def test_interrupted_migration_resumes_from_its_checkpoint(db):
+    _seed(db)
+    runner = MigrationRunner(db, batch_size=3)
+    assert asyncio.run(runner.dry_run()) == EXPECTED
+
+    transform, calls = runner.migrations[0].transform, []
+
+    def crash_on_fifth(doc):
+        calls.append(doc)
+        if len(calls) == 5:
+            raise RuntimeError("crash")
+        return transform(doc)
+
+    runner.migrations[0].transform = crash_on_fifth
+    with pytest.raises(RuntimeError):
+        asyncio.run(runner.run())
+    state = asyncio.run(db.schema_migrations.find_one({"_id": "0001"}))
+    assert (state["status"], state["touched"]) == ("running", 3)
+
+    runner.migrations[0].transform = transform
+    assert asyncio.run(runner.run()) == EXPECTED
+    assert asyncio.run(db.projects.count_documents(migrations.discover()[0].query)) == 0
+    project = asyncio.run(db.projects.find_one({"title": "p1"}))
+    assert project["featured_image"] == "/a.jpg" and project["is_featured"] is False and project["created_at"]
+    assert asyncio.run(runner.run()) == {}
+    assert all(entry["status"] == "applied" for entry in asyncio.run(runner.status()))
+
+
+def test_runner_refuses_while_another_holds_the_lock(db):
+    asyncio.run(db.schema_migrations.insert_one(
+        {"_id": "__lock__", "owner": "someone-else", "expires_at": datetime(2999, 1, 1)}
+    ))
+    with pytest.raises(MigrationLocked):
+        asyncio.run(MigrationRunner(db).run())
+
+
+def test_max_rate_counts_documents_read_not_written(db, monkeypatch):
+    _seed(db)
+    runner = MigrationRunner(db, batch_size=5, max_rate=10)
+    for migration in runner.migrations:
+        migration.transform = lambda doc: None  # matches, but nothing to change
+    delays = []
+
+    async def sleep(delay):
+        delays.append(delay)
+
+    monkeypatch.setattr(migrations.asyncio, "sleep", sleep)
+    assert asyncio.run(runner.run()) == {"0001_project_defaults": 0, "0002_testimonial_defaults": 0,
+                                         "0003_contact_submission_defaults": 0}
+    # 10 projects in two batches, then 7 submissions in two: about half a second per batch of 5
+    assert len(delays) == 4 and delays[0] > 0.4
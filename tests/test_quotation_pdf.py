@@ -0,0 +1,57 @@
+import re
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("reportlab")
+
+import quotation_pdf  # noqa: E402
+from quotation_pdf import FIRST_PAGE_ROWS, ROWS_PER_PAGE  # noqa: E402
+from quotations import compute_totals  # noqa: E402
+
+
+def _items(count):
+    return [SimpleNamespace(description=f"Item {i}", quantity=1, unit_price=i + 0.5, total=i + 0.5) for i in range(count)]
+
+
+def _quotation(items):
+    return SimpleNamespace(
+        quote_number="NT-2026-0001", created_at=datetime(2026, 1, 1), valid_until=datetime(2026, 1, 31),
+        client_name="Acme", client_address="KL", client_phone="1", client_email="ops@acme.com",
+        items=items, tax_rate=0.06, notes=None, **compute_totals((item.total for item in items), 0.06),
+    )
+
+
+def _pages(pdf: bytes) -> int:
+    return len(re.findall(rb"/Type /Page\b", pdf))
+
+
+def test_compute_totals_rounds_exact_decimals():
+    assert compute_totals([0.1, 0.2], 0.18) == {"subtotal": 0.3, "tax_amount": 0.05, "total_amount": 0.35}
+    # 1.005 is 1.00499... as a float; the decimal path still rounds half up
+    assert compute_totals([1.005], 0)["subtotal"] == 1.01
+    assert compute_totals([], 0.18) == {"subtotal": 0.0, "tax_amount": 0.0, "total_amount": 0.0}
+
+
+def test_items_are_chunked_per_page_with_subtotals():
+    items = _items(FIRST_PAGE_ROWS + ROWS_PER_PAGE + 3)
+    tables = [f for f in quotation_pdf._item_pages(items) if not isinstance(f, quotation_pdf.PageBreak)]
+    rows = [table._cellvalues for table in tables]
+    assert [len(chunk) - 2 for chunk in rows] == [FIRST_PAGE_ROWS, ROWS_PER_PAGE, 3]
+    assert all(chunk[0] == quotation_pdf.ITEMS_HEADER for chunk in rows)
+    chunks = [items[:FIRST_PAGE_ROWS], items[FIRST_PAGE_ROWS:FIRST_PAGE_ROWS + ROWS_PER_PAGE], items[-3:]]
+    for chunk, table_rows in zip(chunks, rows):
+        assert table_rows[-1] == ["", "", "Page subtotal:", f"{sum(item.total for item in chunk):.2f}"]
+
+
+@pytest.mark.parametrize("count, pages", [
+    (3, 1),
+    (FIRST_PAGE_ROWS - 2, 1),  # largest single table
+    (FIRST_PAGE_ROWS, 2),  # one full chunk, then the totals
+    (FIRST_PAGE_ROWS + ROWS_PER_PAGE, 3),
+    (FIRST_PAGE_ROWS + ROWS_PER_PAGE + 1, 3),
+])
+def test_one_page_per_chunk(count, pages):
+    pdf = quotation_pdf.render_quotation_pdf(_quotation(_items(count))).getvalue()
+    assert _pages(pdf) == pages
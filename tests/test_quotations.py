@@ -0,0 +1,112 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+import archive
+import quotations
+
+
+@pytest.mark.parametrize("current, new, allowed", [
+    ("draft", "sent", True),
+    ("draft", "rejected", True),
+    ("draft", "accepted", False),
+    ("sent", "accepted", True),
+    ("accepted", "rejected", False),
+    ("rejected", "draft", False),
+    ("unknown", "sent", False),
+])
+def test_can_transition(current, new, allowed):
+    assert quotations.can_transition(current, new) is allowed
+
+
+def test_quote_numbers_never_repeat_after_archiving(db):
+    async def scenario():
+        now = datetime(2026, 3, 1)
+        numbers = []
+        for status in ("rejected", "sent", "accepted"):
+            number = await quotations.next_quote_number(db, now)
+            numbers.append(number)
+            await db.quotations.insert_one({
+                "id": number, "quote_number": number, "status": status, "created_at": now - timedelta(days=400),
+            })
+        await archive.run(db, archive.CollectionArchive(), names=["quotations"], now=now)
+        assert await db.quotations.count_documents({}) == 1
+        numbers.append(await quotations.next_quote_number(db, now))
+        return numbers
+
+    assert asyncio.run(scenario()) == ["NT-2026-0001", "NT-2026-0002", "NT-2026-0003", "NT-2026-0004"]
+
+
+def test_quote_counter_starts_above_existing_numbers(db):
+    async def scenario():
+        await db.quotations.insert_one({"id": "a", "quote_number": "NT-2025-0041"})
+        await db.quotations_archive.insert_one({"id": "b", "quote_number": "NT-2024-0057"})
+        return await quotations.next_quote_number(db, datetime(2026, 1, 1))
+
+    assert asyncio.run(scenario()) == "NT-2026-0058"
+
+
+def test_expire_moves_open_quotations_past_validity(db):
+    async def scenario():
+        now = datetime(2026, 3, 1)
+        await db.quotations.insert_many([
+            {"id": "old-sent", "status": "sent", "valid_until": now - timedelta(days=1), "created_at": now, "total_amount": 10.0},
+            {"id": "old-draft", "status": "draft", "valid_until": now - timedelta(days=1), "created_at": now, "total_amount": 5.0},
+            {"id": "current", "status": "sent", "valid_until": now + timedelta(days=1), "created_at": now, "total_amount": 1.0},
+            {"id": "done", "status": "accepted", "valid_until": now - timedelta(days=1), "created_at": now, "total_amount": 1.0},
+        ])
+        moved = await quotations.expire(db, now, batch_size=1, pause=0)
+        statuses = {q["id"]: q["status"] async for q in db.quotations.find()}
+        return moved, statuses
+
+    moved, statuses = asyncio.run(scenario())
+    assert moved == 2
+    assert statuses == {"old-sent": "rejected", "old-draft": "rejected", "current": "sent", "done": "accepted"}
+
+
+ITEM = {"description": "Site", "quantity": 1, "unit_price": 100.0, "total": 100.0}
+QUOTATION = {"client_name": "Acme", "client_email": "ops@acme.com", "client_phone": "1", "client_address": "KL", "items": [ITEM]}
+
+
+def _quotation(client, auth, **fields):
+    return client.post("/api/admin/quotations", headers=auth, json={**QUOTATION, **fields}).json()["id"]
+
+
+def _set_status(client, auth, quotation_id, new_status):
+    return client.patch(f"/api/admin/quotations/{quotation_id}/status", headers=auth, json={"status": new_status})
+
+
+def test_status_patch_conflicts(client, auth):
+    import server
+
+    quotation_id = _quotation(client, auth)
+    assert _set_status(client, auth, quotation_id, "shipped").status_code == 400
+    assert _set_status(client, auth, "missing", "sent").status_code == 404
+    assert _set_status(client, auth, quotation_id, "accepted").status_code == 409  # draft -> accepted skips sent
+    assert _set_status(client, auth, quotation_id, "sent").json()["status"] == "sent"
+
+    client.portal.call(
+        server.db.quotations.update_one, {"id": quotation_id}, {"$set": {"valid_until": datetime.utcnow() - timedelta(days=1)}}
+    )
+    response = _set_status(client, auth, quotation_id, "accepted")
+    assert (response.status_code, response.json()["detail"]) == (409, "Quotation has expired")
+    assert _set_status(client, auth, quotation_id, "rejected").json()["status"] == "rejected"
+    assert _set_status(client, auth, quotation_id, "sent").status_code == 409  # rejected is final
+
+
+def test_list_filters(client, auth):
+    small = _quotation(client, auth, valid_days=3)
+    large = _quotation(client, auth, client_email="cfo@globex.com", items=[dict(ITEM, total=1000.0)])
+    _set_status(client, auth, large, "sent")
+
+    def ids(query):
+        return {q["id"] for q in client.get(f"/api/admin/quotations?{query}", headers=auth).json()}
+
+    assert ids("status=sent") == {large}
+    assert ids("client_email=cfo@globex.com") == {large}
+    assert ids("min_amount=500") == {large}
+    assert ids("max_amount=500") == {small}
+    assert ids("expiring_within_days=7") == {small}
+    assert ids("expiring_within_days=7&status=sent") == set()
+    assert client.get("/api/admin/quotations?min_amount=-1", headers=auth).status_code == 422
@@ -0,0 +1,114 @@
+import asyncio
+import sqlite3
+import threading
+import time
+
+import pytest
+
+import ratelimit
+from ratelimit import AdmissionController, Limit, MemoryBucketStore, RouteLimits, SqliteBucketStore
+
+LIMITS = {"x": RouteLimits(per_client=Limit(rate=1.0, burst=2), total=Limit(rate=10.0, burst=3))}
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "memory":
+        return MemoryBucketStore()
+    return SqliteBucketStore(str(tmp_path / "buckets.sqlite"))
+
+
+def test_per_client_and_global_buckets(store):
+    controller = AdmissionController(LIMITS, store)
+    assert [controller.check("x", "a", 0) for _ in range(3)] == [0, 0, 1.0]
+    assert controller.check("x", "b", 0) == 0
+    # The global bucket is empty now, whoever asks
+    assert controller.check("x", "c", 0) == pytest.approx(0.1)
+    assert controller.check("x", "a", 1.0) == 0
+
+
+def test_rejected_request_takes_no_token(store):
+    controller = AdmissionController(LIMITS, store)
+    controller.check("x", "a", 0)
+    controller.check("x", "a", 0)
+    assert controller.check("x", "a", 0) > 0
+    assert controller.check("x", "a", 0) > 0
+    assert controller.check("x", "a", 1.0) == 0
+
+
+def test_disabled_admits_everything(store):
+    controller = AdmissionController(LIMITS, store, enabled=False)
+    assert all(controller.check("x", "a", 0) == 0 for _ in range(10))
+
+
+def test_eviction_keeps_partly_drained_buckets():
+    store = MemoryBucketStore(max_clients=2)
+    controller = AdmissionController({"x": RouteLimits(Limit(rate=1 / 300, burst=2), Limit(1e9, 10**9))}, store)
+    controller.check("x", "a", 0)
+    controller.check("x", "a", 0)
+    for i in range(50):
+        controller.check("x", str(i), 1)
+    # Forgetting "a" would hand it a full bucket minutes early
+    assert controller.check("x", "a", 2) > 0
+
+
+def test_eviction_drops_refilled_buckets():
+    store = MemoryBucketStore(max_clients=5)
+    controller = AdmissionController({"x": RouteLimits(Limit(rate=1.0, burst=1), Limit(1e9, 10**9))}, store)
+    for i in range(100):
+        # Each client's bucket is full again a second after its request
+        controller.check("x", str(i), i)
+    assert len(store) <= 6
+
+
+def test_sqlite_store_is_shared_between_connections(tmp_path):
+    path = str(tmp_path / "buckets.sqlite")
+    first = AdmissionController(LIMITS, SqliteBucketStore(path))
+    second = AdmissionController(LIMITS, SqliteBucketStore(path))
+    assert first.check("x", "a", 0) == 0
+    assert second.check("x", "a", 0) == 0
+    assert first.check("x", "a", 0) > 0
+
+
+def test_sqlite_admit_waits_off_the_event_loop(tmp_path):
+    path = str(tmp_path / "buckets.sqlite")
+    controller = AdmissionController(LIMITS, SqliteBucketStore(path))
+    controller.check("x", "warm", 0)
+    blocker = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+    blocker.execute("BEGIN IMMEDIATE")
+
+    async def scenario():
+        ticks = 0
+
+        async def tick():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        ticker = asyncio.create_task(tick())
+        threading.Timer(0.3, blocker.execute, ("COMMIT",)).start()
+        started = time.perf_counter()
+        wait = await controller.admit("x", "b")
+        elapsed = time.perf_counter() - started
+        ticker.cancel()
+        return wait, elapsed, ticks
+
+    wait, elapsed, ticks = asyncio.run(scenario())
+    assert wait == 0
+    assert elapsed >= 0.25
+    # The loop kept running while the transaction waited for the lock
+    assert ticks >= 10
+
+
+def test_retry_after_header_rounds_up():
+    assert ratelimit.retry_after_header(0.1) == "1"
+    assert ratelimit.retry_after_header(2.01) == "3"
+
+
+def test_contact_route_answers_429_with_retry_after(client):
+    lead = {"name": "Ann", "email": "ann@example.com", "phone": "1", "service": "Web", "message": "hi"}
+    statuses = [client.post("/api/contact", json=lead).status_code for _ in range(6)]
+    assert statuses == [200] * 5 + [429]
+    response = client.post("/api/contact", json=lead)
+    assert int(response.headers["retry-after"]) > 0
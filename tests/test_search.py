@@ -0,0 +1,71 @@
+import asyncio
+
+import search
+from search import InvertedIndex, highlight
+
+PROJECTS = [
+    {"id": "title", "title": "Brand refresh", "tags": [], "client": "Acme", "description": "Logo work"},
+    {"id": "description", "title": "Website", "tags": [], "client": "Acme", "description": "A brand new site"},
+    {"id": "none", "title": "Network", "tags": ["it"], "client": "Initech", "description": "Cabling"},
+]
+
+
+def _index():
+    index = InvertedIndex()
+    for doc in PROJECTS:
+        index.index("projects", doc)
+    return index
+
+
+def test_title_matches_outrank_description_matches():
+    total, hits = _index().search_sync("brand", ["projects"], 0, 10)
+    assert total == 2
+    assert [hit["id"] for hit in hits] == ["title", "description"]
+    assert hits[0]["score"] > hits[1]["score"]
+
+
+def test_pagination_and_removal():
+    index = _index()
+    total, hits = index.search_sync("brand", ["projects"], 1, 1)
+    assert (total, [hit["id"] for hit in hits]) == (2, ["description"])
+    index.remove("projects", ["title"])
+    index.index("projects", dict(PROJECTS[1], title="Brand site"))
+    assert [hit["id"] for hit in index.search_sync("brand", ["projects"], 0, 10)[1]] == ["description"]
+    assert index.search_sync("refresh", ["projects"], 0, 10) == (0, [])
+
+
+def test_snippets_are_escaped_and_marked():
+    doc = {"name": "Eve", "email": "eve@example.com", "message": "<script>alert(1)</script> please call me & quote"}
+    snippet = highlight(doc, "contact_submissions", ["quote", "script"])
+    assert "<script>" not in snippet
+    assert snippet == "&lt;<mark>script</mark>&gt;alert(1)&lt;/<mark>script</mark>&gt; please call me &amp; <mark>quote</mark>"
+
+
+def test_long_fields_are_windowed_around_the_match():
+    doc = {"company": "", "content": "x " * 200 + "excellent support " + "y " * 200}
+    snippet = highlight(doc, "testimonials", ["excellent"], width=60)
+    assert snippet.startswith("…") and snippet.endswith("…")
+    assert "<mark>excellent</mark>" in snippet and len(snippet) < 80
+
+
+def test_archived_documents_only_on_request(db):
+    lead = {"id": "old", "name": "Ada", "email": "ada@example.com", "message": "Budget for a brand launch"}
+    asyncio.run(db.contact_submissions_archive.insert_one(dict(lead)))
+    asyncio.run(db.contact_submissions.insert_one(dict(lead, id="new")))
+    index = InvertedIndex({"contact_submissions": "contact_submissions_archive"})
+    asyncio.run(index.load(db))
+
+    assert [hit["id"] for hit in index.search_sync("brand", ["contact_submissions"], 0, 10)[1]] == ["new"]
+    total, hits = index.search_sync("brand", ["contact_submissions"], 0, 10, include_archived=True)
+    assert (total, sorted(hit["id"] for hit in hits)) == (2, ["new", "old"])
+
+
+def test_search_route(client, auth, monkeypatch):
+    import server
+
+    monkeypatch.setattr(server, "search_engine", search.create_engine("memory"))
+    for doc in PROJECTS:
+        server.search_engine.index("projects", doc)
+    body = client.get("/api/search?q=brand&types=projects", headers=auth).json()
+    assert body["total"] == 2 and body["results"][0]["snippet"] == "<mark>Brand</mark> refresh"
+    assert client.get("/api/search?q=brand&types=nope", headers=auth).status_code == 400
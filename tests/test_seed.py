@@ -0,0 +1,37 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+
+import seed
+from benchmarks import fixtures
+
+COUNTS = {"projects": 30, "quotations": 130, "status_checks": 20}
+UNTIL = datetime(2026, 1, 1)
+
+
+def test_generate_is_independent_of_batching():
+    whole = fixtures.generate("quotations", 0, 40, seed=7)
+    pieces = fixtures.generate("quotations", 0, 15, seed=7) + fixtures.generate("quotations", 15, 25, seed=7)
+    assert whole == pieces
+    assert whole != fixtures.generate("quotations", 0, 40, seed=8)
+
+
+def test_seeding_is_deterministic(tmp_path):
+    mongomock_motor = pytest.importorskip("mongomock_motor")
+    client = mongomock_motor.AsyncMongoMockClient()
+
+    async def scenario():
+        first = await seed.seed_database(client["a"], COUNTS, batch_size=7, processes=0, until=UNTIL, uploads=tmp_path)
+        await seed.seed_database(client["b"], COUNTS, batch_size=64, processes=0, concurrency=1, until=UNTIL)
+        a = await client["a"].quotations.find({}, {"_id": 0}).sort("id", 1).to_list(None)
+        b = await client["b"].quotations.find({}, {"_id": 0}).sort("id", 1).to_list(None)
+        projects = await client["a"].projects.find().to_list(None)
+        return first, a, b, projects
+
+    first, a, b, projects = asyncio.run(scenario())
+    assert first["quotations"]["documents"] == 130
+    assert a == b
+    assert max(doc["created_at"] for doc in a) <= UNTIL
+    images = sum(len(project["images"]) for project in projects)
+    assert first["projects"]["images"] == images == len(list((tmp_path / "projects").glob("*.jpg")))
@@ -0,0 +1,100 @@
+import asyncio
+
+import pytest
+
+from singleflight import SingleFlight
+
+
+def test_concurrent_callers_share_one_execution():
+    async def scenario():
+        flights = SingleFlight()
+        calls = 0
+
+        async def load():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return calls
+
+        results = await asyncio.gather(*(flights.do("key", load) for _ in range(20)))
+        return results, calls, flights
+
+    results, calls, flights = asyncio.run(scenario())
+    assert results == [1] * 20
+    assert calls == 1
+    assert (flights.executions, flights.coalesced, len(flights)) == (1, 19, 0)
+
+
+def test_timed_out_caller_does_not_cancel_the_work():
+    async def scenario():
+        flights = SingleFlight()
+
+        async def slow():
+            await asyncio.sleep(0.05)
+            return 42
+
+        patient = asyncio.ensure_future(flights.do("key", slow))
+        with pytest.raises(asyncio.TimeoutError):
+            await flights.do("key", slow, timeout=0.001)
+        return await patient
+
+    assert asyncio.run(scenario()) == 42
+
+
+def test_errors_reach_every_caller_and_are_not_kept():
+    async def scenario():
+        flights = SingleFlight()
+
+        async def boom():
+            await asyncio.sleep(0.01)
+            raise ValueError("boom")
+
+        results = await asyncio.gather(flights.do("key", boom), flights.do("key", boom), return_exceptions=True)
+        again = await asyncio.gather(flights.do("key", boom), return_exceptions=True)
+        return results + again, flights
+
+    results, flights = asyncio.run(scenario())
+    assert all(isinstance(result, ValueError) for result in results)
+    assert flights.executions == 2
+
+
+def test_disabled_runs_every_call():
+    async def scenario():
+        flights = SingleFlight(enabled=False)
+        calls = []
+
+        async def load():
+            calls.append(1)
+
+        await asyncio.gather(*(flights.do("key", load) for _ in range(3)))
+        return len(calls)
+
+    assert asyncio.run(scenario()) == 3
+
+
+def test_concurrent_pdf_downloads_render_once(client, auth, monkeypatch):
+    import io
+    import time
+
+    import server
+
+    renders = []
+
+    def slow_render(quotation):
+        renders.append(quotation.id)
+        time.sleep(0.05)
+        return io.BytesIO(b"%PDF-1.4")
+
+    monkeypatch.setattr(server, "generate_quotation_pdf", slow_render)
+    quotation = client.post("/api/admin/quotations", headers=auth, json={
+        "client_name": "Acme", "client_email": "ops@acme.com", "client_phone": "1", "client_address": "KL",
+        "items": [{"description": "Site", "quantity": 1, "unit_price": 100.0, "total": 100.0}],
+    }).json()
+
+    async def downloads():
+        stored = server.Quotation(**quotation)
+        return await asyncio.gather(*(server.render_quotation_pdf_file(stored) for _ in range(5)))
+
+    paths = client.portal.call(downloads)
+    assert renders == [quotation["id"]]
+    assert len(set(paths)) == 1
@@ -0,0 +1,49 @@
+import json
+
+from snapshots import KEEP_VERSIONS, SnapshotStore
+
+SMALL = b'[{"title": "A"}]'
+LARGE = json.dumps([{"title": "x" * 40}] * 100).encode()
+
+
+def test_publish_serves_only_the_current_generation(tmp_path):
+    store = SnapshotStore(tmp_path)
+    store.publish({"small": SMALL, "large": LARGE}, generation=3)
+
+    path, encoding = store.lookup("small", "gzip", 3)
+    assert (path.read_bytes(), encoding) == (SMALL, None)  # too small to precompress
+    path, encoding = store.lookup("large", "gzip", 3)
+    assert encoding == "gzip" and path.name.endswith(".json.gz")
+    assert store.lookup("missing", None, 3) is None
+    assert store.lookup("large", None, 4) is None  # the cache moved on since publishing
+
+
+def test_an_older_generation_never_replaces_a_newer_snapshot(tmp_path):
+    store = SnapshotStore(tmp_path)
+    newer = store.publish({"key": b"new"}, generation=5)
+    assert store.publish({"key": b"old"}, generation=4) == newer
+    path, _ = store.lookup("key", None, 5)
+    assert path.read_bytes() == b"new"
+
+
+def test_publishing_prunes_old_versions(tmp_path):
+    store = SnapshotStore(tmp_path)
+    for generation in range(KEEP_VERSIONS + 2):
+        store.publish({"key": str(generation).encode()}, generation)
+    assert len([p for p in tmp_path.iterdir() if p.is_dir()]) == KEEP_VERSIONS
+
+
+def test_public_routes_skip_a_stale_snapshot(client, auth):
+    import server
+
+    project = {"title": "A", "description": "d", "client": "c", "category": "Web", "completion_date": "2024-01-01T00:00:00"}
+    client.post("/api/admin/projects", headers=auth, json=project)
+    client.portal.call(server.publish_public_snapshots)
+    response = client.get("/api/projects")
+    assert "last-modified" in response.headers  # served from the snapshot file
+    assert [p["title"] for p in response.json()] == ["A"]
+
+    server.public_cache.invalidate()  # a write whose snapshot hasn't been published yet
+    response = client.get("/api/projects")
+    assert "last-modified" not in response.headers
+    assert [p["title"] for p in response.json()] == ["A"]
@@ -0,0 +1,104 @@
+import asyncio
+from datetime import datetime, timedelta
+
+from pymongo.errors import CollectionInvalid, OperationFailure
+
+import status_checks
+from status_checks import StatusCheckRetention
+
+
+class FakeDatabase:
+    """Just enough of a database to drive the capped-collection setup (mongomock has no capped collections)."""
+
+    def __init__(self, exists=False, capped=False, racing=False):
+        self.exists, self.capped, self.racing = exists, capped, racing
+        self.calls = []
+
+    def __getitem__(self, name):
+        return FakeCollection(self)
+
+    async def list_collection_names(self, filter=None):
+        return [status_checks.COLLECTION] if self.exists else []
+
+    async def create_collection(self, name, **options):
+        self.calls.append(("create", options))
+        if self.racing:
+            self.exists = True
+            raise CollectionInvalid(f"collection {name} already exists")
+        self.exists = self.capped = True
+
+    async def command(self, command):
+        self.calls.append(("convert", command))
+        if self.racing:
+            self.capped = True
+            raise OperationFailure("conversion already in progress", 72)
+        self.capped = True
+
+
+class FakeCollection:
+    def __init__(self, database):
+        self.database = database
+
+    async def options(self):
+        return {"capped": True} if self.database.capped else {}
+
+
+CAPPED = StatusCheckRetention(storage="capped", capped_bytes=4096, capped_max=10, rollup=False)
+
+
+def test_capped_storage_on_a_fresh_database_creates_the_collection():
+    database = FakeDatabase()
+    asyncio.run(CAPPED.ensure_storage(database))
+    assert database.calls == [("create", {"capped": True, "size": 4096, "max": 10})]
+
+
+def test_capped_storage_converts_an_existing_collection_once():
+    database = FakeDatabase(exists=True)
+    asyncio.run(CAPPED.ensure_storage(database))
+    asyncio.run(CAPPED.ensure_storage(database))
+    assert database.calls == [("convert", {"convertToCapped": status_checks.COLLECTION, "size": 4096, "max": 10})]
+
+
+def test_capped_storage_tolerates_another_worker_racing():
+    database = FakeDatabase(racing=True)
+    asyncio.run(CAPPED.ensure_storage(database))
+    assert [call for call, _ in database.calls] == ["create", "convert"]
+    assert database.capped
+
+
+def test_ttl_storage_records_latest_and_rollups(db):
+    retention = StatusCheckRetention(storage="ttl", retention_days=30)
+
+    async def scenario():
+        await retention.ensure_storage(db)
+        start = datetime.utcnow().replace(minute=5) - timedelta(hours=3)
+        for minutes, client in ((0, "a"), (10, "a"), (70, "b")):
+            await retention.record(db, {"id": str(minutes), "client_name": client, "timestamp": start + timedelta(minutes=minutes)})
+        latest = await retention.latest(db, 2)
+        rollups = await retention.rollups(db, start, start + timedelta(hours=2))
+        return latest, rollups
+
+    latest, rollups = asyncio.run(scenario())
+    assert [check["id"] for check in latest] == ["70", "10"]
+    assert [(r["client_name"], r["count"]) for r in rollups] == [("a", 2), ("b", 1)]
+    assert rollups[1]["hour"] - rollups[0]["hour"] == timedelta(hours=1)
+
+
+class BrokenRollups:
+    def __init__(self, database):
+        self.database = database
+
+    def __getitem__(self, name):
+        if name == status_checks.ROLLUPS:
+            raise ConnectionError("rollups unavailable")
+        return self.database[name]
+
+
+def test_rollup_failure_keeps_the_recorded_check(db):
+    retention = StatusCheckRetention(storage="ttl")
+
+    async def scenario():
+        await retention.record(BrokenRollups(db), {"id": "1", "client_name": "a", "timestamp": datetime.utcnow()})
+        return await retention.latest(db, 10)
+
+    assert [check["id"] for check in asyncio.run(scenario())] == ["1"]
@@ -0,0 +1,61 @@
+from pathlib import Path
+
+import server
+
+PROJECT = {"title": "A", "description": "d", "client": "c", "category": "Web", "completion_date": "2024-01-01T00:00:00"}
+
+
+def _images(*names):
+    return [("files", (name, b"\xff\xd8" + name.encode() * 100, "image/jpeg")) for name in names]
+
+
+def _stored():
+    return sorted(p.name for p in Path("uploads/projects").iterdir())
+
+
+def test_batch_upload_reports_each_file(client, auth, monkeypatch):
+    project = client.post("/api/admin/projects", headers=auth, json=PROJECT).json()
+    open_file, opened = server.aiofiles.open, []
+
+    def flaky_open(path, mode):
+        opened.append(path)
+        if len(opened) == 2:
+            raise OSError("disk full")
+        return open_file(path, mode)
+
+    monkeypatch.setattr(server.aiofiles, "open", flaky_open)
+    files = _images("a.jpg", "b.jpg", "c.jpg") + [("files", ("notes.txt", b"hello", "text/plain"))]
+    response = client.post(f"/api/admin/projects/{project['id']}/images/batch", headers=auth, files=files)
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["uploaded"], body["failed"]) == (2, 2)
+    errors = {result["filename"]: result["error"] for result in body["results"] if result["error"]}
+    assert sorted(errors.values()) == ["Could not store file", "File must be an image"]
+    assert errors["notes.txt"] == "File must be an image"
+
+    stored = [result["image_url"] for result in body["results"] if result["image_url"]]
+    assert _stored() == sorted(url.rsplit("/", 1)[1] for url in stored)  # the failed write left nothing behind
+    saved = client.get(f"/api/projects/{project['id']}").json()
+    assert saved["images"] == stored and saved["featured_image"] == body["featured_image"] == stored[0]
+
+
+def test_batch_upload_removes_files_when_the_project_is_deleted(client, auth, monkeypatch):
+    project = client.post("/api/admin/projects", headers=auth, json=PROJECT).json()
+    attach = server.attach_project_images
+
+    async def deleted_meanwhile(project_id, image_urls):
+        await server.db.projects.delete_one({"id": project_id})
+        return await attach(project_id, image_urls)
+
+    monkeypatch.setattr(server, "attach_project_images", deleted_meanwhile)
+    response = client.post(f"/api/admin/projects/{project['id']}/images/batch", headers=auth, files=_images("a.jpg", "b.jpg"))
+    assert response.status_code == 404
+    assert _stored() == []
+
+
+def test_batch_upload_limits(client, auth, monkeypatch):
+    monkeypatch.setattr(server, "IMAGE_BATCH_MAX_FILES", 1)
+    project = client.post("/api/admin/projects", headers=auth, json=PROJECT).json()
+    response = client.post(f"/api/admin/projects/{project['id']}/images/batch", headers=auth, files=_images("a.jpg", "b.jpg"))
+    assert response.status_code == 400
+    assert client.post("/api/admin/projects/missing/images/batch", headers=auth, files=_images("a.jpg")).status_code == 404